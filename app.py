@@ -1,25 +1,54 @@
+# 启动用时从导入模块开始计算
+import time
+_started = time.perf_counter()
+
+import sys
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import sqlite3
-import os
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
-import shutil
-from datetime import datetime
-import uuid
 
-# 导入主程序文件
+# 导入主程序文件(pandas、matplotlib、Pillow 在用到时才导入，不影响启动速度)
 from main import ArchiveManagementSystem
 
+
+# 输出启动各阶段的用时: python app.py --timing
+def report_startup(app, imported, created):
+    # 强制完成挂起的布局和绘制，此时窗口已显示
+    app.root.update_idletasks()
+    painted = time.perf_counter()
+    lines = [f"导入模块: {(imported - _started) * 1000:.0f} ms"]
+    lines += [f"{name}: {seconds * 1000:.0f} ms" for name, seconds in app.startup_times]
+    lines.append(f"首次绘制: {(painted - created) * 1000:.0f} ms")
+    lines.append(f"合计: {(painted - _started) * 1000:.0f} ms")
+    print("启动用时\n  " + "\n  ".join(lines), file=sys.stderr)
+
+# 命令行参数 --profile 文件: 对整个运行过程做 cProfile 分析，退出时保存 pstats 文件
+def profile_path(argv):
+    if "--profile" in argv:
+        index = argv.index("--profile") + 1
+        return argv[index] if index < len(argv) else "teacher_archive.pstats"
+    return None
+
 # 程序入口点
 if __name__ == "__main__":
+    imported = time.perf_counter()
+    profile = profile_path(sys.argv[1:])
+    if profile:
+        import instrumentation
+        instrumentation.profiler.start()
+    
     # 创建主窗口
     root = tk.Tk()
     
     # 创建应用程序实例
     app = ArchiveManagementSystem(root)
     
+    if "--timing" in sys.argv[1:]:
+        created = time.perf_counter()
+        root.after(0, report_startup, app, imported, created)
+    
     # 运行主循环
-    root.mainloop()
\ No newline at end of file
+    try:
+        root.mainloop()
+    finally:
+        if profile:
+            instrumentation.profiler.stop(profile)
+            print(f"性能分析结果已保存到 {profile}(python -m pstats {profile})", file=sys.stderr)
\ No newline at end of file
@@ -0,0 +1,123 @@
+# 照片、扫描件上传
+# 存入文件存储(复制并计算 sha256)、生成缩略图和 PDF 预览都在后台线程池中进行，界面线程只负责显示结果
+# 后台结果放入队列，由界面线程用 after() 定时取回
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+import blob_store
+import thumbnails
+
+
+# 文件类别: 类别 -> 预先生成的缩略图尺寸
+KINDS = {
+    "photo": thumbnails.PHOTO_SIZES,
+    "scan": thumbnails.SCAN_SIZES,
+}
+
+
+# 单个文件的处理结果
+class IngestResult:
+    def __init__(self, source, path=None, digest=None, preview=False, error=None):
+        # 用户选择的原文件
+        self.source = source
+        # 文件存储中的路径
+        self.path = path
+        self.digest = digest
+        # 是否已生成缩略图(无法预览的文件仍可保存)
+        self.preview = preview
+        self.error = error
+
+
+# 处理一个文件(后台线程)
+def ingest_file(source, kind):
+    try:
+        path, digest = blob_store.put(source)
+    except OSError as e:
+        return IngestResult(source, error=e)
+    try:
+        # 重复上传的文件缩略图已存在，不会再解码
+        thumbnails.prepare(path, KINDS[kind])
+        preview = True
+    except Exception:
+        # 不是图片、损坏的 PDF(PyMuPDF 抛出 RuntimeError)或超大图片(Pillow 的 DecompressionBombError)，只保存文件
+        preview = False
+    return IngestResult(source, path, digest, preview)
+
+
+# 一批上传
+class IngestBatch:
+    def __init__(self, total, on_result, on_progress, on_finished):
+        self.total = total
+        self.done = 0
+        self.results = []
+        self.cancelled = False
+        self.futures = []
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+
+    # 取消尚未开始处理的文件，已开始的会处理完
+    def cancel(self):
+        self.cancelled = True
+        for future in self.futures:
+            if future.cancel():
+                self.done += 1
+
+
+class AssetIngestor:
+    # widget: 用于 after 调度的控件(一般为根窗口)
+    def __init__(self, widget, max_workers=2, poll_interval=50):
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._results = queue.Queue()
+        self._batches = []
+        self._poll_after = None
+
+    # 提交一批文件，回调都在界面线程中执行
+    # on_result(result): 每个文件处理完后；on_progress(done, total)；on_finished(batch): 全部处理完或取消后
+    def submit(self, paths, kind, on_result=None, on_progress=None, on_finished=None):
+        batch = IngestBatch(len(paths), on_result, on_progress, on_finished)
+        for path in paths:
+            future = self._executor.submit(ingest_file, path, kind)
+            future.add_done_callback(lambda f, b=batch, p=path: self._done(b, p, f))
+            batch.futures.append(future)
+        self._batches.append(batch)
+        if self._poll_after is None:
+            self._poll_after = self.widget.after(self.poll_interval, self._poll)
+        if not paths:
+            self._finish(batch)
+        return batch
+
+    # 后台线程: 处理完一个文件，出错时也放入结果，否则这一批永远不会结束
+    def _done(self, batch, path, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        self._results.put((batch, IngestResult(path, error=error) if error is not None else future.result()))
+
+    def _finish(self, batch):
+        if batch in self._batches:
+            self._batches.remove(batch)
+            if batch.on_finished is not None:
+                batch.on_finished(batch)
+
+    # 界面线程: 取回处理结果
+    def _poll(self):
+        self._poll_after = None
+        while True:
+            try:
+                batch, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            batch.done += 1
+            batch.results.append(result)
+            if batch.on_result is not None:
+                batch.on_result(result)
+            if batch.on_progress is not None:
+                batch.on_progress(batch.done, batch.total)
+        for batch in list(self._batches):
+            if batch.done >= batch.total:
+                self._finish(batch)
+        if self._batches:
+            self._poll_after = self.widget.after(self.poll_interval, self._poll)
@@ -0,0 +1,178 @@
+# 异步数据访问
+# 查询在后台线程池中用只读连接执行，界面线程不等待 SQLite；结果放入队列，由界面线程用 after() 定时取回后回调
+# 每个请求属于一个分组(默认为当前页面)，切换页面时取消该分组中尚未完成的请求，正在执行的查询会被中断
+# 大量结果分批插入 Treeview，每批之间让出界面线程，避免界面卡顿；有主键的表格刷新时只改动变化的行
+# 列表查询可以使用查询结果缓存(query_cache)，数据没有变化时不再执行查询
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import tree_diff
+
+
+# 默认分组: 当前显示的页面
+PAGE = "page"
+
+
+# 一个后台请求
+class QueryFuture:
+    def __init__(self, group, key, on_done, on_error):
+        self.group = group
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False
+        self._future = None
+        # 正在执行本请求的连接，用于中断
+        self._conn = None
+        self._lock = threading.Lock()
+
+    # 取消请求: 尚未开始的不再执行，正在执行的查询被中断，结果都不再回调
+    def cancel(self):
+        self.cancelled = True
+        if self._future is not None:
+            self._future.cancel()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.interrupt()
+
+
+def _fetchall(conn, sql, params):
+    return conn.execute(sql, params).fetchall()
+
+
+class AsyncDB:
+    # manager: 连接管理器(db_connection.ConnectionManager)；widget: 用于 after 调度的控件(一般为根窗口)
+    # cache: 查询结果缓存(query_cache.QueryCache)，为 None 时不缓存
+    def __init__(self, manager, widget, max_workers=2, poll_interval=15, chunk_size=300, cache=None):
+        self.manager = manager
+        self.widget = widget
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.chunk_size = chunk_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self._results = queue.Queue()
+        self._pending = []
+        self._poll_after = None
+        # Treeview -> 正在分批插入的 after id
+        self._fills = {}
+
+    # 在后台执行 func(conn, *args)，完成后在界面线程调用 on_done(结果) 或 on_error(异常)
+    # 同一 key 的新请求会取消尚未完成的旧请求(如输入筛选条件时只保留最后一次)
+    def call(self, func, *args, on_done=None, on_error=None, group=PAGE, key=None):
+        request = self._add(QueryFuture(group, key, on_done, on_error))
+        request._future = self._executor.submit(self._run, request, func, args)
+        return request
+
+    # 在后台执行查询，on_done 收到全部结果行
+    # cached 为 True 时先查缓存: 依赖的表没有修改过就不再查询，结果同样由 on_done 在界面线程收到
+    def query(self, sql, params=(), on_done=None, on_error=None, group=PAGE, key=None, cached=False):
+        params = tuple(params)
+        if cached and self.cache is not None:
+            rows = self.cache.get(self.manager.main, sql, params)
+            if rows is not None:
+                return self._resolved(rows, on_done, on_error, group, key)
+            return self.call(self.cache.execute, sql, params, on_done=on_done, on_error=on_error,
+                             group=group, key=key)
+        return self.call(_fetchall, sql, params, on_done=on_done, on_error=on_error, group=group, key=key)
+
+    # 已有结果的请求，与后台查询一样在下次取回结果时回调，可以取消
+    def _resolved(self, result, on_done, on_error, group, key):
+        request = self._add(QueryFuture(group, key, on_done, on_error))
+        self._results.put((request, result, None))
+        return request
+
+    # 登记请求并开始定时取回结果
+    def _add(self, request):
+        if request.key is not None:
+            for pending in self._pending:
+                if pending.key == request.key:
+                    pending.cancel()
+        self._pending.append(request)
+        if self._poll_after is None:
+            self._poll_after = self.widget.after(self.poll_interval, self._poll)
+        return request
+
+    # 取消分组中尚未完成的请求(group 为 None 时取消全部)，同时停止页面中正在进行的分批插入
+    def cancel(self, group=PAGE):
+        for request in self._pending:
+            if group is None or request.group == group:
+                request.cancel()
+        self._pending = [r for r in self._pending if not r.cancelled]
+        if group in (PAGE, None):
+            for tree, after_id in self._fills.items():
+                tree.after_cancel(after_id)
+            self._fills.clear()
+
+    # 后台线程
+    def _run(self, request, func, args):
+        if request.cancelled:
+            return
+        conn = self.manager.reader()
+        with request._lock:
+            request._conn = conn
+        try:
+            # 取消可能发生在设置连接之前
+            if request.cancelled:
+                return
+            result = func(conn, *args)
+            self._results.put((request, result, None))
+        except Exception as e:
+            self._results.put((request, None, e))
+        finally:
+            with request._lock:
+                request._conn = None
+
+    # 界面线程: 取回结果并回调
+    def _poll(self):
+        self._poll_after = None
+        done = []
+        while True:
+            try:
+                done.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+        finished = {id(request) for request, _, _ in done}
+        self._pending = [r for r in self._pending if not r.cancelled and id(r) not in finished]
+        if self._pending:
+            self._poll_after = self.widget.after(self.poll_interval, self._poll)
+        first_error = None
+        for request, result, error in done:
+            if request.cancelled:
+                continue
+            if error is None:
+                if request.on_done is not None:
+                    request.on_done(result)
+            elif request.on_error is not None:
+                request.on_error(error)
+            elif first_error is None:
+                first_error = error
+        if first_error is not None:
+            # 没有指定 on_error 时交给 Tk 的异常处理
+            raise first_error
+
+    # 在 tree 中显示 rows，values(row) 把一行转换为显示的值(默认原样)
+    # 给出 key(row)(行的主键)时按主键增量刷新，只改动变化的行；否则(或改动太多时)清空后分批插入
+    def fill(self, tree, rows, values=None, key=None):
+        after_id = self._fills.pop(tree, None)
+        if after_id is not None:
+            tree.after_cancel(after_id)
+        if key is not None and tree.get_children():
+            if tree_diff.sync(tree, rows, key, values, max_changes=self.chunk_size) is not None:
+                return
+        tree_diff.clear(tree)
+
+        def insert(start):
+            self._fills.pop(tree, None)
+            if not tree.winfo_exists():
+                return
+            for row in rows[start:start + self.chunk_size]:
+                row_values = tuple(row if values is None else values(row))
+                if key is None:
+                    tree.insert("", "end", values=row_values)
+                else:
+                    tree_diff.insert(tree, "end", str(key(row)), row_values)
+            if start + self.chunk_size < len(rows):
+                self._fills[tree] = tree.after(1, insert, start + self.chunk_size)
+
+        insert(0)
@@ -0,0 +1,88 @@
+# 获奖分析
+# 把表彰及获奖人员读入 pandas 列式表，去重、排名统计和有效排名筛选都用向量化的 groupby 完成
+# 同一教师的同一获奖(奖项名称相同)在多个级别登记时，只按最高级别统计一次
+import pandas as pd
+
+from stats_store import AWARD_LEVELS
+
+
+# 级别为有序分类，从低到高，便于直接比较和取最大值
+LEVEL_DTYPE = pd.CategoricalDtype(list(reversed(AWARD_LEVELS)), ordered=True)
+
+_COLUMNS = ["award_id", "award_name", "award_level", "award_date", "award_type", "teacher_id", "name", "rank"]
+
+
+# 读取获奖记录，每位获奖人一行；award_type 为 None 时读取全部类型
+def load_awards(conn, award_type=None):
+    sql = """
+        SELECT a.award_id, a.award_name, a.award_level, a.award_date, IFNULL(a.award_type, '综合表彰'),
+               ar.teacher_id, t.name, ar.rank
+        FROM award_recipients ar
+        JOIN awards a ON ar.award_id = a.award_id
+        JOIN teacher_info t ON ar.teacher_id = t.teacher_id
+        """
+    params = ()
+    if award_type is not None:
+        sql += " WHERE IFNULL(a.award_type, '综合表彰') = ?"
+        params = (award_type,)
+    frame = pd.DataFrame.from_records(conn.execute(sql, params).fetchall(), columns=_COLUMNS)
+    frame["award_level"] = frame["award_level"].astype(LEVEL_DTYPE)
+    frame["rank"] = pd.to_numeric(frame["rank"], errors="coerce")
+    # 判断是否同一获奖的键: 去掉空白后的奖项名称
+    frame["award_key"] = frame["award_name"].fillna("").str.replace(r"\s+", "", regex=True)
+    return frame
+
+
+# 同一获奖按最高级别为准: 每位教师的每个获奖只保留级别最高的一条，同级别取名次靠前的
+def dedup_highest(frame):
+    if frame.empty:
+        return frame
+    # 先按名次排序，idxmax 在级别相同时取第一条即名次最好的
+    ordered = frame.sort_values("rank", kind="stable", na_position="last")
+    # 级别未知的编码为 -1，排在所有已知级别之后
+    level_code = ordered["award_level"].cat.codes
+    best = level_code.groupby([ordered["teacher_id"], ordered["award_key"]], sort=False).idxmax()
+    return frame.loc[best.to_numpy()].sort_index()
+
+
+# 有效排名筛选: max_rank 为统一的名次上限，或 {级别: 名次上限}，未列出的级别不限
+def filter_valid_rank(frame, max_rank):
+    if max_rank is None or frame.empty:
+        return frame
+    if isinstance(max_rank, dict):
+        limits = frame["award_level"].map(max_rank).astype("float64")
+        keep = limits.isna() | (frame["rank"] <= limits)
+    else:
+        keep = frame["rank"] <= max_rank
+    return frame[keep]
+
+
+# 每位教师按级别的获奖数，按最高级别的获奖数依次降序，级别未知的获奖不参与
+# 返回列: 教师ID、姓名、各级别获奖数、合计、第一名次数、最好名次
+def rank_table(frame):
+    levels = list(AWARD_LEVELS)
+    frame = frame[frame["award_level"].notna()]
+    if frame.empty:
+        return pd.DataFrame(columns=["teacher_id", "name"] + levels + ["合计", "第一名", "最好名次"])
+    keys = ["teacher_id", "name"]
+    counts = frame.groupby(keys + ["award_level"], observed=False).size().unstack("award_level", fill_value=0)
+    counts = counts.reindex(columns=levels, fill_value=0)
+    counts.columns = levels
+    ranks = frame.assign(first=frame["rank"] == 1).groupby(keys).agg(first=("first", "sum"), best=("rank", "min"))
+    counts["合计"] = counts[levels].sum(axis=1)
+    counts["第一名"] = ranks["first"]
+    counts["最好名次"] = ranks["best"]
+    counts = counts[counts["合计"] > 0]
+    return counts.sort_values(levels + ["第一名"], ascending=False).reset_index()
+
+
+# 按级别汇总获奖人次 [(级别, 人次)]，级别从高到低
+def level_summary(frame):
+    counts = frame["award_level"].value_counts(sort=False)
+    return [(level, int(counts.get(level, 0))) for level in AWARD_LEVELS if counts.get(level, 0)]
+
+
+# 获奖排名统计: 去重并按有效排名筛选后的教师排名表
+def award_ranking(conn, award_type=None, max_rank=None):
+    frame = dedup_highest(load_awards(conn, award_type))
+    return rank_table(filter_valid_rank(frame, max_rank))
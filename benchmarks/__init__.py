@@ -0,0 +1,3 @@
+# 性能基准测试
+# datagen: 生成与 main.py 数据结构一致的模拟数据库；run: 计时主要操作并输出 JSON 结果
+# 在程序目录中执行: python -m benchmarks.run --scale 1000 10000
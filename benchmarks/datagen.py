@@ -0,0 +1,308 @@
+# 模拟数据生成
+# 按 db_schema 中的数据表生成区县规模的教师档案数据库，同一 seed 和规模生成的数据完全相同
+# 数据先批量写入数据表，再执行迁移建立索引、全文检索和统计汇总表，与程序升级旧数据库的过程一致
+# 用法: python -m benchmarks.datagen bench_10k.db --teachers 10000
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+import uuid
+
+import db_connection
+import db_schema
+
+
+# 预设规模(教师人数)
+SCALES = (1000, 10000, 100000)
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤"
+GIVEN = "伟芳娜秀英敏静丽强磊军洋勇艳杰娟涛明超秀兰霞平刚桂英华玉萍红娥玲芬燕彬鹏辉俊峰建国志文斌宇浩凯晨欣怡雪梅琳婷倩颖佳慧"
+ETHNICITIES = ("汉族",) * 18 + ("回族", "壮族")
+HOMETOWNS = ("浙江杭州", "浙江宁波", "江苏南京", "安徽合肥", "江西南昌", "湖南长沙", "河南郑州", "山东济南", "四川成都", "福建福州")
+SUBJECTS = ("语文", "数学", "英语", "物理", "化学", "生物", "历史", "地理", "政治", "体育", "音乐", "美术", "信息技术")
+POSITIONS = ("教师",) * 12 + ("教研组长", "年级组长", "备课组长", "副校长", "教务主任")
+TITLES = ("三级教师", "二级教师", "一级教师", "高级教师", "正高级教师")
+DEGREES = (("学士", 60), ("硕士", 30), ("博士", 3), ("其他", 7))
+INSTITUTIONS = ("浙江师范大学", "杭州师范大学", "华东师范大学", "北京师范大学", "南京师范大学", "湖州师范学院", "宁波大学")
+AWARD_LEVELS = (("校级", 40), ("市级", 30), ("省级", 18), ("国家级", 10), ("全球级", 2))
+AWARD_NAMES = ("优秀教师", "优秀班主任", "教坛新秀", "教学能手", "优质课评比", "课件制作比赛", "论文评比", "师德标兵",
+               "优秀教研组", "先进工作者")
+AWARD_UNITS = ("区教育局", "市教育局", "省教育厅", "教育部", "学校")
+LESSON_SCOPES = ("校级", "区级", "市级", "省级", "国家级")
+PAPER_LEVELS = ("国家级", "省级", "市级", "校级", "其他")
+JOURNALS = ("中小学教育", "教学月刊", "中学数学", "语文建设", "教育研究", "基础教育课程")
+COMPETITIONS = ("数学竞赛", "物理竞赛", "化学竞赛", "信息学奥赛", "英语演讲比赛", "作文大赛", "科技创新大赛")
+COMPETITION_LEVELS = ("省级", "国家级", "国际级")
+WORK_TYPES = ("班主任", "副班主任", "年级组长", "社团指导", "德育导师")
+LEADERSHIP_TYPES = ("名师工作室", "学科带头人", "骨干教师", "教研员")
+EXAMS = ("期中考试", "期末考试", "月考")
+
+
+def _weighted(rng, choices):
+    return rng.choices([value for value, _ in choices], weights=[weight for _, weight in choices])[0]
+
+
+class Generator:
+    def __init__(self, teachers, seed=0):
+        self.teachers = teachers
+        self.rng = random.Random(seed)
+        self.teacher_ids = []
+        # 教师序号 -> 出生年份
+        self.birth_years = []
+
+    def uuid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def date(self, start_year, end_year):
+        rng = self.rng
+        return f"{rng.randint(start_year, end_year)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+    def stamp(self, date):
+        return f"{date} 08:00:00"
+
+    # 获奖、课题成员等偏向部分教师(少数教师有大量记录)
+    def skewed_teacher(self):
+        return self.teacher_ids[int(self.teachers * self.rng.random() ** 2)]
+
+    def teacher_info(self):
+        rng = self.rng
+        for i in range(self.teachers):
+            teacher_id = self.uuid()
+            year = rng.randint(1962, 2000)
+            self.teacher_ids.append(teacher_id)
+            self.birth_years.append(year)
+            birth = f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            name = rng.choice(SURNAMES) + "".join(rng.choice(GIVEN) for _ in range(rng.choice((1, 2, 2))))
+            # 身份证号: 地区码 + 出生日期 + 顺序码 + 校验码，地区码和顺序码由序号确定，保证唯一
+            id_number = f"{330000 + i // 1000:06d}{birth.replace('-', '')}{i % 1000:03d}{rng.choice('0123456789X')}"
+            work_start = f"{year + rng.randint(21, 25)}-09-01"
+            stamp = self.stamp(work_start)
+            yield (teacher_id, name, rng.choice("男女"), birth, rng.choice(ETHNICITIES), rng.choice(HOMETOWNS),
+                   id_number, None, self.date(year + 20, year + 40) if rng.random() < 0.4 else None, work_start,
+                   "良好", rng.choice(SUBJECTS), rng.choice(POSITIONS), stamp, stamp)
+
+    # 每位教师的多条记录: make(i, teacher_id, 出生年份) 返回该教师的行
+    def per_teacher(self, low, high, make):
+        for i, teacher_id in enumerate(self.teacher_ids):
+            for n in range(self.rng.randint(low, high)):
+                yield make(n, teacher_id, self.birth_years[i])
+
+    def title_history(self):
+        def make(n, teacher_id, year):
+            date = self.date(year + 24 + n * 5, year + 28 + n * 5)
+            return (self.uuid(), teacher_id, TITLES[min(n + 1, len(TITLES) - 1)], date, "专任教师", date,
+                    self.stamp(date), self.stamp(date))
+        return self.per_teacher(1, 3, make)
+
+    def education(self):
+        def make(n, teacher_id, year):
+            date = f"{year + 22 + n * 3}-06-30"
+            return (self.uuid(), teacher_id, "全日制" if n == 0 else "非全日制", _weighted(self.rng, DEGREES),
+                    self.rng.choice(INSTITUTIONS), date, None, self.stamp(date), self.stamp(date))
+        return self.per_teacher(1, 2, make)
+
+    def work_experience(self):
+        def make(n, teacher_id, year):
+            start = year + 22 + n * 6
+            date = f"{start}-09-01"
+            return (self.uuid(), teacher_id, date, f"{start + 6}-07-31", f"第{self.rng.randint(1, 30)}中学",
+                    "教师", None, self.stamp(date), self.stamp(date))
+        return self.per_teacher(1, 3, make)
+
+    def teaching_records(self):
+        def make(n, teacher_id, year):
+            academic_year = f"{2024 - n // 2}-{2025 - n // 2}"
+            return (self.uuid(), teacher_id, academic_year, ("第一学期", "第二学期")[n % 2], self.rng.choice(SUBJECTS),
+                    f"{self.rng.randint(1, 3)}年级{self.rng.randint(1, 12)}班", self.rng.randint(35, 50),
+                    self.rng.randint(8, 16), "2024-09-01 08:00:00", "2024-09-01 08:00:00")
+        return self.per_teacher(2, 6, make)
+
+    def education_work(self):
+        def make(n, teacher_id, year):
+            academic_year = f"{2024 - n}-{2025 - n}"
+            work_type = self.rng.choice(WORK_TYPES)
+            return (self.uuid(), teacher_id, academic_year, self.rng.choice(("第一学期", "第二学期")), work_type,
+                    f"担任{work_type}工作", "2024-09-01 08:00:00", "2024-09-01 08:00:00")
+        return self.per_teacher(0, 3, make)
+
+    # 表彰及获奖人员: 多数奖项只有一位获奖人，少数为多人或集体奖项
+    def awards(self):
+        rng = self.rng
+        recipients = []
+        rows = []
+        for _ in range(int(self.teachers * 0.6)):
+            award_id = self.uuid()
+            date = self.date(2000, 2024)
+            level = _weighted(rng, AWARD_LEVELS)
+            award_type = "教学比武" if rng.random() < 0.2 else "综合表彰"
+            rows.append((award_id, f"{date[:4]}年{level}{rng.choice(AWARD_NAMES)}", level, rng.choice(AWARD_UNITS),
+                         date, award_type, self.stamp(date), self.stamp(date)))
+            roll = rng.random()
+            count = 1 if roll < 0.8 else rng.randint(2, 5) if roll < 0.95 else rng.randint(10, 40)
+            # 去掉重复的教师并保持顺序(集合的顺序随字符串哈希变化，结果不可重现)
+            members = list(dict.fromkeys(self.skewed_teacher() for _ in range(count)))
+            for rank, teacher_id in enumerate(members, start=1):
+                recipients.append((self.uuid(), award_id, teacher_id, rank, self.stamp(date), self.stamp(date)))
+        return rows, recipients
+
+    def public_lessons(self):
+        def make(n, teacher_id, year):
+            date = self.date(2010, 2024)
+            return (self.uuid(), teacher_id, f"{self.rng.choice(SUBJECTS)}公开课", self.rng.choice(LESSON_SCOPES),
+                    date, self.stamp(date), self.stamp(date))
+        return self.per_teacher(0, 2, make)
+
+    def papers(self):
+        def make(n, teacher_id, year):
+            date = self.date(2005, 2024)
+            subject = self.rng.choice(SUBJECTS)
+            return (self.uuid(), teacher_id, f"浅谈{subject}教学中的{self.rng.choice(('合作学习', '分层教学', '信息技术应用'))}",
+                    self.rng.choice(JOURNALS), self.rng.choice(PAPER_LEVELS), date, self.stamp(date), self.stamp(date))
+        return self.per_teacher(0, 2, make)
+
+    # 课题及成员: 每个课题 3-8 名成员，第一位为主持人
+    def research_projects(self):
+        rng = self.rng
+        projects = []
+        members = []
+        for _ in range(max(1, self.teachers // 10)):
+            project_id = self.uuid()
+            date = self.date(2005, 2024)
+            projects.append((project_id, f"{rng.choice(SUBJECTS)}课堂教学研究({date[:4]})",
+                             rng.choice(("校级", "市级", "省级", "国家级")), date, self.stamp(date), self.stamp(date)))
+            team = []
+            for _ in range(rng.randint(3, 8)):
+                teacher_id = self.skewed_teacher()
+                if teacher_id not in team:
+                    team.append(teacher_id)
+            for rank, teacher_id in enumerate(team, start=1):
+                members.append((self.uuid(), project_id, teacher_id, rank == 1, rank, self.stamp(date), self.stamp(date)))
+        return projects, members
+
+    def student_competitions(self):
+        def make(n, teacher_id, year):
+            date = self.date(2010, 2024)
+            return (self.uuid(), teacher_id, self.rng.choice(COMPETITIONS), self.rng.randint(1, 10),
+                    self.rng.choice(COMPETITION_LEVELS), date, self.stamp(date), self.stamp(date))
+        return self.per_teacher(0, 1, make)
+
+    # 青蓝工程: 约四分之一的教师带一名徒弟，年长的一方为师傅
+    def mentoring(self):
+        rng = self.rng
+        for _ in range(self.teachers // 4):
+            mentor = rng.randrange(self.teachers)
+            apprentice = rng.randrange(self.teachers)
+            if self.birth_years[apprentice] == self.birth_years[mentor]:
+                continue
+            if self.birth_years[apprentice] < self.birth_years[mentor]:
+                mentor, apprentice = apprentice, mentor
+            start = rng.randint(2010, 2023)
+            date = f"{start}-09-01"
+            yield (self.uuid(), self.teacher_ids[mentor], self.teacher_ids[apprentice], date, f"{start + 1}-07-31",
+                   "徒弟获校级优质课一等奖", self.stamp(date), self.stamp(date))
+
+    def professional_leadership(self):
+        def make(n, teacher_id, year):
+            start = self.rng.randint(2010, 2022)
+            return (self.uuid(), teacher_id, self.rng.choice(LEADERSHIP_TYPES), "带领学科组开展教研活动",
+                    f"{start}-09-01", f"{start + 3}-07-31", self.stamp(f"{start}-09-01"), self.stamp(f"{start}-09-01"))
+        return self.per_teacher(0, 1, make)
+
+    # 考试成绩: 每位教师近几个学期的各次考试
+    def exam_results(self):
+        def make(n, teacher_id, year):
+            academic_year = 2024 - n // 6
+            date = f"{academic_year}-{(11, 1, 4, 6, 10, 12)[n % 6]:02d}-15"
+            name = f"{academic_year}学年{('第一', '第二')[n % 2]}学期{self.rng.choice(EXAMS)}"
+            return (self.uuid(), teacher_id, name, date, self.rng.randint(1, 30),
+                    round(self.rng.uniform(60, 95), 1), self.stamp(date), self.stamp(date))
+        return self.per_teacher(4, 12, make)
+
+
+# 各表的插入语句(列顺序与生成的行一致)
+def _insert_sql(conn, table):
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+# 生成数据库，返回 {表名: 行数}；文件已存在时覆盖
+def generate(path, teachers, seed=0, progress=None):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    generator = Generator(teachers, seed)
+    conn = db_connection.connect(path)
+    db_connection.enable_wal(conn)
+    # 只建表，索引、全文检索、统计汇总等在数据写入后由迁移一次建立
+    for statement in db_schema.TABLES:
+        conn.execute(statement)
+    conn.commit()
+
+    awards, recipients = [], []
+    projects, members = [], []
+
+    def awards_rows():
+        nonlocal awards, recipients
+        awards, recipients = generator.awards()
+        return awards
+
+    def projects_rows():
+        nonlocal projects, members
+        projects, members = generator.research_projects()
+        return projects
+
+    # 按依赖顺序: 其他表需要先生成的教师ID
+    tables = (
+        ("teacher_info", generator.teacher_info),
+        ("title_history", generator.title_history),
+        ("education", generator.education),
+        ("work_experience", generator.work_experience),
+        ("teaching_records", generator.teaching_records),
+        ("education_work", generator.education_work),
+        ("awards", awards_rows),
+        ("award_recipients", lambda: recipients),
+        ("public_lessons", generator.public_lessons),
+        ("papers", generator.papers),
+        ("research_projects", projects_rows),
+        ("project_members", lambda: members),
+        ("student_competitions", generator.student_competitions),
+        ("mentoring", generator.mentoring),
+        ("professional_leadership", generator.professional_leadership),
+        ("exam_results", generator.exam_results),
+    )
+    counts = {}
+    with conn:
+        for table, rows in tables:
+            started = time.perf_counter()
+            counts[table] = conn.executemany(_insert_sql(conn, table), rows()).rowcount
+            if progress is not None:
+                progress(f"{table}: {counts[table]} 行，{time.perf_counter() - started:.1f} 秒")
+    started = time.perf_counter()
+    db_schema.migrate(conn)
+    if progress is not None:
+        progress(f"索引、全文检索、统计汇总: {time.perf_counter() - started:.1f} 秒")
+    conn.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.datagen", description="生成模拟教师档案数据库")
+    parser.add_argument("output", help="数据库文件(已存在时覆盖)")
+    parser.add_argument("--teachers", type=int, default=SCALES[0], help="教师人数(默认 %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子(默认 %(default)s)")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    try:
+        counts = generate(args.output, args.teachers, args.seed,
+                          progress=lambda text: print(text, file=sys.stderr, flush=True))
+    except (OSError, sqlite3.Error) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    print(f"已生成 {args.output}: 共 {sum(counts.values())} 行，用时 {time.perf_counter() - started:.1f} 秒")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+# 基准测试
+# 在模拟数据库上计时主要操作，结果写成 JSON，便于比较不同版本
+# 用法(在程序目录中执行):
+#     python -m benchmarks.run --scale 1000 10000 --output results.json
+#     python -m benchmarks.run --scale 10000 --compare results.json
+# 各操作与界面中的实现使用相同的查询和模块，不创建 Tk 窗口；写入类操作在数据库副本上执行
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cascade
+import db_connection
+import db_schema
+import search_index
+import stats_store
+from dossier import load_dossier
+from virtual_list import KeysetSource
+
+from benchmarks import datagen
+
+
+DATA_DIR = os.path.join(tempfile.gettempdir(), "teacher_archive_bench")
+
+# 列表页面每屏显示的行数
+SCREEN_ROWS = 30
+
+TEACHER_ORDER = [("name", False, False), ("teacher_id", False)]
+
+
+# 一次测试用到的数据库和样本
+class Context:
+    def __init__(self, path, work_path, temp_dir, seed):
+        self.path = path
+        self.work_path = work_path
+        self.temp_dir = temp_dir
+        self.conn = db_connection.connect(path)
+        db_schema.ensure_schema(self.conn)
+        self.work = db_connection.connect(work_path)
+        db_schema.ensure_schema(self.work)
+        rng = random.Random(seed)
+        rows = self.conn.execute("SELECT teacher_id, name, id_number FROM teacher_info ORDER BY rowid").fetchall()
+        self.teachers = rows
+        self.total = len(rows)
+        self.sample = [rng.choice(rows) for _ in range(50)]
+        self.rng = rng
+        # 获奖最多的教师(删除时关联行最多)
+        self.busy_teachers = [row[0] for row in self.conn.execute("""
+            SELECT teacher_id FROM award_recipients GROUP BY teacher_id ORDER BY COUNT(*) DESC LIMIT 20
+            """)]
+
+    def close(self):
+        self.conn.close()
+        self.work.close()
+
+
+# 教师列表: 打开页面(总数 + 第一屏)
+def bench_load_teacher_data(ctx):
+    source = KeysetSource(ctx.conn, db_schema.sql("teacher_list"), order_by=TEACHER_ORDER)
+    source.count()
+    source.rows(0, SCREEN_ROWS)
+
+
+# 教师列表: 拖动滚动条到中间后向下翻 5 屏
+def bench_scroll_teacher_list(ctx):
+    source = KeysetSource(ctx.conn, db_schema.sql("teacher_list"), order_by=TEACHER_ORDER)
+    top = source.count() // 2
+    for screen in range(6):
+        source.rows(top + screen * SCREEN_ROWS, top + (screen + 1) * SCREEN_ROWS)
+
+
+def _search(ctx, keyword, columns=("name", "id_number")):
+    clause, params = search_index.match_clause(ctx.conn, "teacher", keyword, columns=columns)
+    source = KeysetSource(ctx.conn, db_schema.sql("teacher_list") + " WHERE " + clause, params,
+                          order_by=TEACHER_ORDER)
+    source.count()
+    source.rows(0, SCREEN_ROWS)
+
+
+# 按姓名搜索(两个字的姓名短于全文检索的最小长度，走 LIKE)
+def bench_search_teacher_name(ctx):
+    _search(ctx, ctx.rng.choice(ctx.sample)[1][:2])
+
+
+# 按身份证号片段搜索(全文检索)
+def bench_search_teacher_id_number(ctx):
+    _search(ctx, ctx.rng.choice(ctx.sample)[2][6:14])
+
+
+# 教师详情窗口读取的全部档案
+def bench_teacher_details(ctx):
+    load_dossier(ctx.conn, ctx.rng.choice(ctx.sample)[0])
+
+
+# 综合表彰页面: 按级别筛选后的第一屏
+def bench_awards_filter(ctx):
+    source = KeysetSource(ctx.conn, db_schema.sql("award_list") + " WHERE a.award_level = ? GROUP BY a.award_id",
+                          ("市级",), order_by=db_schema.AWARD_LIST_ORDER)
+    source.count()
+    source.rows(0, SCREEN_ROWS)
+
+
+# 教学比武页面: 按姓名和级别筛选
+def bench_teachingfight_filter(ctx):
+    name = ctx.rng.choice(ctx.sample)[1]
+    query = (db_schema.sql("teachingfight_list") + " AND t.name LIKE ? AND a.award_level = ?"
+             " ORDER BY " + db_schema.AWARD_LEVEL_RANK)
+    ctx.conn.execute(query, (f"%{name[0]}%", "校级")).fetchall()
+
+
+# 删除获奖较多的教师及其全部关联记录(在副本上执行后回滚)
+def bench_delete_teacher(ctx):
+    _delete(ctx, [ctx.rng.choice(ctx.busy_teachers)])
+
+
+# 一次删除 500 位教师(如一届教师整体调离)
+def bench_delete_teachers_batch(ctx):
+    _delete(ctx, [row[0] for row in ctx.rng.sample(ctx.teachers, min(500, ctx.total))])
+
+
+def _delete(ctx, teacher_ids):
+    conn = ctx.work
+    conn.execute("BEGIN")
+    try:
+        cascade.delete_teachers(conn, teacher_ids)
+    finally:
+        conn.rollback()
+
+
+# 导入 5000 行教学工作情况(CSV，写入副本)
+def bench_import(ctx):
+    import importer
+    path = os.path.join(ctx.temp_dir, "import.csv")
+    if not os.path.exists(path):
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["姓名", "身份证号", "学年", "学期", "学科", "任教班级", "学生人数", "周课时数"])
+            for _ in range(5000):
+                _, name, id_number = ctx.rng.choice(ctx.teachers)
+                writer.writerow([name, id_number, "2025-2026", "第一学期", "数学", "1年级1班", 45, 12])
+    report = importer.run_import(ctx.work, "教学工作情况", path)
+    if report.errors:
+        raise RuntimeError(f"导入出错: {report.errors[0]}")
+
+
+# 导出全部教师基本信息和教学工作情况(CSV)
+def bench_export(ctx):
+    import exporter
+    sheets = [exporter.table_sheet("教师基本信息"), exporter.table_sheet("教学工作情况")]
+    report = exporter.run_export(ctx.conn, sheets, os.path.join(ctx.temp_dir, "export.csv"))
+    exporter._remove(report.paths)
+
+
+# 统计分析页面的全部分布和表彰计数
+def bench_statistics(ctx):
+    for dimension in stats_store.TEACHER_DIMENSIONS:
+        stats_store.teacher_distribution(ctx.conn, dimension)
+    for dimension in stats_store.AWARD_DIMENSIONS:
+        stats_store.award_counts(ctx.conn, dimension)
+
+
+# 获奖排名(需要 pandas)
+def bench_award_ranking(ctx):
+    import award_analytics
+    award_analytics.award_ranking(ctx.conn, max_rank=3)
+
+
+# 名称 -> (函数, 需要的可选模块)
+BENCHMARKS = {
+    "load_teacher_data": (bench_load_teacher_data, None),
+    "scroll_teacher_list": (bench_scroll_teacher_list, None),
+    "search_teacher_name": (bench_search_teacher_name, None),
+    "search_teacher_id_number": (bench_search_teacher_id_number, None),
+    "teacher_details": (bench_teacher_details, None),
+    "awards_filter": (bench_awards_filter, None),
+    "teachingfight_filter": (bench_teachingfight_filter, None),
+    "delete_teacher": (bench_delete_teacher, None),
+    "delete_teachers_batch": (bench_delete_teachers_batch, None),
+    "import": (bench_import, None),
+    "export": (bench_export, None),
+    "statistics": (bench_statistics, None),
+    "award_ranking": (bench_award_ranking, "pandas"),
+}
+
+
+def _missing(module):
+    if module is None:
+        return None
+    try:
+        __import__(module)
+    except ImportError:
+        return module
+    return None
+
+
+# 计时 func(ctx)，先执行一次预热，返回各次用时(毫秒)
+def measure(func, ctx, repeat):
+    func(ctx)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(ctx)
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def summarize(times):
+    ordered = sorted(times)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, -(-len(ordered) * 95 // 100) - 1)], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+    }
+
+
+# 准备某一规模的数据库(已生成的直接复用)，返回 (数据库, 写入用的副本)
+def prepare(scale, seed, data_dir, regenerate=False, progress=None):
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"bench_{scale}_{seed}.db")
+    if regenerate or not os.path.exists(path):
+        if progress is not None:
+            progress(f"生成 {scale} 名教师的模拟数据库 {path}")
+        datagen.generate(path, scale, seed, progress=progress)
+    # 合并 WAL 后再复制，副本才是完整的数据库
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    work_path = os.path.join(data_dir, f"bench_{scale}_{seed}.work.db")
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(work_path + suffix):
+            os.remove(work_path + suffix)
+    shutil.copyfile(path, work_path)
+    return path, work_path
+
+
+def run(scales, names, repeat, seed, data_dir, regenerate=False, progress=None):
+    results = []
+    for scale in scales:
+        path, work_path = prepare(scale, seed, data_dir, regenerate, progress)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ctx = Context(path, work_path, temp_dir, seed)
+            try:
+                for name in names:
+                    func, requires = BENCHMARKS[name]
+                    entry = {"scale": scale, "operation": name}
+                    missing = _missing(requires)
+                    if missing:
+                        entry["skipped"] = f"需要 {missing}"
+                    else:
+                        entry.update(summarize(measure(func, ctx, repeat)))
+                    results.append(entry)
+                    if progress is not None:
+                        progress(_format(entry))
+            finally:
+                ctx.close()
+        os.remove(work_path)
+    return results
+
+
+def _format(entry):
+    if "skipped" in entry:
+        return f"{entry['scale']:>7} {entry['operation']:<26} 跳过({entry['skipped']})"
+    return (f"{entry['scale']:>7} {entry['operation']:<26} 中位数 {entry['median_ms']:>9.2f} ms"
+            f"  p95 {entry['p95_ms']:>9.2f} ms  最短 {entry['min_ms']:>9.2f} ms")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(seed, repeat):
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+    }
+
+
+# 与之前的结果比较中位数，输出变化比例
+def compare(results, baseline):
+    previous = {(r["scale"], r["operation"]): r for r in baseline["results"]}
+    lines = []
+    for entry in results:
+        old = previous.get((entry["scale"], entry["operation"]))
+        if old is None or "median_ms" not in old or "median_ms" not in entry:
+            continue
+        change = (entry["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0.0
+        lines.append(f"{entry['scale']:>7} {entry['operation']:<26} {old['median_ms']:>9.2f} -> "
+                     f"{entry['median_ms']:>9.2f} ms ({change:+.0f}%)")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="教师档案管理系统基准测试")
+    parser.add_argument("--scale", type=int, nargs="+", default=[datagen.SCALES[0]],
+                        help=f"教师人数，可指定多个(预设 {', '.join(map(str, datagen.SCALES))})")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="只运行指定的测试")
+    parser.add_argument("--repeat", type=int, default=10, help="每项测试的执行次数(默认 %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="模拟数据的随机数种子(默认 %(default)s)")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="模拟数据库的存放目录(默认 %(default)s)")
+    parser.add_argument("--regenerate", action="store_true", help="重新生成模拟数据库")
+    parser.add_argument("--output", help="把结果写入此 JSON 文件(默认输出到标准输出)")
+    parser.add_argument("--compare", help="与此 JSON 文件中的结果比较")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    report = environment(args.seed, args.repeat)
+    report["results"] = run(args.scale, args.only or list(BENCHMARKS), args.repeat, args.seed, args.data_dir,
+                            args.regenerate, progress=lambda text: print(text, file=sys.stderr, flush=True))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if baseline is not None:
+        print(f"与 {args.compare}(提交 {baseline.get('commit')})比较中位数:", file=sys.stderr)
+        for line in compare(report["results"], baseline):
+            print(line, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
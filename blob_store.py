@@ -0,0 +1,233 @@
+# 照片、扫描件存储
+# 文件按内容的 sha256 存放在 blobs/前两位/sha256.扩展名，同一文件上传多次只保存一份
+# teacher_info.photo_path、education.scan_file_path 对文件的引用数由触发器记录在 blob_refs 表中
+# 引用数降为 0 的文件由 collect_garbage() 删除(连同缩略图)，不再在删除记录时直接删文件
+# 上传后表单尚未保存的文件登记在 blob_pending 表中(hold)，保存前不会被回收
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+import thumbnails
+
+
+BLOB_DIR = "blobs"
+
+# 新写入(或重复上传)的文件在此时间(秒)内不会被回收，避免删除刚放入存储、尚未登记的文件
+GRACE_PERIOD = 600
+
+# 上传后超过此时间(秒)仍未保存的文件视为已放弃(如程序异常退出)，可以回收
+PENDING_EXPIRY = 7 * 24 * 3600
+
+# 引用文件的列: (表, 列)
+REFERENCES = (
+    ("teacher_info", "photo_path"),
+    ("education", "scan_file_path"),
+)
+
+_BLOB_NAME_RE = re.compile(r"^[0-9a-f]{64}(\.\w+)?$")
+
+_TABLES = [
+    # 文件路径 -> 引用数(也包括 photos/、scans/ 下的旧文件)
+    """
+    CREATE TABLE IF NOT EXISTS blob_refs (
+        path TEXT PRIMARY KEY,
+        ref_count INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_blob_refs_unused ON blob_refs (ref_count) WHERE ref_count <= 0",
+]
+
+# 上传后表单尚未保存的文件: 路径 -> 上传时间
+_PENDING_TABLE = """
+    CREATE TABLE IF NOT EXISTS blob_pending (
+        path TEXT PRIMARY KEY,
+        since REAL NOT NULL
+    )
+    """
+
+
+def _add_ref(value):
+    return (f"INSERT INTO blob_refs (path, ref_count) SELECT {value}, 1 WHERE {value} IS NOT NULL "
+            f"ON CONFLICT (path) DO UPDATE SET ref_count = ref_count + 1; ")
+
+
+def _release_ref(value):
+    return f"UPDATE blob_refs SET ref_count = ref_count - 1 WHERE path = {value}; "
+
+
+def _triggers():
+    triggers = []
+    for table, column in REFERENCES:
+        triggers += [
+            f"""
+            CREATE TRIGGER IF NOT EXISTS blob_{table}_insert
+            AFTER INSERT ON {table} WHEN NEW.{column} IS NOT NULL
+            BEGIN {_add_ref(f"NEW.{column}")}END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS blob_{table}_update
+            AFTER UPDATE OF {column} ON {table} WHEN OLD.{column} IS NOT NEW.{column}
+            BEGIN {_add_ref(f"NEW.{column}")}{_release_ref(f"OLD.{column}")}END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS blob_{table}_delete
+            AFTER DELETE ON {table} WHEN OLD.{column} IS NOT NULL
+            BEGIN {_release_ref(f"OLD.{column}")}END
+            """,
+        ]
+    return triggers
+
+
+# 建表、建触发器并按现有记录计算引用数(数据库迁移时调用)
+def create_all(conn):
+    for statement in _TABLES + _triggers():
+        conn.execute(statement)
+    create_pending(conn)
+    conn.execute("DELETE FROM blob_refs")
+    refs = " UNION ALL ".join(f"SELECT {column} AS path FROM {table} WHERE {column} IS NOT NULL"
+                              for table, column in REFERENCES)
+    conn.execute(f"INSERT INTO blob_refs (path, ref_count) SELECT path, COUNT(*) FROM ({refs}) GROUP BY path")
+
+
+# 建立未保存上传的登记表(数据库迁移时调用)
+def create_pending(conn):
+    conn.execute(_PENDING_TABLE)
+
+
+# 登记上传后尚未保存的文件，在保存(被引用)或超过 PENDING_EXPIRY 之前不会被回收
+# 表单可能长时间不保存(页面离开后仍保留)，不能只靠 GRACE_PERIOD 保护
+def hold(conn, path):
+    with conn:
+        conn.execute("INSERT INTO blob_pending (path, since) VALUES (?, ?) "
+                     "ON CONFLICT (path) DO UPDATE SET since = excluded.since", (path, time.time()))
+
+
+# 是否为存储中的文件(文件名为 sha256)
+def is_blob(path):
+    return _BLOB_NAME_RE.match(os.path.basename(path)) is not None
+
+
+def _find(digest):
+    # 同一内容只保存一份，扩展名以第一次上传的为准
+    for path in glob.glob(os.path.join(BLOB_DIR, digest[:2], digest + "*")):
+        if is_blob(path):
+            return path
+    return None
+
+
+# 把文件放入存储，返回 (存储路径, sha256)
+# 复制时同时计算 sha256，只读一遍原文件；内容已存在时丢弃副本，直接返回已有的文件
+def put(source):
+    os.makedirs(BLOB_DIR, exist_ok=True)
+    temp = os.path.join(BLOB_DIR, f".{os.getpid()}_{time.monotonic_ns()}.tmp")
+    sha = hashlib.sha256()
+    try:
+        with open(source, "rb") as src, open(temp, "wb") as dst:
+            for block in iter(lambda: src.read(1 << 20), b""):
+                sha.update(block)
+                dst.write(block)
+        digest = sha.hexdigest()
+        path = _find(digest)
+        if path is None:
+            path = os.path.join(BLOB_DIR, digest[:2], digest + os.path.splitext(source)[1].lower())
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp, path)
+        else:
+            os.remove(temp)
+            # 更新修改时间，回收时按新上传的文件对待
+            os.utime(path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+    thumbnails.remember_digest(path, digest)
+    return path, digest
+
+
+# 把 photos/、scans/ 等旧目录中仍被引用的文件移入存储，并修改引用；返回移入的文件数
+# 旧文件在引用改完后引用数为 0，由 collect_garbage() 删除
+def adopt_legacy(conn):
+    refs = " UNION ".join(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL" for table, column in REFERENCES)
+    legacy = [path for (path,) in conn.execute(refs) if not is_blob(path) and os.path.isfile(path)]
+    if not legacy:
+        return 0
+    moved = {}
+    for path in legacy:
+        try:
+            moved[path] = put(path)[0]
+        except OSError:
+            # 无法读取的文件保持原样，下次再试
+            continue
+    try:
+        for table, column in REFERENCES:
+            conn.executemany(f"UPDATE {table} SET {column} = ? WHERE {column} = ?",
+                             [(new, old) for old, new in moved.items()])
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return len(moved)
+
+
+def _recent(path, now, grace):
+    try:
+        return now - os.stat(path).st_mtime < grace
+    except FileNotFoundError:
+        return False
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    if is_blob(path):
+        digest = os.path.basename(path)[:64]
+        for thumb in glob.glob(os.path.join(thumbnails.THUMB_DIR, digest[:2], digest + "_*")):
+            os.remove(thumb)
+
+
+# 回收结果
+class GarbageReport:
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+
+
+# 删除引用数为 0 的文件及其缩略图；sweep=True 时还会清理存储目录中未登记的文件(如上传后放弃保存的)
+# 在 grace 秒内写入的文件、登记为尚未保存的上传保留到下次回收
+def collect_garbage(conn, sweep=False, grace=GRACE_PERIOD):
+    report = GarbageReport()
+    now = time.time()
+    own_transaction = not conn.in_transaction
+    # 已保存(被引用)或已放弃的上传不再登记
+    conn.execute("DELETE FROM blob_pending WHERE since < ? "
+                 "OR path IN (SELECT path FROM blob_refs WHERE ref_count > 0)", (now - PENDING_EXPIRY,))
+    pending = {path for (path,) in conn.execute("SELECT path FROM blob_pending")}
+    released = []
+    for (path,) in conn.execute("SELECT path FROM blob_refs WHERE ref_count <= 0").fetchall():
+        if path in pending or _recent(path, now, grace):
+            continue
+        if os.path.isfile(path):
+            report.files += 1
+            report.bytes += os.path.getsize(path)
+            _remove_file(path)
+        released.append((path,))
+    if sweep and os.path.isdir(BLOB_DIR):
+        known = {os.path.normcase(os.path.normpath(path))
+                 for (path,) in conn.execute("SELECT path FROM blob_refs UNION SELECT path FROM blob_pending")}
+        for path in glob.glob(os.path.join(BLOB_DIR, "*", "*")) + glob.glob(os.path.join(BLOB_DIR, ".*.tmp")):
+            if os.path.normcase(os.path.normpath(path)) in known or _recent(path, now, grace):
+                continue
+            report.files += 1
+            report.bytes += os.path.getsize(path)
+            _remove_file(path)
+    # 同时可能有新的引用，只删除仍为 0 的
+    conn.executemany("DELETE FROM blob_refs WHERE path = ? AND ref_count <= 0", released)
+    if own_transaction:
+        conn.commit()
+    return report
+
@@ -0,0 +1,135 @@
+# 级联删除
+# 按数据表中声明的外键(PRAGMA foreign_key_list)生成删除计划: 先删除引用要删除记录的子表行，再删除记录本身
+# 每张表一条集合删除语句，要删除的主键以 JSON 数组传入，一次可删除任意多条记录
+# 关联表另一端只被该关联表引用的记录(如只属于被删教师的表彰、课题)失去全部关联后一并删除
+# 照片、扫描件的引用计数由触发器维护，文件由 blob_store.collect_garbage 在之后清理
+import json
+import sqlite3
+
+
+# 删除计划的一步
+class Step:
+    def __init__(self, table, sql, orphans=()):
+        self.table = table
+        self.sql = sql
+        # 关联表的另一端: (表名, 删除前收集主键的语句, 删除失去关联的记录的语句)
+        self.orphans = orphans
+
+
+# 删除结果
+class DeleteReport:
+    def __init__(self):
+        # 表名 -> 删除的行数
+        self.rows = {}
+
+    @property
+    def total(self):
+        return sum(self.rows.values())
+
+    def add(self, table, count):
+        if count > 0:
+            self.rows[table] = self.rows.get(table, 0) + count
+
+
+# 外键元数据: 被引用表 -> [(子表, 子表列, 被引用列)]
+def foreign_keys(conn):
+    references = {}
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    for table in tables:
+        for row in conn.execute(f"PRAGMA foreign_key_list({table})"):
+            parent, column, parent_column = row[2], row[3], row[4]
+            if parent_column is None:
+                parent_column = _primary_key(conn, parent)
+            references.setdefault(parent, []).append((table, column, parent_column))
+    return references
+
+
+def _primary_key(conn, table):
+    columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[5]]
+    return columns[0] if len(columns) == 1 else "rowid"
+
+
+def _outgoing(references, table):
+    return [(parent, column, parent_column) for parent, children in references.items()
+            for child, column, parent_column in children if child == table]
+
+
+# 生成删除 table 中 key_column 属于 :keys 的记录的计划(子表在前)
+def build_plan(conn, table, key_column=None):
+    references = foreign_keys(conn)
+    key_column = key_column or _primary_key(conn, table)
+    steps = []
+    _plan(references, table, f"{key_column} IN (SELECT value FROM json_each(:keys))", steps, {table})
+    return steps
+
+
+def _plan(references, table, condition, steps, path):
+    # 先删除引用本表要删除行的子表行(同一子表的多个外键合并为一个条件，如青蓝工程的师傅和徒弟)
+    children = {}
+    for child, column, parent_column in references.get(table, ()):
+        # 自引用或环不再展开
+        if child not in path:
+            children.setdefault(child, []).append(
+                f"{column} IN (SELECT {parent_column} FROM {table} WHERE {condition})")
+    for child, terms in children.items():
+        _plan(references, child, " OR ".join(terms), steps, path | {child})
+
+    orphans = []
+    for parent, column, parent_column in _outgoing(references, table):
+        if parent in path or _outgoing(references, parent) or len(references.get(parent, ())) != 1:
+            continue
+        # 关联表另一端只被本表引用的记录
+        collect = f"SELECT DISTINCT {column} FROM {table} WHERE {condition}"
+        delete = (f"DELETE FROM {parent} WHERE {parent_column} IN (SELECT value FROM json_each(:orphans)) "
+                  f"AND NOT EXISTS (SELECT 1 FROM {table} x WHERE x.{column} = {parent}.{parent_column})")
+        orphans.append((parent, collect, delete))
+    steps.append(Step(table, f"DELETE FROM {table} WHERE {condition}", orphans))
+
+
+# 删除计划只与数据库结构有关，按(数据库文件, 表, 列)缓存
+_plans = {}
+
+
+def plan_for(conn, table, key_column=None):
+    database = conn.execute("PRAGMA database_list").fetchone()[2] or id(conn)
+    key = (database, table, key_column)
+    if key not in _plans:
+        _plans[key] = build_plan(conn, table, key_column)
+    return _plans[key]
+
+
+# 删除 table 中主键(或 key_column)属于 keys 的记录及其全部关联记录，返回 DeleteReport
+# 没有外部事务时自行开启并提交，出错时回滚；在外部事务中调用时由调用方提交
+def delete(conn, table, keys, key_column=None):
+    report = DeleteReport()
+    keys = list(keys)
+    if not keys:
+        return report
+    params = {"keys": json.dumps(keys, ensure_ascii=False)}
+    own_transaction = not conn.in_transaction
+    try:
+        if own_transaction:
+            conn.execute("BEGIN")
+        for step in plan_for(conn, table, key_column):
+            orphans = []
+            for parent, collect, delete_orphans in step.orphans:
+                ids = [row[0] for row in conn.execute(collect, params) if row[0] is not None]
+                orphans.append((parent, delete_orphans, ids))
+            report.add(step.table, conn.execute(step.sql, params).rowcount)
+            for parent, delete_orphans, ids in orphans:
+                if ids:
+                    cursor = conn.execute(delete_orphans, {"orphans": json.dumps(ids, ensure_ascii=False)})
+                    report.add(parent, cursor.rowcount)
+        if own_transaction:
+            conn.execute("COMMIT")
+    except sqlite3.Error:
+        if own_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    return report
+
+
+# 删除教师及其全部档案
+def delete_teachers(conn, teacher_ids):
+    return delete(conn, "teacher_info", teacher_ids)
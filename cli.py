@@ -0,0 +1,220 @@
+# 命令行入口(无界面)
+# 只初始化数据库，不创建 Tk 窗口，可在服务器上由计划任务定时执行
+# 各子命令用到的模块在执行时才导入，pandas、matplotlib、Pillow 只在需要时加载
+# 用法(在程序目录中执行，照片、扫描件路径相对于程序目录):
+#     python cli.py import 教学工作情况 教学工作.xlsx --errors 错误.csv
+#     python cli.py export 全部档案.xlsx
+#     python cli.py stats --ranking --max-rank 3
+#     python cli.py reindex
+#     python cli.py check --gc
+#     python cli.py backup backup/teacher_archive.db --files backup/blobs
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import db_connection
+import db_schema
+
+
+def open_database(path):
+    conn = db_connection.connect(path)
+    db_connection.enable_wal(conn)
+    db_schema.ensure_schema(conn)
+    return conn
+
+
+def _progress(text):
+    # 进度写到标准错误，标准输出只保留结果
+    print(text, file=sys.stderr, flush=True)
+
+
+def cmd_import(conn, args):
+    import importer
+    report = importer.run_import(conn, args.target, args.file, chunk_size=args.chunk_size,
+                                 progress=lambda r: _progress(f"已处理 {r.total} 行，导入 {r.imported} 行"))
+    print(report.summary())
+    if report.errors and args.errors:
+        importer.write_error_report(report, args.errors)
+        print(f"错误行已保存到 {args.errors}")
+    return 1 if report.errors else 0
+
+
+def cmd_export(conn, args):
+    import exporter
+    if args.teacher:
+        sheets = exporter.dossier_sheets(args.teacher)
+    else:
+        names = args.table or list(exporter.TABLE_EXPORTS)
+        unknown = [name for name in names if name not in exporter.TABLE_EXPORTS]
+        if unknown:
+            raise ValueError(f"未知的数据表: {', '.join(unknown)}，可选: {', '.join(exporter.TABLE_EXPORTS)}")
+        sheets = [exporter.table_sheet(name) for name in names]
+    report = exporter.run_export(conn, sheets, args.output,
+                                 progress=lambda r: _progress(f"已导出 {r.written} / {r.total} 行"))
+    print(report.summary())
+    for path in report.paths:
+        print(path)
+    return 0
+
+
+def cmd_stats(conn, args):
+    import stats_store
+    titles = {
+        "birth_decade": "出生年代", "current_title": "职称", "highest_degree": "最高学历",
+        "award_level": "获奖级别", "award_year": "获奖年度", "award_type": "奖项类型",
+    }
+    for dimension in stats_store.TEACHER_DIMENSIONS:
+        print(f"[教师{titles[dimension]}分布]")
+        for value, count in stats_store.teacher_distribution(conn, dimension):
+            print(f"{value}\t{count}")
+    for dimension in stats_store.AWARD_DIMENSIONS:
+        print(f"[{titles[dimension]}统计] 证书数\t获奖人次")
+        for value, awards, recipients in stats_store.award_counts(conn, dimension):
+            print(f"{value}\t{awards}\t{recipients}")
+    if args.ranking:
+        import award_analytics
+        table = award_analytics.award_ranking(conn, args.award_type, args.max_rank)
+        print("[获奖排名(同一获奖按最高级别统计)]")
+        print(table.drop(columns="teacher_id").to_string(index=False))
+    return 0
+
+
+def cmd_reindex(conn, args):
+    import blob_store
+    import search_index
+    import stats_store
+    started = time.perf_counter()
+    search_index.rebuild(conn)
+    # 重新计算统计汇总表和文件引用数
+    with conn:
+        stats_store.create_all(conn)
+        blob_store.create_all(conn)
+    stats_store.refresh(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+    print(f"已重建全文检索索引、统计汇总表和文件引用计数，用时 {time.perf_counter() - started:.1f} 秒")
+    return 0
+
+
+def cmd_check(conn, args):
+    import blob_store
+    problems = []
+    result = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+    if result != ["ok"]:
+        problems += [f"数据库损坏: {line}" for line in result]
+    orphans = {}
+    for table, _, parent, _ in conn.execute("PRAGMA foreign_key_check"):
+        orphans[(table, parent)] = orphans.get((table, parent), 0) + 1
+    problems += [f"{table} 中有 {count} 行引用了不存在的 {parent} 记录" for (table, parent), count in orphans.items()]
+    try:
+        db_schema.check_query_plans(conn)
+    except db_schema.QueryPlanError as e:
+        # 数据量很小时 SQLite 也可能选择全表扫描，只作提示
+        print(f"提示: {e}")
+    missing = [path for (path,) in conn.execute("SELECT path FROM blob_refs WHERE ref_count > 0")
+               if not os.path.isfile(path)]
+    problems += [f"文件不存在: {path}" for path in missing]
+    for problem in problems:
+        print(problem)
+    if args.gc:
+        report = blob_store.collect_garbage(conn, sweep=True)
+        print(f"已删除 {report.files} 个不再使用的文件，释放 {report.bytes / 1024 / 1024:.1f} MB")
+    if not problems:
+        print("检查通过")
+    return 1 if problems else 0
+
+
+def cmd_backup(conn, args):
+    import shutil
+    import blob_store
+    started = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(directory, exist_ok=True)
+    # 在线备份: 备份过程中程序仍可读写，得到的是一致的快照
+    temp = args.output + ".tmp"
+    target = sqlite3.connect(temp)
+    try:
+        conn.backup(target, pages=1024)
+    finally:
+        target.close()
+    os.replace(temp, args.output)
+    print(f"数据库已备份到 {args.output}")
+    if args.files:
+        # 文件按内容命名，已备份过的文件内容不会变化，只复制新增的文件
+        copied = skipped = 0
+        for root, _, files in os.walk(blob_store.BLOB_DIR):
+            for name in files:
+                if not blob_store.is_blob(name):
+                    continue
+                source = os.path.join(root, name)
+                dest = os.path.join(args.files, os.path.relpath(source, blob_store.BLOB_DIR))
+                if os.path.exists(dest):
+                    skipped += 1
+                    continue
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                shutil.copy2(source, dest)
+                copied += 1
+        print(f"照片、扫描件: 新复制 {copied} 个，已存在 {skipped} 个")
+    print(f"用时 {time.perf_counter() - started:.1f} 秒")
+    return 0
+
+
+def build_parser():
+    import importer
+    parser = argparse.ArgumentParser(prog="cli.py", description="教师档案管理系统命令行工具")
+    parser.add_argument("--db", default=db_connection.DB_PATH, help="数据库文件(默认 %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sub = commands.add_parser("import", help="从 Excel/CSV 批量导入")
+    sub.add_argument("target", choices=list(importer.IMPORT_TARGETS), help="导入对象")
+    sub.add_argument("file", help="Excel(.xlsx) 或 CSV 文件")
+    sub.add_argument("--errors", help="把出错的行保存到此 CSV 文件")
+    sub.add_argument("--chunk-size", type=int, default=5000, help="每次提交的行数")
+    sub.set_defaults(handler=cmd_import)
+
+    sub = commands.add_parser("export", help="导出到 Excel/CSV")
+    sub.add_argument("output", help="输出文件(.xlsx 或 .csv)")
+    sub.add_argument("--table", action="append", help="只导出指定的数据表(可多次指定)，默认全部")
+    sub.add_argument("--teacher", action="append", help="导出指定教师ID的完整档案(可多次指定)")
+    sub.set_defaults(handler=cmd_export)
+
+    sub = commands.add_parser("stats", help="输出统计结果")
+    sub.add_argument("--ranking", action="store_true", help="同时输出获奖排名(需要 pandas)")
+    sub.add_argument("--award-type", help="获奖排名只统计此类型的奖项")
+    sub.add_argument("--max-rank", type=int, help="获奖排名只统计名次不超过此值的获奖")
+    sub.set_defaults(handler=cmd_stats)
+
+    sub = commands.add_parser("reindex", help="重建全文检索索引、统计汇总表和文件引用计数")
+    sub.set_defaults(handler=cmd_reindex)
+
+    sub = commands.add_parser("check", help="检查数据库完整性、查询计划和照片扫描件")
+    sub.add_argument("--gc", action="store_true", help="同时删除不再使用的照片、扫描件")
+    sub.set_defaults(handler=cmd_check)
+
+    sub = commands.add_parser("backup", help="在线备份数据库")
+    sub.add_argument("output", help="备份的数据库文件")
+    sub.add_argument("--files", help="同时把照片、扫描件增量备份到此目录")
+    sub.set_defaults(handler=cmd_backup)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        conn = open_database(args.db)
+    except sqlite3.Error as e:
+        print(f"无法打开数据库 {args.db}: {e}", file=sys.stderr)
+        return 2
+    try:
+        return args.handler(conn, args)
+    except (ValueError, OSError, sqlite3.Error, ImportError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
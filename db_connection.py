@@ -0,0 +1,110 @@
+# 数据库连接管理
+# 数据库使用 WAL 模式，读不阻塞写、写也不阻塞读，后台导入、导出、筛选时界面仍可正常读写
+# 界面线程使用主连接读取；后台线程各自使用只读连接读取
+# 后台写入以及界面中经 UnitOfWork 的保存、级联删除都通过唯一的写连接依次进行(writing())
+# 界面中其余的单条修改仍在主连接上提交，是第二个写入者: 靠 WAL 和 busy_timeout 等待写锁，
+# 导入只在每块写入时持有写锁，等待不会超过一块的写入时间
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+DB_PATH = "teacher_archive.db"
+
+# 等待其他连接释放写锁的时间(毫秒)，超时才报“database is locked”
+BUSY_TIMEOUT = 5000
+
+# 每个连接打开时设置
+PRAGMAS = (
+    # WAL 模式下只在检查点时同步磁盘，断电不会损坏数据库(最多丢失最近提交的事务)
+    "PRAGMA synchronous = NORMAL",
+    # 页缓存 32MB(负数单位为 KB)
+    "PRAGMA cache_size = -32000",
+    # 用内存映射读取数据库文件，减少系统调用和复制
+    "PRAGMA mmap_size = 268435456",
+    # 排序、临时索引放在内存中
+    "PRAGMA temp_store = MEMORY",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT}",
+)
+
+
+# 打开一个已设置好的连接；readonly 为 True 时禁止写入
+# check_same_thread=False 的连接允许其他线程调用 interrupt() 或 close()
+# factory: 连接类(如 instrumentation.InstrumentedConnection，记录每条查询的耗时)
+def connect(db_path=DB_PATH, readonly=False, check_same_thread=True, factory=sqlite3.Connection):
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT / 1000, check_same_thread=check_same_thread,
+                           factory=factory)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+# 切换为 WAL 模式(记录在数据库文件中，只需设置一次)，返回当前的日志模式
+def enable_wal(conn):
+    return conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+
+
+class ConnectionManager:
+    def __init__(self, db_path=DB_PATH, factory=sqlite3.Connection):
+        self.db_path = db_path
+        self.factory = factory
+        # 界面线程的连接
+        self.main = connect(db_path, factory=factory)
+        enable_wal(self.main)
+        self._local = threading.local()
+        # [(线程, 连接)]，线程结束后其连接在下次分配时关闭
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._writer = None
+        # 写连接的锁，同一时间只有一个线程使用写连接
+        self.write_lock = threading.RLock()
+
+    # 当前线程的只读连接(后台线程使用)
+    def reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.db_path, readonly=True, check_same_thread=False,
+                                                  factory=self.factory)
+            with self._readers_lock:
+                alive = []
+                for thread, reader in self._readers:
+                    if thread.is_alive():
+                        alive.append((thread, reader))
+                    else:
+                        reader.close()
+                alive.append((threading.current_thread(), conn))
+                self._readers = alive
+        return conn
+
+    # 写连接，使用时须持有 write_lock(一般通过 writing())
+    def writer(self):
+        with self.write_lock:
+            if self._writer is None:
+                self._writer = connect(self.db_path, check_same_thread=False, factory=self.factory)
+            return self._writer
+
+    # 写入: 同一时间只有一个线程使用写连接，正常结束时提交，出错时回滚
+    # with manager.writing() as conn: ...
+    @contextmanager
+    def writing(self):
+        with self.write_lock:
+            conn = self.writer()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def close(self):
+        with self._readers_lock:
+            for _, reader in self._readers:
+                reader.close()
+            self._readers = []
+        with self.write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        self.main.close()
@@ -0,0 +1,510 @@
+# 数据库结构版本管理
+# 通过 PRAGMA user_version 记录已执行的迁移版本，新增索引等结构变更都以迁移的形式追加到 MIGRATIONS 末尾
+import re
+import sqlite3
+import sys
+
+import blob_store
+import query_cache
+import search_index
+import stats_store
+
+
+# 查询计划检查失败
+class QueryPlanError(Exception):
+    pass
+
+
+# 数据表(按依赖顺序)
+TABLES = [
+    # 教师基本信息
+    """
+    CREATE TABLE IF NOT EXISTS teacher_info (
+        teacher_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        gender TEXT,
+        birth_date TEXT,
+        ethnicity TEXT,
+        hometown TEXT,
+        id_number TEXT UNIQUE,
+        photo_path TEXT,
+        party_join_date TEXT,
+        work_start_date TEXT,
+        health_status TEXT,
+        teaching_subject TEXT,
+        current_position TEXT,
+        create_time TEXT,
+        update_time TEXT
+    )
+    """,
+    # 职称信息
+    """
+    CREATE TABLE IF NOT EXISTS title_history (
+        record_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        title TEXT,
+        obtain_date TEXT,
+        post TEXT,
+        appointment_date TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 教育背景
+    """
+    CREATE TABLE IF NOT EXISTS education (
+        record_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        edu_type TEXT,
+        degree TEXT,
+        institution TEXT,
+        obtain_date TEXT,
+        scan_file_path TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 工作简历
+    """
+    CREATE TABLE IF NOT EXISTS work_experience (
+        record_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        start_date TEXT,
+        end_date TEXT,
+        organization TEXT,
+        position TEXT,
+        description TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 教学工作情况
+    """
+    CREATE TABLE IF NOT EXISTS teaching_records (
+        record_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        academic_year TEXT,
+        semester TEXT,
+        subject TEXT,
+        classes TEXT,
+        student_count INTEGER,
+        weekly_hours INTEGER,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 教育工作情况
+    """
+    CREATE TABLE IF NOT EXISTS education_work (
+        record_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        academic_year TEXT,
+        semester TEXT,
+        work_type TEXT,
+        description TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 综合表彰
+    """
+    CREATE TABLE IF NOT EXISTS awards (
+        award_id TEXT PRIMARY KEY,
+        award_name TEXT,
+        award_level TEXT,
+        award_unit TEXT,
+        award_date TEXT,
+        award_type TEXT,
+        create_time TEXT,
+        update_time TEXT
+    )
+    """,
+    # 获奖人员关联
+    """
+    CREATE TABLE IF NOT EXISTS award_recipients (
+        relation_id TEXT PRIMARY KEY,
+        award_id TEXT,
+        teacher_id TEXT,
+        rank INTEGER,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (award_id) REFERENCES awards (award_id),
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 公开课管理
+    """
+    CREATE TABLE IF NOT EXISTS public_lessons (
+        lesson_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        lesson_name TEXT,
+        lesson_scope TEXT,
+        lesson_date TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 论文管理
+    """
+    CREATE TABLE IF NOT EXISTS papers (
+        paper_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        paper_title TEXT,
+        journal_name TEXT,
+        paper_level TEXT,
+        publish_date TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 课题管理
+    """
+    CREATE TABLE IF NOT EXISTS research_projects (
+        project_id TEXT PRIMARY KEY,
+        project_name TEXT,
+        project_level TEXT,
+        completion_date TEXT,
+        create_time TEXT,
+        update_time TEXT
+    )
+    """,
+    # 课题成员
+    """
+    CREATE TABLE IF NOT EXISTS project_members (
+        relation_id TEXT PRIMARY KEY,
+        project_id TEXT,
+        teacher_id TEXT,
+        is_leader BOOLEAN,
+        member_rank INTEGER,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (project_id) REFERENCES research_projects (project_id),
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 学生竞赛辅导
+    """
+    CREATE TABLE IF NOT EXISTS student_competitions (
+        competition_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        competition_name TEXT,
+        winner_count INTEGER,
+        award_level TEXT,
+        competition_date TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 青蓝工程
+    """
+    CREATE TABLE IF NOT EXISTS mentoring (
+        mentoring_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        apprentice_id TEXT,
+        start_date TEXT,
+        end_date TEXT,
+        achievements TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id),
+        FOREIGN KEY (apprentice_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 专业引领
+    """
+    CREATE TABLE IF NOT EXISTS professional_leadership (
+        leadership_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        leadership_type TEXT,
+        description TEXT,
+        start_date TEXT,
+        end_date TEXT,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+    # 考试成绩
+    """
+    CREATE TABLE IF NOT EXISTS exam_results (
+        result_id TEXT PRIMARY KEY,
+        teacher_id TEXT,
+        exam_name TEXT,
+        exam_date TEXT,
+        rank INTEGER,
+        class_average REAL,
+        create_time TEXT,
+        update_time TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
+    )
+    """,
+]
+
+
+# 迁移列表: (版本号, 说明, SQL语句或函数列表)，版本号必须递增，已发布的迁移不要再修改
+MIGRATIONS = [
+    (1, "外键及排序列索引", [
+        # 教师基本信息
+        "CREATE INDEX IF NOT EXISTS idx_teacher_info_name ON teacher_info (name)",
+        # 教师档案各子表: 外键 + 排序列
+        "CREATE INDEX IF NOT EXISTS idx_title_history_teacher ON title_history (teacher_id, obtain_date)",
+        "CREATE INDEX IF NOT EXISTS idx_education_teacher ON education (teacher_id, obtain_date)",
+        "CREATE INDEX IF NOT EXISTS idx_work_experience_teacher ON work_experience (teacher_id, start_date)",
+        "CREATE INDEX IF NOT EXISTS idx_teaching_records_teacher ON teaching_records (teacher_id, academic_year, semester)",
+        "CREATE INDEX IF NOT EXISTS idx_education_work_teacher ON education_work (teacher_id, academic_year, semester)",
+        "CREATE INDEX IF NOT EXISTS idx_education_work_year ON education_work (academic_year, semester)",
+        "CREATE INDEX IF NOT EXISTS idx_public_lessons_teacher ON public_lessons (teacher_id, lesson_date)",
+        "CREATE INDEX IF NOT EXISTS idx_papers_teacher ON papers (teacher_id, publish_date)",
+        "CREATE INDEX IF NOT EXISTS idx_student_competitions_teacher ON student_competitions (teacher_id, competition_date)",
+        "CREATE INDEX IF NOT EXISTS idx_professional_leadership_teacher ON professional_leadership (teacher_id, start_date)",
+        "CREATE INDEX IF NOT EXISTS idx_mentoring_teacher ON mentoring (teacher_id, start_date)",
+        "CREATE INDEX IF NOT EXISTS idx_mentoring_apprentice ON mentoring (apprentice_id)",
+        # 表彰及获奖人员(关联表索引包含全部查询列，可直接覆盖)
+        "CREATE INDEX IF NOT EXISTS idx_awards_date ON awards (award_date)",
+        "CREATE INDEX IF NOT EXISTS idx_awards_type ON awards (award_type, award_date)",
+        "CREATE INDEX IF NOT EXISTS idx_award_recipients_teacher ON award_recipients (teacher_id, award_id, rank)",
+        "CREATE INDEX IF NOT EXISTS idx_award_recipients_award ON award_recipients (award_id, teacher_id, rank)",
+        # 课题及课题成员
+        "CREATE INDEX IF NOT EXISTS idx_research_projects_date ON research_projects (completion_date)",
+        "CREATE INDEX IF NOT EXISTS idx_project_members_teacher ON project_members (teacher_id, project_id, is_leader, member_rank)",
+        "CREATE INDEX IF NOT EXISTS idx_project_members_project ON project_members (project_id, is_leader, teacher_id)",
+        # 考试成绩
+        "CREATE INDEX IF NOT EXISTS idx_exam_results_exam ON exam_results (exam_name, exam_date)",
+        "CREATE INDEX IF NOT EXISTS idx_exam_results_teacher ON exam_results (teacher_id, exam_date)",
+        "ANALYZE",
+    ]),
+    (2, "全文检索索引", [
+        search_index.create_all,
+    ]),
+    (3, "统计汇总表", [
+        stats_store.create_all,
+    ]),
+    (4, "照片、扫描件引用计数", [
+        blob_store.create_all,
+    ]),
+    (5, "数据表修改版本(查询结果缓存)", [
+        lambda conn: query_cache.create_all(conn, table_names()),
+    ]),
+    (6, "教师列表排序索引(姓名, 教师ID)，虚拟列表翻页不再排序全部教师", [
+        "CREATE INDEX IF NOT EXISTS idx_teacher_info_name_id ON teacher_info (name, teacher_id)",
+        "DROP INDEX IF EXISTS idx_teacher_info_name",
+    ]),
+    (7, "上传后尚未保存的文件", [
+        blob_store.create_pending,
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+# 数据表名(按 TABLES 的顺序)
+def table_names():
+    return [re.search(r"CREATE TABLE IF NOT EXISTS (\w+)", statement).group(1) for statement in TABLES]
+
+
+# 获取当前数据库结构版本
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+# 创建数据表并执行尚未应用的迁移，返回结构版本
+# 结构已是最新版本时(正常启动)不再执行建表语句
+def ensure_schema(conn):
+    current = get_schema_version(conn)
+    if current >= SCHEMA_VERSION:
+        return current
+    for statement in TABLES:
+        conn.execute(statement)
+    conn.commit()
+    return migrate(conn)
+
+
+# 执行尚未应用的迁移，每个迁移在单独的事务中完成
+def migrate(conn):
+    current = get_schema_version(conn)
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN")
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        current = version
+    return current
+
+
+# 表彰按级别从高到低排序的表达式(列表页面和教学比武页面共用)
+AWARD_LEVEL_RANK = "CASE award_level " + " ".join(
+    f"WHEN '{level}' THEN {i}" for i, level in enumerate(stats_store.AWARD_LEVELS, start=1)) + " ELSE 6 END"
+
+# 综合表彰列表的排序键(虚拟列表 order_by): 级别、时间倒序、表彰ID
+AWARD_LIST_ORDER = [(AWARD_LEVEL_RANK, False, False), ("award_date", True), ("award_id", False)]
+
+
+# 程序中使用的查询，统一放在这里以便检查执行计划
+# 每项为 (SQL, 允许全表扫描的表/别名)
+QUERIES = {
+    # 教师详情各选项卡
+    "teacher_basic": ("SELECT * FROM teacher_info WHERE teacher_id = ?", ()),
+    "teacher_titles": ("SELECT * FROM title_history WHERE teacher_id = ? ORDER BY obtain_date DESC", ()),
+    "teacher_education": ("SELECT * FROM education WHERE teacher_id = ? ORDER BY obtain_date DESC", ()),
+    "teacher_work_experience": ("SELECT * FROM work_experience WHERE teacher_id = ? ORDER BY start_date DESC", ()),
+    "teacher_teaching": ("""
+        SELECT academic_year, semester, subject, classes, student_count, weekly_hours
+        FROM teaching_records
+        WHERE teacher_id = ?
+        ORDER BY academic_year DESC, semester DESC
+        """, ()),
+    "teacher_edu_work": ("""
+        SELECT academic_year, semester, work_type, description
+        FROM education_work
+        WHERE teacher_id = ?
+        ORDER BY academic_year DESC, semester DESC
+        """, ()),
+    "teacher_honors": ("""
+        SELECT a.award_name, a.award_level, a.award_unit, a.award_date, a.award_type, ar.rank
+        FROM awards a
+        JOIN award_recipients ar ON a.award_id = ar.award_id
+        WHERE ar.teacher_id = ?
+        ORDER BY a.award_date DESC
+        """, ()),
+    "teacher_lessons": ("""
+        SELECT lesson_name, lesson_scope, lesson_date
+        FROM public_lessons
+        WHERE teacher_id = ?
+        ORDER BY lesson_date DESC
+        """, ()),
+    "teacher_papers": ("""
+        SELECT paper_title, journal_name, paper_level, publish_date
+        FROM papers
+        WHERE teacher_id = ?
+        ORDER BY publish_date DESC
+        """, ()),
+    "teacher_projects": ("""
+        SELECT rp.project_name, rp.project_level, rp.completion_date, pm.is_leader, pm.member_rank
+        FROM research_projects rp
+        JOIN project_members pm ON rp.project_id = pm.project_id
+        WHERE pm.teacher_id = ?
+        ORDER BY rp.completion_date DESC
+        """, ()),
+    "teacher_competitions": ("""
+        SELECT competition_name, winner_count, award_level, competition_date
+        FROM student_competitions
+        WHERE teacher_id = ?
+        ORDER BY competition_date DESC
+        """, ()),
+    "teacher_mentoring": ("""
+        SELECT t.name, m.start_date, m.end_date, m.achievements
+        FROM mentoring m
+        JOIN teacher_info t ON m.apprentice_id = t.teacher_id
+        WHERE m.teacher_id = ?
+        ORDER BY m.start_date DESC
+        """, ()),
+    # 列表页面(外层表需要全部读出，只检查关联表是否走索引；排序由虚拟列表分页时指定)
+    "teacher_list": ("""
+        SELECT teacher_id, name, gender, birth_date, ethnicity, hometown, id_number, teaching_subject
+        FROM teacher_info
+        """, ("teacher_info",)),
+    "teaching_list": ("""
+        SELECT t.teacher_id, t.name, t.teaching_subject,
+               COUNT(DISTINCT tr.classes) as class_count
+        FROM teacher_info t
+        LEFT JOIN teaching_records tr ON t.teacher_id = tr.teacher_id
+        GROUP BY t.teacher_id
+        """, ("t",)),
+    "papers_list": ("""
+        SELECT t.teacher_id, t.name, COUNT(p.paper_id) as paper_count
+        FROM teacher_info t
+        LEFT JOIN papers p ON t.teacher_id = p.teacher_id
+        GROUP BY t.teacher_id, t.name
+        """, ("t",)),
+    # 综合表彰: 调用方加上筛选条件和 GROUP BY a.award_id，排序由虚拟列表分页时指定
+    "award_list": ("""
+        SELECT a.award_id, a.award_name, a.award_level, a.award_unit, a.award_date, GROUP_CONCAT(t.name) as teachers
+        FROM awards a
+        LEFT JOIN award_recipients ar ON a.award_id = ar.award_id
+        LEFT JOIN teacher_info t ON ar.teacher_id = t.teacher_id
+        """, ("a",)),
+    # 教学比武获奖人员: 调用方以 AND 追加筛选条件，并按 AWARD_LEVEL_RANK 排序
+    "teachingfight_list": ("""
+        SELECT t.name, a.award_name, a.award_level, a.award_date, a.award_id, ar.relation_id
+        FROM awards a
+        JOIN award_recipients ar ON a.award_id = ar.award_id
+        JOIN teacher_info t ON ar.teacher_id = t.teacher_id
+        WHERE a.award_type = '教学比武'
+        """, ()),
+    "projects_list": ("""
+        SELECT rp.project_id, rp.project_name, rp.project_level, rp.completion_date,
+               ti.name as leader_name
+        FROM research_projects rp
+        LEFT JOIN project_members pm ON rp.project_id = pm.project_id AND pm.is_leader = 1
+        LEFT JOIN teacher_info ti ON pm.teacher_id = ti.teacher_id
+        ORDER BY rp.completion_date DESC
+        """, ("rp",)),
+    "exam_list": ("""
+        SELECT DISTINCT exam_name, exam_date
+        FROM exam_results
+        GROUP BY exam_name, exam_date
+        ORDER BY exam_date DESC
+        """, ("exam_results",)),
+}
+
+
+# 按名称取已登记查询的SQL
+def sql(name):
+    return QUERIES[name][0]
+
+
+# 返回查询计划中每一步的描述
+def explain(conn, query):
+    # 参数只影响取值不影响计划，用空值占位即可
+    params = (None,) * query.count("?")
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query, params)]
+
+
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+
+# 检查所有已登记查询的执行计划，出现未允许的全表扫描时抛出 QueryPlanError
+def check_query_plans(conn, queries=None):
+    queries = QUERIES if queries is None else queries
+    problems = []
+    for name, (query, allowed) in queries.items():
+        for detail in explain(conn, query):
+            match = _SCAN_RE.match(detail)
+            if match and match.group(1) not in allowed:
+                problems.append(f"{name}: {detail}")
+    if problems:
+        raise QueryPlanError("以下查询未使用索引:\n" + "\n".join(problems))
+    return True
+
+
+if __name__ == "__main__":
+    # 用法: python db_schema.py [数据库文件]
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "teacher_archive.db"
+    connection = sqlite3.connect(db_path)
+    try:
+        print(f"数据库结构版本: {ensure_schema(connection)}")
+        check_query_plans(connection)
+        print(f"已检查 {len(QUERIES)} 条查询，均使用索引")
+    except QueryPlanError as e:
+        print(e)
+        sys.exit(1)
+    finally:
+        connection.close()
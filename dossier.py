@@ -0,0 +1,47 @@
+# 教师档案读取
+# 在一个读事务中取出某位教师的全部档案数据，供详情窗口各选项卡使用
+from collections import namedtuple
+
+import db_schema
+
+
+# 档案各部分及对应的查询(见 db_schema.QUERIES)
+SECTIONS = (
+    ("titles", "teacher_titles"),
+    ("education", "teacher_education"),
+    ("work_experience", "teacher_work_experience"),
+    ("teaching", "teacher_teaching"),
+    ("edu_work", "teacher_edu_work"),
+    ("honors", "teacher_honors"),
+    ("lessons", "teacher_lessons"),
+    ("papers", "teacher_papers"),
+    ("projects", "teacher_projects"),
+    ("competitions", "teacher_competitions"),
+    ("mentoring", "teacher_mentoring"),
+)
+
+# 教师档案(只读)，basic 为 teacher_info 的一行，其余各部分为行元组
+TeacherDossier = namedtuple("TeacherDossier", ["teacher_id", "basic"] + [name for name, _ in SECTIONS])
+
+
+# 读取教师档案，教师不存在时返回 None
+def load_dossier(conn, teacher_id):
+    cursor = conn.cursor()
+    # 没有外部事务时自行开启读事务，保证各部分数据来自同一快照
+    own_transaction = not conn.in_transaction
+    if own_transaction:
+        cursor.execute("BEGIN")
+    try:
+        cursor.execute(db_schema.sql("teacher_basic"), (teacher_id,))
+        basic = cursor.fetchone()
+        if basic is None:
+            return None
+        sections = {}
+        for name, query in SECTIONS:
+            cursor.execute(db_schema.sql(query), (teacher_id,))
+            sections[name] = tuple(cursor.fetchall())
+    finally:
+        if own_transaction:
+            cursor.execute("COMMIT")
+        cursor.close()
+    return TeacherDossier(teacher_id=teacher_id, basic=basic, **sections)
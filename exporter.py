@@ -0,0 +1,272 @@
+# 数据导出
+# 查询结果按块从游标直接写入只写模式的 Excel 工作簿或 CSV 文件，内存占用与导出行数无关
+# 导出在后台线程中进行，导出内容用 SQL 描述，由后台线程自己的连接执行
+import csv
+import json
+import os
+import time
+
+
+# 导出的一个工作表
+# rows(conn) 返回行的迭代器，count(conn) 返回总行数(用于显示进度)
+class ExportSheet:
+    def __init__(self, title, headers, rows, count=None):
+        self.title = title
+        self.headers = headers
+        self.rows = rows
+        self.count = count
+
+
+# 按查询导出，indexes 为要导出的结果列序号(默认全部)
+def query_sheet(title, headers, sql, params=(), indexes=None, fetch_size=1000):
+    params = tuple(params)
+
+    def rows(conn):
+        cursor = conn.execute(sql, params)
+        try:
+            while True:
+                chunk = cursor.fetchmany(fetch_size)
+                if not chunk:
+                    break
+                if indexes is None:
+                    yield from chunk
+                else:
+                    for row in chunk:
+                        yield tuple(row[i] for i in indexes)
+        finally:
+            cursor.close()
+
+    def count(conn):
+        return conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+    return ExportSheet(title, headers, rows, count)
+
+
+# 导出已在内存中的行(如普通 Treeview 中显示的数据)
+def rows_sheet(title, headers, rows):
+    rows = list(rows)
+    return ExportSheet(title, headers, lambda conn: iter(rows), lambda conn: len(rows))
+
+
+# 整表导出: 名称 -> (表头, 查询, 教师ID列, 排序)，查询中教师表的别名均为 t
+TABLE_EXPORTS = {
+    "教师基本信息": (
+        ("姓名", "性别", "出生年月", "民族", "籍贯", "身份证号", "入党时间", "参加工作时间", "健康状况", "任教学科", "现任职务"),
+        """
+        SELECT t.name, t.gender, t.birth_date, t.ethnicity, t.hometown, t.id_number, t.party_join_date,
+               t.work_start_date, t.health_status, t.teaching_subject, t.current_position
+        FROM teacher_info t
+        """,
+        "t.teacher_id", "t.name, t.teacher_id"),
+    "职称信息": (
+        ("姓名", "职称", "取得时间", "岗位", "聘任时间"),
+        """
+        SELECT t.name, x.title, x.obtain_date, x.post, x.appointment_date
+        FROM title_history x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.obtain_date"),
+    "教育背景": (
+        ("姓名", "类型", "学位", "院校", "取得时间"),
+        """
+        SELECT t.name, x.edu_type, x.degree, x.institution, x.obtain_date
+        FROM education x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.obtain_date"),
+    "工作简历": (
+        ("姓名", "开始时间", "结束时间", "单位", "职务", "说明"),
+        """
+        SELECT t.name, x.start_date, x.end_date, x.organization, x.position, x.description
+        FROM work_experience x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.start_date"),
+    "教学工作情况": (
+        ("姓名", "学年", "学期", "学科", "任教班级", "学生人数", "周课时数"),
+        """
+        SELECT t.name, x.academic_year, x.semester, x.subject, x.classes, x.student_count, x.weekly_hours
+        FROM teaching_records x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.academic_year, x.semester"),
+    "教育工作情况": (
+        ("姓名", "学年", "学期", "工作类型", "工作描述"),
+        """
+        SELECT t.name, x.academic_year, x.semester, x.work_type, x.description
+        FROM education_work x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.academic_year, x.semester"),
+    "获奖情况": (
+        ("姓名", "奖项名称", "获奖级别", "颁奖单位", "获奖时间", "奖项类型", "获奖等第"),
+        """
+        SELECT t.name, a.award_name, a.award_level, a.award_unit, a.award_date, a.award_type, x.rank
+        FROM award_recipients x
+        JOIN awards a ON x.award_id = a.award_id
+        JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, a.award_date"),
+    "公开课": (
+        ("姓名", "课程名称", "范围", "时间"),
+        """
+        SELECT t.name, x.lesson_name, x.lesson_scope, x.lesson_date
+        FROM public_lessons x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.lesson_date"),
+    "论文": (
+        ("姓名", "论文题目", "期刊名称", "级别", "发表时间"),
+        """
+        SELECT t.name, x.paper_title, x.journal_name, x.paper_level, x.publish_date
+        FROM papers x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.publish_date"),
+    "课题": (
+        ("姓名", "课题名称", "级别", "结题时间", "角色", "排名"),
+        """
+        SELECT t.name, rp.project_name, rp.project_level, rp.completion_date,
+               CASE WHEN x.is_leader THEN '主持人' ELSE '成员' END, x.member_rank
+        FROM project_members x
+        JOIN research_projects rp ON x.project_id = rp.project_id
+        JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, rp.completion_date"),
+    "学生竞赛辅导": (
+        ("姓名", "竞赛名称", "获奖人数", "获奖级别", "竞赛时间"),
+        """
+        SELECT t.name, x.competition_name, x.winner_count, x.award_level, x.competition_date
+        FROM student_competitions x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.competition_date"),
+    "青蓝工程": (
+        ("师傅", "徒弟", "开始时间", "结束时间", "成果"),
+        """
+        SELECT t.name, ap.name, x.start_date, x.end_date, x.achievements
+        FROM mentoring x
+        JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        LEFT JOIN teacher_info ap ON x.apprentice_id = ap.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.start_date"),
+    "专业引领": (
+        ("姓名", "引领类型", "说明", "开始时间", "结束时间"),
+        """
+        SELECT t.name, x.leadership_type, x.description, x.start_date, x.end_date
+        FROM professional_leadership x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.start_date"),
+    "考试成绩": (
+        ("姓名", "考试名称", "考试时间", "名次", "班级均分"),
+        """
+        SELECT t.name, x.exam_name, x.exam_date, x.rank, x.class_average
+        FROM exam_results x JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """,
+        "x.teacher_id", "t.name, t.teacher_id, x.exam_date"),
+}
+
+
+# 整表导出的工作表
+def table_sheet(name):
+    headers, sql, _, order_by = TABLE_EXPORTS[name]
+    return query_sheet(name, headers, f"{sql} ORDER BY {order_by}")
+
+
+# 教师档案导出: 每部分一个工作表，只包含指定的教师，同一教师的记录排在一起
+def dossier_sheets(teacher_ids):
+    # 教师ID列表以 JSON 数组传入，避免参数个数超过 SQLite 的上限
+    ids = json.dumps(list(teacher_ids), ensure_ascii=False)
+    sheets = []
+    for name, (headers, sql, teacher_column, order_by) in TABLE_EXPORTS.items():
+        query = f"{sql} WHERE {teacher_column} IN (SELECT value FROM json_each(?)) ORDER BY {order_by}"
+        sheets.append(query_sheet(name, headers, query, (ids,)))
+    return sheets
+
+
+# 导出结果
+class ExportReport:
+    def __init__(self, total):
+        self.total = total
+        self.written = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.cancelled = False
+        self.paths = []
+
+    def summary(self):
+        if self.cancelled:
+            return "导出已取消，已删除未完成的文件"
+        rate = self.written / self.elapsed if self.elapsed else 0.0
+        return f"共导出 {self.written} 行，用时 {self.elapsed:.1f} 秒({rate:.0f} 行/秒)"
+
+
+# Excel 单元格不允许的控制字符
+def _xlsx_value(value):
+    if isinstance(value, str):
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    return value
+
+
+# 导出到文件，按扩展名选择 Excel(.xlsx) 或 CSV；CSV 导出多个工作表时每个工作表一个文件
+# progress(report) 每写入 progress_every 行调用一次；cancelled() 返回 True 时停止并删除已写的文件
+def run_export(conn, sheets, path, progress=None, cancelled=None, progress_every=5000):
+    total = 0
+    for sheet in sheets:
+        total += sheet.count(conn) if sheet.count is not None else 0
+    report = ExportReport(total)
+
+    def rows_of(sheet):
+        for row in sheet.rows(conn):
+            report.written += 1
+            if report.written % progress_every == 0:
+                report.elapsed = time.perf_counter() - report.started
+                if progress is not None:
+                    progress(report)
+                if cancelled is not None and cancelled():
+                    report.cancelled = True
+                    return
+            yield row
+
+    try:
+        if path.lower().endswith(".xlsx"):
+            _write_xlsx(path, sheets, rows_of, report)
+        else:
+            _write_csv(path, sheets, rows_of, report)
+    except BaseException:
+        _remove(report.paths)
+        raise
+    if report.cancelled:
+        _remove(report.paths)
+    report.elapsed = time.perf_counter() - report.started
+    return report
+
+
+def _write_xlsx(path, sheets, rows_of, report):
+    from openpyxl import Workbook
+    # 只写模式逐行写出，不在内存中保留单元格
+    workbook = Workbook(write_only=True)
+    for sheet in sheets:
+        worksheet = workbook.create_sheet(sheet.title[:31])
+        worksheet.append(sheet.headers)
+        for row in rows_of(sheet):
+            worksheet.append([_xlsx_value(v) for v in row])
+        if report.cancelled:
+            return
+    report.paths.append(path)
+    workbook.save(path)
+
+
+def _write_csv(path, sheets, rows_of, report):
+    base, ext = os.path.splitext(path)
+    for sheet in sheets:
+        sheet_path = path if len(sheets) == 1 else f"{base}_{sheet.title}{ext or '.csv'}"
+        report.paths.append(sheet_path)
+        # 带 BOM 的 UTF-8，Excel 打开时不会乱码
+        with open(sheet_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(sheet.headers)
+            writer.writerows(rows_of(sheet))
+        if report.cancelled:
+            return
+
+
+def _remove(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
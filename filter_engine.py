@@ -0,0 +1,85 @@
+# 实时筛选
+# 输入防抖，查询通过异步数据层在后台执行，只显示最新一次筛选的结果，并缓存最近的筛选结果
+from collections import OrderedDict
+
+
+class FilterEngine:
+    # widget: 结果所在的控件，用于 after 调度，控件销毁时筛选停止
+    # db: 异步数据层(async_db.AsyncDB)
+    # build_query(): 在界面线程读取筛选条件，返回 (sql, params)
+    # apply_result(rows): 在界面线程显示结果
+    def __init__(self, widget, db, build_query, apply_result, delay=250, cache_size=32):
+        self.widget = widget
+        self.db = db
+        self.build_query = build_query
+        self.apply_result = apply_result
+        self.delay = delay
+        self.cache_size = cache_size
+
+        self._cache = OrderedDict()
+        self._cache_epoch = 0
+        self._pending_after = None
+        self._request = None
+        self._closed = False
+
+        widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    # 筛选条件变化时调用，停止输入 delay 毫秒后才查询
+    def schedule(self, *args):
+        if self._closed:
+            return
+        if self._pending_after is not None:
+            self.widget.after_cancel(self._pending_after)
+        self._pending_after = self.widget.after(self.delay, self.refresh)
+
+    # 立即按当前条件查询
+    def refresh(self, *args):
+        if self._closed:
+            return
+        if self._pending_after is not None:
+            self.widget.after_cancel(self._pending_after)
+            self._pending_after = None
+
+        sql, params = self.build_query()
+        key = (sql, tuple(params))
+
+        # 新查询开始后，正在执行的旧查询已没有意义
+        self._cancel()
+
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.apply_result(self._cache[key])
+            return
+
+        epoch = self._cache_epoch
+        # 重新打开页面时(新的筛选器没有本地缓存)由查询结果缓存提供未修改过的数据
+        self._request = self.db.query(sql, params, on_done=lambda rows: self._done(epoch, key, rows), cached=True)
+
+    # 数据被修改后清空缓存
+    def invalidate(self):
+        self._cache.clear()
+        # 修改前已开始的查询，结果不再放入缓存
+        self._cache_epoch += 1
+
+    def _cancel(self):
+        if self._request is not None:
+            self._request.cancel()
+            self._request = None
+
+    # 界面线程: 显示后台查询结果
+    def _done(self, epoch, key, rows):
+        self._request = None
+        if epoch == self._cache_epoch:
+            self._cache[key] = rows
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        self.apply_result(rows)
+
+    def _on_destroy(self, event):
+        if event.widget is not self.widget:
+            return
+        self._closed = True
+        self._cancel()
+        if self._pending_after is not None:
+            self.widget.after_cancel(self._pending_after)
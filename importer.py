@@ -0,0 +1,400 @@
+# 批量导入
+# 逐行流式读取 Excel/CSV，校验并转换后按块用 executemany 写入，每块一个事务
+# 出错的行记入导入报告，不影响其余行的导入
+import contextlib
+import csv
+import os
+import sqlite3
+import time
+import uuid
+from datetime import date, datetime
+
+
+# 导入文件格式错误(缺少必需的列、无法读取等)，整个文件无法导入
+class ImportFileError(ValueError):
+    pass
+
+
+# 单元格转换，失败时抛出 ValueError，错误信息写入报告
+def _text(value):
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def _int(value):
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        raise ValueError(f"“{value}”不是整数")
+
+
+def _float(value):
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"“{value}”不是数字")
+
+
+def _date(value):
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    value = _text(value)
+    if value is None:
+        return None
+    for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d", "%Y%m%d", "%Y-%m", "%Y/%m", "%Y.%m"):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        return parsed.strftime("%Y-%m-%d" if "%d" in fmt else "%Y-%m")
+    raise ValueError(f"“{value}”不是有效日期")
+
+
+# 导入报告
+class ImportReport:
+    def __init__(self):
+        self.total = 0
+        self.imported = 0
+        # [(行号, 错误信息)]，行号与表格中的行号一致
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.cancelled = False
+
+    # 每秒导入行数
+    @property
+    def rate(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        text = f"共 {self.total} 行，成功导入 {self.imported} 行，失败 {len(self.errors)} 行，用时 {self.elapsed:.1f} 秒({self.rate:.0f} 行/秒)"
+        if self.cancelled:
+            text = "导入已取消。" + text
+        return text
+
+
+# 导入对象: 表格列与数据表列的对应关系
+class ImportTarget:
+    def __init__(self, name, table, id_column, fields):
+        self.name = name
+        self.table = table
+        self.id_column = id_column
+        # [(表头(可有多个别名), 列名, 转换, 是否必填)]，姓名列用于查找教师，不写入数据表
+        self.fields = fields
+
+    # 根据表头确定各字段所在的列，返回 [(字段, 列序号)]
+    def bind(self, header):
+        header = [_text(h) or "" for h in header]
+        bound = []
+        missing = []
+        for field in self.fields:
+            names = field[0]
+            index = next((header.index(n) for n in names if n in header), None)
+            if index is None:
+                if field[3]:
+                    missing.append(names[0])
+                continue
+            bound.append((field, index))
+        if missing:
+            raise ImportFileError(f"{self.name}表格缺少必需的列: {'、'.join(missing)}")
+        return bound
+
+    # 读取一行，返回 {列名: 值}
+    def convert(self, bound, values):
+        record = {}
+        for (names, column, convert, required), index in bound:
+            value = values[index] if index < len(values) else None
+            try:
+                value = convert(value)
+            except ValueError as e:
+                raise ValueError(f"{names[0]}: {e}")
+            if value is None and required:
+                raise ValueError(f"{names[0]}不能为空")
+            record[column] = value
+        return record
+
+    # 导入开始前读取需要的数据
+    def prepare(self, conn):
+        columns = [f[1] for f in self.fields if f[1] not in ("name", "id_number")]
+        self.columns = [self.id_column, "teacher_id"] + columns
+        placeholders = ", ".join("?" * len(self.columns))
+        self.insert_sql = (f"INSERT INTO {self.table} ({', '.join(self.columns)}, create_time, update_time) "
+                           f"VALUES ({placeholders}, ?, ?)")
+
+    # 把转换后的一行变为插入参数
+    def row(self, record, teacher_id, now):
+        record[self.id_column] = str(uuid.uuid4())
+        record["teacher_id"] = teacher_id
+        return tuple(record.get(c) for c in self.columns) + (now, now)
+
+    # 写入一块数据，返回 [(行号, 错误信息)]
+    def write(self, conn, rows):
+        params = [p for _, p in rows]
+        try:
+            with conn:
+                conn.executemany(self.insert_sql, params)
+            return []
+        except sqlite3.IntegrityError:
+            pass
+        # 整块写入失败时逐行写入，找出出错的行
+        errors = []
+        with conn:
+            for row_no, p in rows:
+                try:
+                    conn.execute(self.insert_sql, p)
+                except sqlite3.IntegrityError as e:
+                    errors.append((row_no, f"写入失败: {e}"))
+        return errors
+
+
+# 表彰: 每行一位获奖人，奖项名称、级别、颁奖单位、时间、类型都相同的行属于同一个奖项
+class AwardImportTarget(ImportTarget):
+    _AWARD_COLUMNS = ("award_name", "award_level", "award_unit", "award_date", "award_type")
+
+    def prepare(self, conn):
+        self.award_ids = {}
+        for row in conn.execute("SELECT award_id, award_name, award_level, award_unit, award_date, "
+                                "IFNULL(award_type, '综合表彰') FROM awards"):
+            self.award_ids.setdefault(tuple(row[1:]), row[0])
+        self.recipients = set(conn.execute("SELECT award_id, teacher_id FROM award_recipients").fetchall())
+
+    def row(self, record, teacher_id, now):
+        if record.get("award_type") is None:
+            record["award_type"] = "综合表彰"
+        key = tuple(record.get(c) for c in self._AWARD_COLUMNS)
+        return key, teacher_id, record.get("rank"), now
+
+    _INSERT_AWARD = """
+        INSERT INTO awards (award_id, award_name, award_level, award_unit, award_date, award_type, create_time, update_time)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+    _INSERT_RECIPIENT = """
+        INSERT INTO award_recipients (relation_id, award_id, teacher_id, rank, create_time, update_time)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+
+    def write(self, conn, rows):
+        errors = []
+        # 本块新建的奖项、获奖人，写入成功后才记入 award_ids、recipients
+        award_ids = {}
+        recipients = set()
+        # [(行号, 奖项键, 新奖项参数或 None, 获奖人参数)]
+        planned = []
+        for row_no, (key, teacher_id, rank, now) in rows:
+            award_id = self.award_ids.get(key) or award_ids.get(key)
+            award = None
+            if award_id is None:
+                award_id = award_ids[key] = str(uuid.uuid4())
+                award = (award_id,) + key + (now, now)
+            if (award_id, teacher_id) in self.recipients or (award_id, teacher_id) in recipients:
+                errors.append((row_no, "该教师的这条获奖记录已存在"))
+                continue
+            recipients.add((award_id, teacher_id))
+            planned.append((row_no, key, award, (str(uuid.uuid4()), award_id, teacher_id, rank, now, now)))
+
+        try:
+            with conn:
+                conn.executemany(self._INSERT_AWARD, [award for _, _, award, _ in planned if award is not None])
+                conn.executemany(self._INSERT_RECIPIENT, [recipient for _, _, _, recipient in planned])
+            written_awards = {key: award[0] for _, key, award, _ in planned if award is not None}
+            written_recipients = {(recipient[1], recipient[2]) for _, _, _, recipient in planned}
+        except sqlite3.IntegrityError:
+            # 整块写入失败时逐行写入，找出出错的行
+            written_awards = {}
+            written_recipients = set()
+            with conn:
+                for row_no, key, award, recipient in planned:
+                    try:
+                        if award is not None:
+                            conn.execute(self._INSERT_AWARD, award)
+                            written_awards[key] = award[0]
+                        conn.execute(self._INSERT_RECIPIENT, recipient)
+                        written_recipients.add((recipient[1], recipient[2]))
+                    except sqlite3.IntegrityError as e:
+                        errors.append((row_no, f"写入失败: {e}"))
+        self.award_ids.update(written_awards)
+        self.recipients.update(written_recipients)
+        return errors
+
+
+# 查找教师用的列，各导入对象共用
+_TEACHER_FIELDS = [
+    (("姓名", "教师姓名"), "name", _text, True),
+    (("身份证号",), "id_number", _text, False),
+]
+
+IMPORT_TARGETS = {
+    "教学工作情况": ImportTarget("教学工作情况", "teaching_records", "record_id", _TEACHER_FIELDS + [
+        (("学年",), "academic_year", _text, True),
+        (("学期",), "semester", _text, True),
+        (("学科", "任教学科"), "subject", _text, False),
+        (("任教班级", "班级"), "classes", _text, False),
+        (("学生人数", "班级人数"), "student_count", _int, False),
+        (("周课时数", "周课时"), "weekly_hours", _int, False),
+    ]),
+    "教育工作情况": ImportTarget("教育工作情况", "education_work", "record_id", _TEACHER_FIELDS + [
+        (("学年",), "academic_year", _text, True),
+        (("学期",), "semester", _text, False),
+        (("工作类型", "职务"), "work_type", _text, True),
+        (("工作描述", "描述"), "description", _text, False),
+    ]),
+    "考试成绩": ImportTarget("考试成绩", "exam_results", "result_id", _TEACHER_FIELDS + [
+        (("考试名称",), "exam_name", _text, True),
+        (("考试时间", "考试日期"), "exam_date", _date, False),
+        (("名次", "排名"), "rank", _int, False),
+        (("班级均分", "均分"), "class_average", _float, False),
+    ]),
+    "综合表彰": AwardImportTarget("综合表彰", "awards", "award_id", _TEACHER_FIELDS + [
+        (("奖项名称",), "award_name", _text, True),
+        (("获奖级别", "级别"), "award_level", _text, True),
+        (("颁奖单位",), "award_unit", _text, False),
+        (("获奖时间", "获奖日期"), "award_date", _date, False),
+        (("奖项类型",), "award_type", _text, False),
+        (("获奖等第", "排名", "名次"), "rank", _int, False),
+    ]),
+}
+
+
+# 逐行读取表格，先返回表头，之后返回 (行号, 值列表)
+def read_rows(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportFileError("读取 Excel 文件需要安装 openpyxl")
+        # 只读模式按行流式读取，不把整个工作表载入内存
+        # 文件损坏时 zipfile、XML 解析器、openpyxl 抛出的错误各不相同，统一转为 ImportFileError
+        try:
+            workbook = load_workbook(path, read_only=True, data_only=True)
+        except OSError:
+            raise
+        except Exception as e:
+            raise ImportFileError(f"无法读取 Excel 文件: {e}") from e
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            row_no = 1
+            try:
+                yield next(rows, ())
+                for row_no, values in enumerate(rows, start=2):
+                    if any(v is not None for v in values):
+                        yield row_no, values
+            except OSError:
+                raise
+            except Exception as e:
+                raise ImportFileError(f"无法读取 Excel 文件第 {row_no + 1} 行: {e}") from e
+        finally:
+            workbook.close()
+    elif ext == ".csv":
+        with open(path, newline="", encoding=_csv_encoding(path)) as f:
+            rows = csv.reader(f)
+            try:
+                yield next(rows, [])
+                for row_no, values in enumerate(rows, start=2):
+                    if any(v.strip() for v in values):
+                        yield row_no, values
+            except (UnicodeDecodeError, csv.Error) as e:
+                raise ImportFileError(f"无法读取 CSV 文件(请另存为 UTF-8 或 GBK 编码): {e}") from e
+    else:
+        raise ImportFileError("只支持 .xlsx 和 .csv 文件")
+
+
+# Excel 另存的 CSV 常为 GBK 编码
+def _csv_encoding(path):
+    with open(path, "rb") as f:
+        head = f.read(65536)
+    try:
+        head.decode("utf-8")
+        return "utf-8-sig"
+    except UnicodeDecodeError as e:
+        # 截断在多字节字符中间时仍视为 UTF-8
+        return "utf-8-sig" if e.start >= len(head) - 3 else "gbk"
+
+
+# 教师查找表: 身份证号 -> 教师ID，姓名 -> 教师ID(重名的姓名对应 None)
+def load_teacher_map(conn):
+    by_id_number = {}
+    by_name = {}
+    for teacher_id, name, id_number in conn.execute("SELECT teacher_id, name, id_number FROM teacher_info"):
+        if id_number:
+            by_id_number[id_number] = teacher_id
+        by_name[name] = None if name in by_name else teacher_id
+    return by_id_number, by_name
+
+
+# 按身份证号或姓名查找教师ID，找不到或重名时抛出 ValueError
+def find_teacher(teachers, name, id_number=None):
+    by_id_number, by_name = teachers
+    if id_number:
+        teacher_id = by_id_number.get(id_number)
+        if teacher_id is None:
+            raise ValueError(f"身份证号为 {id_number} 的教师不存在")
+        return teacher_id
+    if name not in by_name:
+        raise ValueError(f"教师“{name}”不存在")
+    if by_name[name] is None:
+        raise ValueError(f"存在多位名为“{name}”的教师，请填写身份证号")
+    return by_name[name]
+
+
+# 导入一个文件
+# progress(report) 在每块写入后调用；cancelled() 返回 True 时在当前块写入后停止
+# lock: 使用 conn 时持有的锁(如 ConnectionManager.write_lock)，只在读取准备数据和每块写入时持有，
+# 读取、转换表格时释放，让其他线程的保存不必等整个导入结束
+def run_import(conn, target_name, path, chunk_size=5000, progress=None, cancelled=None, lock=None):
+    target = IMPORT_TARGETS[target_name]
+    report = ImportReport()
+    rows = read_rows(path)
+    bound = target.bind(next(rows))
+    lock = lock if lock is not None else contextlib.nullcontext()
+
+    with lock:
+        teachers = load_teacher_map(conn)
+        target.prepare(conn)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def flush(batch):
+        with lock:
+            errors = target.write(conn, batch)
+        report.errors.extend(errors)
+        report.imported += len(batch) - len(errors)
+        report.elapsed = time.perf_counter() - report.started
+        if progress is not None:
+            progress(report)
+
+    batch = []
+    for row_no, values in rows:
+        report.total += 1
+        try:
+            record = target.convert(bound, values)
+            batch.append((row_no, target.row(record, find_teacher(teachers, record["name"], record.get("id_number")), now)))
+        except ValueError as e:
+            report.errors.append((row_no, str(e)))
+        if len(batch) >= chunk_size:
+            flush(batch)
+            batch = []
+            if cancelled is not None and cancelled():
+                report.cancelled = True
+                break
+    if batch:
+        flush(batch)
+    report.elapsed = time.perf_counter() - report.started
+    return report
+
+
+# 把错误行写入 CSV，便于修改后重新导入
+def write_error_report(report, path):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(["行号", "错误信息"])
+        writer.writerows(sorted(report.errors))
@@ -0,0 +1,349 @@
+# 性能诊断
+# 记录每条 SQL 的语句、参数形状、返回行数和耗时，每个页面(show_*)和加载函数(load_*)的耗时，以及各页面插入 Treeview 的行数
+# 诊断窗口(Ctrl+Shift+D)列出最慢的查询、各页面耗时的 p50/p95 和 Treeview 插入数，并可对本次运行做 cProfile 分析
+# 查询记录用 logging 输出到 "teacher_archive.sql"，设为 DEBUG 级别即可看到每条语句
+import functools
+import heapq
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+
+
+logger = logging.getLogger("teacher_archive.sql")
+
+# 保留的最近查询数、最慢查询数
+RECENT_SIZE = 2000
+SLOWEST_SIZE = 50
+
+
+# 一次查询
+class QueryRecord:
+    __slots__ = ("sql", "shape", "rows", "seconds", "screen", "thread")
+
+    def __init__(self, sql, shape, screen):
+        self.sql = sql
+        self.shape = shape
+        self.rows = 0
+        self.seconds = 0.0
+        self.screen = screen
+        self.thread = threading.current_thread().name
+
+    def __lt__(self, other):
+        return self.seconds < other.seconds
+
+
+# 参数形状，不记录参数值(可能含身份证号等个人信息)
+def params_shape(params, many=False):
+    if many:
+        return "executemany"
+    if isinstance(params, dict):
+        return "{" + ", ".join(params) + "}"
+    return f"{len(params)} 个参数" if params else "无参数"
+
+
+# 全部诊断数据，多个线程同时记录
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 当前页面(最近一次进入的页面，由 set_screen 设置)，清空统计时保持不变
+        self.screen = "启动"
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.recent = deque(maxlen=RECENT_SIZE)
+            self.slowest = []
+            # 语句 -> [次数, 总耗时, 最长耗时, 总行数]
+            self.by_sql = {}
+            # 页面或加载函数 -> [耗时]
+            self.timings = {}
+            # 页面 -> Treeview 插入行数
+            self.inserts = {}
+
+    def add_query(self, record):
+        with self._lock:
+            self.recent.append(record)
+            if len(self.slowest) < SLOWEST_SIZE:
+                heapq.heappush(self.slowest, record)
+            elif record.seconds > self.slowest[0].seconds:
+                heapq.heapreplace(self.slowest, record)
+            entry = self.by_sql.setdefault(record.sql, [0, 0.0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += record.seconds
+            entry[2] = max(entry[2], record.seconds)
+            entry[3] += record.rows
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%.1f ms, %d 行, %s: %s", record.seconds * 1000, record.rows, record.shape,
+                         " ".join(record.sql.split()))
+
+    def add_timing(self, name, seconds):
+        with self._lock:
+            self.timings.setdefault(name, []).append(seconds)
+
+    def add_inserts(self, count):
+        with self._lock:
+            self.inserts[self.screen] = self.inserts.get(self.screen, 0) + count
+
+    # 最慢的查询，从慢到快
+    def slowest_queries(self):
+        with self._lock:
+            return sorted(self.slowest, reverse=True)
+
+    # [(名称, 次数, p50, p95, 最长)]，按 p95 从慢到快
+    def timing_summary(self):
+        with self._lock:
+            items = [(name, sorted(values)) for name, values in self.timings.items()]
+        summary = [(name, len(values), percentile(values, 50), percentile(values, 95), values[-1])
+                   for name, values in items]
+        return sorted(summary, key=lambda row: row[3], reverse=True)
+
+
+# 已排序数据的百分位数(最近秩法)
+def percentile(values, p):
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, -(-len(values) * p // 100) - 1))
+    return values[int(index)]
+
+
+stats = Stats()
+
+
+# 记录查询的游标
+# 读取结果的时间和行数也计入查询: 结果读完、游标执行下一条语句或被释放时才登记
+class InstrumentedCursor(sqlite3.Cursor):
+    _record = None
+
+    def _finish(self):
+        record, self._record = self._record, None
+        if record is not None:
+            stats.add_query(record)
+
+    def _begin(self, sql, shape, run):
+        self._finish()
+        record = QueryRecord(sql, shape, stats.screen)
+        started = time.perf_counter()
+        try:
+            run()
+        finally:
+            record.seconds = time.perf_counter() - started
+            if self.description is None:
+                # 没有结果集(写入语句): 行数为影响的行数
+                record.rows = max(self.rowcount, 0)
+                stats.add_query(record)
+            else:
+                self._record = record
+        return self
+
+    def execute(self, sql, params=()):
+        return self._begin(sql, params_shape(params), lambda: super(InstrumentedCursor, self).execute(sql, params))
+
+    def executemany(self, sql, seq_of_params):
+        return self._begin(sql, params_shape(None, many=True),
+                           lambda: super(InstrumentedCursor, self).executemany(sql, seq_of_params))
+
+    def _fetched(self, rows, started, exhausted):
+        record = self._record
+        if record is not None:
+            record.seconds += time.perf_counter() - started
+            record.rows += rows
+            if exhausted:
+                self._finish()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, started, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(len(rows), started, len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), started, True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(0, started, True)
+            raise
+        self._fetched(1, started, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+# 所有游标(包括 conn.execute 隐式创建的)都记录查询
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+# 切换页面，之后的查询和 Treeview 插入计入该页面
+# 只在真正切换页面时调用；对话框、页面中的子视图(也以 show_ 命名)不改变当前页面
+def set_screen(name):
+    stats.screen = name
+
+
+# 给对象的 show_*、load_* 方法计时(替换为实例属性，界面回调中取到的也是计时后的方法)
+def instrument_methods(obj, prefixes=("show_", "load_")):
+    for name in dir(type(obj)):
+        if not name.startswith(prefixes) or not callable(getattr(type(obj), name)):
+            continue
+        setattr(obj, name, _timed(name, getattr(obj, name)))
+
+
+def _timed(name, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            stats.add_timing(name, time.perf_counter() - started)
+    return wrapper
+
+
+# 统计 Treeview 插入的行数，计入当前页面
+def count_treeview_inserts():
+    from tkinter import ttk
+    if getattr(ttk.Treeview.insert, "_counted", False):
+        return
+    insert = ttk.Treeview.insert
+
+    @functools.wraps(insert)
+    def counted(self, *args, **kwargs):
+        stats.add_inserts(1)
+        return insert(self, *args, **kwargs)
+    counted._counted = True
+    # 诊断窗口自己的表格用原来的 insert 填充，不计入统计
+    counted.uncounted = insert
+    ttk.Treeview.insert = counted
+
+
+# cProfile 分析
+class Profiler:
+    def __init__(self):
+        self._profile = None
+
+    @property
+    def running(self):
+        return self._profile is not None
+
+    def start(self):
+        import cProfile
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    # 停止并保存 pstats 文件(可用 python -m pstats 或 snakeviz 查看)
+    def stop(self, path):
+        if self._profile is None:
+            return
+        profile, self._profile = self._profile, None
+        profile.disable()
+        profile.dump_stats(path)
+
+
+profiler = Profiler()
+
+
+# 诊断窗口
+def show_diagnostics(root):
+    import tkinter as tk
+    from tkinter import ttk, filedialog
+
+    window = tk.Toplevel(root)
+    window.title("性能诊断")
+    window.geometry("900x500")
+    notebook = ttk.Notebook(window)
+    notebook.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def make_tree(title, columns, widths):
+        frame = ttk.Frame(notebook)
+        notebook.add(frame, text=title)
+        tree = ttk.Treeview(frame, columns=columns, show="headings")
+        for column, width in zip(columns, widths):
+            tree.heading(column, text=column)
+            tree.column(column, width=width, stretch=column == columns[-1])
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True)
+        return tree
+
+    query_tree = make_tree("最慢的查询", ("耗时(ms)", "行数", "参数", "页面", "线程", "SQL"),
+                           (70, 60, 90, 150, 80, 400))
+    sql_tree = make_tree("查询汇总", ("次数", "总耗时(ms)", "平均(ms)", "最长(ms)", "总行数", "SQL"),
+                         (60, 90, 80, 80, 70, 400))
+    timing_tree = make_tree("页面耗时", ("次数", "p50(ms)", "p95(ms)", "最长(ms)", "名称"),
+                            (60, 80, 80, 80, 300))
+    insert_tree = make_tree("Treeview 插入", ("行数", "页面"), (100, 300))
+
+    # 不计入 Treeview 插入统计的 insert
+    insert = getattr(ttk.Treeview.insert, "uncounted", ttk.Treeview.insert)
+
+    def refresh():
+        for tree in (query_tree, sql_tree, timing_tree, insert_tree):
+            tree.delete(*tree.get_children())
+        for record in stats.slowest_queries():
+            insert(query_tree, "", tk.END, values=(f"{record.seconds * 1000:.1f}", record.rows, record.shape,
+                                                  record.screen, record.thread, " ".join(record.sql.split())))
+        with stats._lock:
+            by_sql = sorted(stats.by_sql.items(), key=lambda item: item[1][1], reverse=True)
+            inserts = sorted(stats.inserts.items(), key=lambda item: item[1], reverse=True)
+        for sql, (count, total, longest, rows) in by_sql[:200]:
+            insert(sql_tree, "", tk.END, values=(count, f"{total * 1000:.1f}", f"{total / count * 1000:.1f}",
+                                                f"{longest * 1000:.1f}", rows, " ".join(sql.split())))
+        for name, count, p50, p95, longest in stats.timing_summary():
+            insert(timing_tree, "", tk.END, values=(count, f"{p50 * 1000:.1f}", f"{p95 * 1000:.1f}",
+                                                   f"{longest * 1000:.1f}", name))
+        for screen, count in inserts:
+            insert(insert_tree, "", tk.END, values=(count, screen))
+
+    def clear():
+        stats.clear()
+        refresh()
+
+    def toggle_profile():
+        if profiler.running:
+            path = filedialog.asksaveasfilename(parent=window, title="保存 cProfile 结果", defaultextension=".pstats",
+                                                filetypes=[("pstats", "*.pstats")])
+            if not path:
+                return
+            profiler.stop(path)
+        else:
+            profiler.start()
+        profile_button.config(text="停止并保存分析" if profiler.running else "开始 cProfile 分析")
+
+    button_frame = ttk.Frame(window)
+    button_frame.pack(fill=tk.X, padx=5, pady=5)
+    ttk.Button(button_frame, text="刷新", command=refresh).pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="清空", command=clear).pack(side=tk.LEFT, padx=5)
+    profile_button = ttk.Button(button_frame, command=toggle_profile,
+                                text="停止并保存分析" if profiler.running else "开始 cProfile 分析")
+    profile_button.pack(side=tk.RIGHT, padx=5)
+    refresh()
+    return window
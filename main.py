@@ -2,13 +2,33 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import sqlite3
 import os
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
-import shutil
+import time
 from datetime import datetime
 import uuid
+import queue
+import threading
+import db_schema
+from db_connection import ConnectionManager
+from dossier import load_dossier
+from virtual_list import VirtualTreeview
+from filter_engine import FilterEngine
+from async_db import AsyncDB
+from query_cache import QueryCache
+import tree_diff
+import search_index
+from query_engine import QueryEngine, QuerySpecError
+import stats_store
+import importer
+import exporter
+import thumbnails
+import blob_store
+import repository
+import cascade
+from repository import UnitOfWork
+from asset_ingest import AssetIngestor
+from screen_registry import ScreenRegistry
+from teacher_directory import TeacherDirectory
+import instrumentation
 # 创建应用程序主类
 class ArchiveManagementSystem:
     #---------------------------------初始化--------------------------------
@@ -18,270 +38,67 @@ class ArchiveManagementSystem:
         self.root.title("教师档案管理系统")
         self.root.geometry("1200x700")
         self.root.minsize(1000, 600)
+        # 启动各阶段用时 [(阶段, 秒)]
+        self.startup_times = []
+        # 性能诊断: 记录查询、页面和加载函数的耗时，Ctrl+Shift+D 打开诊断窗口
+        instrumentation.instrument_methods(self)
+        instrumentation.count_treeview_inserts()
+        self.root.bind("<Control-D>", lambda event: instrumentation.show_diagnostics(self.root))
         
         # 创建数据库和文件夹
-        self.setup_database()
-        self.setup_folders()
+        self.timed("数据库", self.setup_database)
+        self.timed("文件存储", self.setup_folders)
+        
+        # 照片、扫描件上传在后台处理
+        self.ingestor = AssetIngestor(self.root)
+        # 列表查询在后台执行，界面线程不等待数据库；数据没有变化时重新打开页面直接使用缓存的结果
+        self.query_cache = QueryCache()
+        self.async_db = AsyncDB(self.db, self.root, cache=self.query_cache)
         
         # 创建主界面
-        self.create_main_interface()
+        self.timed("主界面", self.create_main_interface)
+    # 执行启动步骤并记录用时
+    def timed(self, name, step):
+        started = time.perf_counter()
+        step()
+        self.startup_times.append((name, time.perf_counter() - started))
     # 数据库设置
     def setup_database(self):
         # 连接到SQLite数据库
-        self.conn = sqlite3.connect('teacher_archive.db')
+        self.db_path = 'teacher_archive.db'
+        # WAL 模式；界面线程使用主连接，后台线程通过 self.db 取得各自的连接
+        self.db = ConnectionManager(self.db_path, factory=instrumentation.InstrumentedConnection)
+        self.conn = self.db.main
         self.cursor = self.conn.cursor()
+        # 下拉框、姓名查找共用的教师名录，教师信息修改后自动重新读取
+        self.teacher_directory = TeacherDirectory(self.conn)
+        
+        # 创建数据表并执行结构迁移(创建索引等)
+        db_schema.ensure_schema(self.conn)
         
-        # 创建教师基本信息表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS teacher_info (
-            teacher_id TEXT PRIMARY KEY,
-            name TEXT NOT NULL,
-            gender TEXT,
-            birth_date TEXT,
-            ethnicity TEXT,
-            hometown TEXT,
-            id_number TEXT UNIQUE,
-            photo_path TEXT,
-            party_join_date TEXT,
-            work_start_date TEXT,
-            health_status TEXT,
-            teaching_subject TEXT,
-            current_position TEXT,
-            create_time TEXT,
-            update_time TEXT
-        )
-        ''')
-        
-        # 创建职称信息表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS title_history (
-            record_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            title TEXT,
-            obtain_date TEXT,
-            post TEXT,
-            appointment_date TEXT,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建教育背景表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS education (
-            record_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            edu_type TEXT,
-            degree TEXT,
-            institution TEXT,
-            obtain_date TEXT,
-            scan_file_path TEXT,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建工作简历表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS work_experience (
-            record_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            start_date TEXT,
-            end_date TEXT,
-            organization TEXT,
-            position TEXT,
-            description TEXT,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建教学工作情况表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS teaching_records (
-            record_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            academic_year TEXT,
-            semester TEXT,
-            subject TEXT,
-            classes TEXT,
-            student_count INTEGER,
-            weekly_hours INTEGER,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建教育工作情况表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS education_work (
-            record_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            academic_year TEXT,
-            semester TEXT,
-            work_type TEXT,
-            description TEXT,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建综合表彰表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS awards (
-            award_id TEXT PRIMARY KEY,
-            award_name TEXT,
-            award_level TEXT,
-            award_unit TEXT,
-            award_date TEXT,
-            award_type TEXT,
-            create_time TEXT,
-            update_time TEXT
-        )
-        ''')
-        
-        # 创建获奖人员关联表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS award_recipients (
-            relation_id TEXT PRIMARY KEY,
-            award_id TEXT,
-            teacher_id TEXT,
-            rank INTEGER,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (award_id) REFERENCES awards (award_id),
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建公开课管理表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS public_lessons (
-            lesson_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            lesson_name TEXT,
-            lesson_scope TEXT,
-            lesson_date TEXT,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建论文管理表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS papers (
-            paper_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            paper_title TEXT,
-            journal_name TEXT,
-            paper_level TEXT,
-            publish_date TEXT,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建课题管理表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS research_projects (
-            project_id TEXT PRIMARY KEY,
-            project_name TEXT,
-            project_level TEXT,
-            completion_date TEXT,
-            create_time TEXT,
-            update_time TEXT
-        )
-        ''')
-        
-        # 创建课题成员表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS project_members (
-            relation_id TEXT PRIMARY KEY,
-            project_id TEXT,
-            teacher_id TEXT,
-            is_leader BOOLEAN,
-            member_rank INTEGER,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (project_id) REFERENCES research_projects (project_id),
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建学生竞赛辅导表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS student_competitions (
-            competition_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            competition_name TEXT,
-            winner_count INTEGER,
-            award_level TEXT,
-            competition_date TEXT,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建青蓝工程表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS mentoring (
-            mentoring_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            apprentice_id TEXT,
-            start_date TEXT,
-            end_date TEXT,
-            achievements TEXT,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id),
-            FOREIGN KEY (apprentice_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建专业引领表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS professional_leadership (
-            leadership_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            leadership_type TEXT,
-            description TEXT,
-            start_date TEXT,
-            end_date TEXT,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        # 创建考试成绩表
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS exam_results (
-            result_id TEXT PRIMARY KEY,
-            teacher_id TEXT,
-            exam_name TEXT,
-            exam_date TEXT,
-            rank INTEGER,
-            class_average REAL,
-            create_time TEXT,
-            update_time TEXT,
-            FOREIGN KEY (teacher_id) REFERENCES teacher_info (teacher_id)
-        )
-        ''')
-        
-        self.conn.commit()
+        # 综合查询引擎
+        self.query_engine = QueryEngine(self.conn)
+        self.query_result = None
     # 文件夹设置
     def setup_folders(self):
-        # 创建存储照片和扫描件的文件夹
-        os.makedirs('photos', exist_ok=True)
-        os.makedirs('scans', exist_ok=True)
+        # 创建存储照片和扫描件的文件夹(按内容存放，相同文件只保存一份)
+        os.makedirs(blob_store.BLOB_DIR, exist_ok=True)
+        os.makedirs(thumbnails.THUMB_DIR, exist_ok=True)
+        # 旧版本 photos/、scans/ 目录中的文件移入文件存储
+        blob_store.adopt_legacy(self.conn)
+        # 在后台清理不再使用的文件
+        threading.Thread(target=self.collect_garbage, daemon=True).start()
+    # 后台线程: 清理不再使用的文件，sweep 为 True 时包括上传后未保存的
+    def collect_garbage(self, sweep=True):
+        try:
+            with self.db.writing() as conn:
+                blob_store.collect_garbage(conn, sweep=sweep)
+        except (OSError, sqlite3.Error):
+            # 清理失败不影响已保存的修改，下次启动时会再清理
+            pass
+    # 在后台删除不再被引用的照片、扫描件及其缩略图(在提交删除或替换文件的修改后调用)
+    def release_files(self):
+        threading.Thread(target=self.collect_garbage, args=(False,), daemon=True).start()
     # 主界面
     def create_main_interface(self):
         # 创建主框架
@@ -292,9 +109,10 @@ class ArchiveManagementSystem:
         self.menu_frame = ttk.Frame(self.main_frame, width=200)
         self.menu_frame.pack(side=tk.LEFT, fill=tk.Y)
         
-        # 创建右侧内容区域
-        self.content_frame = ttk.Frame(self.main_frame)
-        self.content_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        # 创建右侧内容区域，各功能页面只创建一次，切换时隐藏、显示
+        self.content_area = ttk.Frame(self.main_frame)
+        self.content_area.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        self.screens = ScreenRegistry(self.content_area)
         
         # 添加菜单按钮
         ttk.Label(self.menu_frame, text="功能菜单", font=("Arial", 14, "bold")).pack(pady=10)
@@ -319,17 +137,29 @@ class ArchiveManagementSystem:
         self.stats_btn = ttk.Button(self.menu_frame, text="统计分析", width=20, command=self.show_statistics)
         self.stats_btn.pack(pady=5)
         
+        # 列表右键菜单: 导出当前列表
+        self.root.bind_class("Treeview", "<Button-3>", self.show_tree_menu, add="+")
+        
         # 默认显示基本信息管理页面
         self.show_basic_info_management()
-    # 清除内容区域
-    def clear_content_frame(self):
-        # 清除内容区域的所有小部件
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
+    # 切换页面，已创建过的页面直接显示并刷新数据，返回 True
+    # 返回 False 时 self.content_frame 为新页面的空框架，由调用方创建控件
+    def enter_screen(self, name):
+        # 取消上一页面尚未完成的查询，不再读取综合查询的结果
+        self.async_db.cancel()
+        if self.query_result is not None:
+            self.query_result.close()
+            self.query_result = None
+        # 之后的查询和 Treeview 插入计入该页面(对话框不切换页面)
+        instrumentation.set_screen(name)
+        screen, created = self.screens.show(name)
+        self.content_frame = screen.frame
+        return not created
     #----------------------------------模块一---------------------------------
     # 基本信息管理
     def show_basic_info_management(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_basic_info_management"):
+            return
         
         # 创建基本信息管理页面
         ttk.Label(self.content_frame, text="基本信息管理", font=("Arial", 16, "bold")).pack(pady=10)
@@ -346,69 +176,40 @@ class ArchiveManagementSystem:
         ttk.Button(btn_frame, text="档案删除", command=self.delete_teacher).grid(row=0, column=3, padx=10, pady=5)
         # 显示教师列表
         self.show_teacher_list()
+        # 再次进入时刷新列表，保持搜索条件和滚动位置
+        self.screens.on_show(self.teacher_tree.refresh)
     # 档案录入
     def delete_teacher(self):
-        # 检查是否选择了教师
-        try:
-            selected_item = self.teacher_tree.selection()[0]
-            teacher_id = self.teacher_tree.item(selected_item, "values")[0]
-        except IndexError:
+        # 检查是否选择了教师(可按住 Ctrl/Shift 选择多位教师一次删除)
+        selected = [self.teacher_tree.item(item, "values") for item in self.teacher_tree.selection()]
+        if not selected:
             messagebox.showerror("错误", "请先选择要删除的教师")
             return
-            
-        # 获取教师姓名
-        self.cursor.execute("SELECT name FROM teacher_info WHERE teacher_id = ?", (teacher_id,))
-        teacher_name = self.cursor.fetchone()[0]
+        teacher_ids = [values[0] for values in selected]
+        names = "、".join(values[1] for values in selected[:10])
+        if len(selected) > 10:
+            names += f" 等 {len(selected)} 位教师"
         
         # 确认删除
-        if not messagebox.askyesno("确认删除", f"确定要删除教师 {teacher_name} 的所有档案信息吗？\n此操作不可恢复！"):
+        if not messagebox.askyesno("确认删除", f"确定要删除教师 {names} 的所有档案信息吗？\n此操作不可恢复！"):
             return
             
         try:
-            # 开始事务
-            self.cursor.execute("BEGIN TRANSACTION")
-            
-            # 删除相关表中的记录
-            tables = [
-                "title_history", "education", "work_experience",
-                "teaching_records", "education_work", "award_recipients",
-                "public_lessons", "papers", "project_members",
-                "student_competitions", "mentoring", "professional_leadership",
-                "exam_results"
-            ]
-            
-            # 删除各个关联表中的数据
-            for table in tables:
-                self.cursor.execute(f"DELETE FROM {table} WHERE teacher_id = ?", (teacher_id,))
-            
-            # 删除教师照片
-            self.cursor.execute("SELECT photo_path FROM teacher_info WHERE teacher_id = ?", (teacher_id,))
-            photo_path = self.cursor.fetchone()[0]
-            if photo_path and os.path.exists(photo_path):
-                os.remove(photo_path)
-                
-            # 删除教育背景扫描件
-            self.cursor.execute("SELECT scan_file_path FROM education WHERE teacher_id = ?", (teacher_id,))
-            scan_files = self.cursor.fetchall()
-            for scan_file in scan_files:
-                if scan_file[0] and os.path.exists(scan_file[0]):
-                    os.remove(scan_file[0])
-            
-            # 最后删除教师基本信息
-            self.cursor.execute("DELETE FROM teacher_info WHERE teacher_id = ?", (teacher_id,))
-            
-            # 提交事务
-            self.conn.commit()
-            
-            # 从树形视图中移除
-            self.teacher_tree.delete(selected_item)
-            
-            messagebox.showinfo("成功", f"已删除教师 {teacher_name} 的所有档案信息")
-            
-        except Exception as e:
-            # 发生错误时回滚事务
-            self.conn.rollback()
+            # 在一个事务中删除教师及各表中的关联记录(包括只属于这些教师的表彰、课题和青蓝工程师徒关系)
+            with self.db.writing() as conn:
+                report = cascade.delete_teachers(conn, teacher_ids)
+        except sqlite3.Error as e:
             messagebox.showerror("错误", f"删除失败: {e}")
+            return
+        
+        # 在后台删除照片和教育背景扫描件(其他教师仍在使用的相同文件会保留)
+        self.release_files()
+        
+        # 刷新教师列表
+        self.teacher_tree.refresh()
+        
+        messagebox.showinfo("成功", f"已删除 {report.rows.get('teacher_info', 0)} 位教师的所有档案信息，"
+                                   f"共 {report.total} 条记录")
     # 档案修改
     def show_teacher_list(self):
         # 创建教师列表框架
@@ -426,7 +227,7 @@ class ArchiveManagementSystem:
         
         # 创建教师列表
         columns = ("教师ID", "姓名", "性别", "出生年月", "民族", "籍贯", "身份证号", "任教学科")
-        self.teacher_tree = ttk.Treeview(list_frame, columns=columns, show="headings")
+        self.teacher_tree = VirtualTreeview(list_frame, columns=columns, show="headings")
         
         # 设置列标题
         for col in columns:
@@ -434,8 +235,8 @@ class ArchiveManagementSystem:
             self.teacher_tree.column(col, width=100)
         
         # 添加滚动条
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.teacher_tree.yview)
-        self.teacher_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
+        self.teacher_tree.attach_scrollbar(scrollbar)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.teacher_tree.pack(fill=tk.BOTH, expand=True)
         
@@ -446,35 +247,16 @@ class ArchiveManagementSystem:
         self.load_teacher_data()
     # 加载教师数据
     def load_teacher_data(self):
-        # 清除现有数据
-        for item in self.teacher_tree.get_children():
-            self.teacher_tree.delete(item)
-        
-        # 从数据库加载教师数据
-        self.cursor.execute("SELECT teacher_id, name, gender, birth_date, ethnicity, hometown, id_number, teaching_subject FROM teacher_info")
-        teachers = self.cursor.fetchall()
-        
-        # 将数据添加到树形视图
-        for teacher in teachers:
-            self.teacher_tree.insert("", tk.END, values=teacher)
+        # 按姓名分页加载教师数据
+        self.teacher_tree.set_query(self.conn, db_schema.sql("teacher_list"),
+                                    order_by=[("name", False, False), ("teacher_id", False)], cache=self.query_cache)
     # 搜索教师
     def search_teacher(self, keyword):
-        # 清除现有数据
-        for item in self.teacher_tree.get_children():
-            self.teacher_tree.delete(item)
-        
-        # 搜索教师
-        self.cursor.execute("""
-        SELECT teacher_id, name, gender, birth_date, ethnicity, hometown, id_number, teaching_subject 
-        FROM teacher_info 
-        WHERE name LIKE ? OR id_number LIKE ?
-        """, (f'%{keyword}%', f'%{keyword}%'))
-        
-        teachers = self.cursor.fetchall()
-        
-        # 将数据添加到树形视图
-        for teacher in teachers:
-            self.teacher_tree.insert("", tk.END, values=teacher)
+        # 按姓名、身份证号全文检索
+        clause, params = search_index.match_clause(self.conn, "teacher", keyword, columns=("name", "id_number"))
+        query = db_schema.sql("teacher_list") + " WHERE " + clause
+        self.teacher_tree.set_query(self.conn, query, params,
+                                    order_by=[("name", False, False), ("teacher_id", False)])
     # 双击事件
     def on_teacher_selected(self, event):
         # 获取选中的教师ID
@@ -485,6 +267,12 @@ class ArchiveManagementSystem:
         self.show_teacher_details(teacher_id)
     # 显示教师详细信息
     def show_teacher_details(self, teacher_id):
+        # 一次读取教师全部档案
+        dossier = load_dossier(self.conn, teacher_id)
+        if dossier is None:
+            messagebox.showerror("错误", "未找到该教师信息")
+            return
+        
         # 创建新窗口显示教师详细信息
         details_window = tk.Toplevel(self.root)
         details_window.title("教师详细信息")
@@ -543,47 +331,34 @@ class ArchiveManagementSystem:
         
         tab_control.pack(expand=1, fill="both")
         
-        # 加载基本信息
-        self.load_basic_info(basic_tab, teacher_id)
-        
-        # 加载职称信息
-        self.load_title_info(title_tab, teacher_id)
-        
-        # 加载教育背景
-        self.load_education_info(education_tab, teacher_id)
-        
-        # 加载工作简历
-        self.load_work_experience(work_tab, teacher_id)
-        
-        # 加载教学工作情况
-        self.load_teaching_info(teaching_tab, teacher_id)
-        
-        # 加载教育工作情况
-        self.load_edu_work_info(edu_work_tab, teacher_id)
-        
-        # 加载荣誉情况
-        self.load_honor_info(honor_tab, teacher_id)
-        
-        # 加载公开课情况
-        self.load_lesson_info(lesson_tab, teacher_id)
-        
-        # 加载论文发表情况
-        self.load_paper_info(paper_tab, teacher_id)
+        # 各选项卡的加载函数及数据，切换到该选项卡时才创建内容
+        tab_loaders = {
+            str(basic_tab): (self.load_basic_info, dossier.basic),
+            str(title_tab): (self.load_title_info, dossier.titles),
+            str(education_tab): (self.load_education_info, dossier.education),
+            str(work_tab): (self.load_work_experience, dossier.work_experience),
+            str(teaching_tab): (self.load_teaching_info, dossier.teaching),
+            str(edu_work_tab): (self.load_edu_work_info, dossier.edu_work),
+            str(honor_tab): (self.load_honor_info, dossier.honors),
+            str(lesson_tab): (self.load_lesson_info, dossier.lessons),
+            str(paper_tab): (self.load_paper_info, dossier.papers),
+            str(project_tab): (self.load_project_info, dossier.projects),
+            str(competition_tab): (self.load_competition_info, dossier.competitions),
+            str(mentoring_tab): (self.load_mentoring_info, dossier.mentoring),
+        }
         
-        # 加载课题管理情况
-        self.load_project_info(project_tab, teacher_id)
+        def on_tab_changed(event=None):
+            tab_name = tab_control.select()
+            if tab_name in tab_loaders:
+                loader, records = tab_loaders.pop(tab_name)
+                loader(tab_control.nametowidget(tab_name), records)
         
-        # 加载学生竞赛辅导情况
-        self.load_competition_info(competition_tab, teacher_id)
+        tab_control.bind("<<NotebookTabChanged>>", on_tab_changed)
         
-        # 加载青蓝工程情况
-        self.load_mentoring_info(mentoring_tab, teacher_id)
+        # 加载当前(基本信息)选项卡
+        on_tab_changed()
     # 加载基本信息
-    def load_basic_info(self, tab, teacher_id):
-        # 从数据库加载教师基本信息
-        self.cursor.execute("SELECT * FROM teacher_info WHERE teacher_id = ?", (teacher_id,))
-        teacher = self.cursor.fetchone()
-        
+    def load_basic_info(self, tab, teacher):
         if teacher:
             # 创建信息显示框架
             info_frame = tk.Frame(tab)
@@ -595,9 +370,7 @@ class ArchiveManagementSystem:
             
             if teacher[7] and os.path.exists(teacher[7]):  # photo_path
                 try:
-                    img = Image.open(teacher[7])
-                    img = img.resize((150, 200), Image.Resampling.LANCZOS)
-                    self.current_photo = ImageTk.PhotoImage(img)  # 保存为实例属性
+                    self.current_photo = thumbnails.get_photo(teacher[7], thumbnails.PHOTO_SIZE)  # 保存为实例属性
                     photo_label = tk.Label(photo_frame, image=self.current_photo)
                     photo_label.pack()
                 except Exception as e:
@@ -629,11 +402,7 @@ class ArchiveManagementSystem:
                 ttk.Label(info_grid, text=label, font=("Arial", 10, "bold")).grid(row=i, column=0, sticky="w", padx=5, pady=3)
                 ttk.Label(info_grid, text=value if value else "").grid(row=i, column=1, sticky="w", padx=5, pady=3)
     # 加载职称信息
-    def load_title_info(self, tab, teacher_id):
-        # 从数据库加载教师职称信息
-        self.cursor.execute("SELECT * FROM title_history WHERE teacher_id = ? ORDER BY obtain_date DESC", (teacher_id,))
-        titles = self.cursor.fetchall()
-        
+    def load_title_info(self, tab, titles):
         # 创建职称信息列表
         columns = ("职称", "取得时间", "岗位", "聘任时间")
         title_tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -653,16 +422,7 @@ class ArchiveManagementSystem:
         for title in titles:
             title_tree.insert("", tk.END, values=(title[2], title[3], title[4], title[5]))
     # 加载教学工作情况
-    def load_teaching_info(self, tab, teacher_id):
-        # 从数据库加载教学工作情况
-        self.cursor.execute("""
-        SELECT academic_year, semester, subject, classes, student_count, weekly_hours 
-        FROM teaching_records 
-        WHERE teacher_id = ? 
-        ORDER BY academic_year DESC, semester DESC
-        """, (teacher_id,))
-        records = self.cursor.fetchall()
-        
+    def load_teaching_info(self, tab, records):
         # 创建教学工作情况列表
         columns = ("学年", "学期", "学科", "任教班级", "学生人数", "周课时数")
         tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -683,16 +443,7 @@ class ArchiveManagementSystem:
             tree.insert("", tk.END, values=record)
     
     # 加载教育工作情况
-    def load_edu_work_info(self, tab, teacher_id):
-        # 从数据库加载教育工作情况
-        self.cursor.execute("""
-        SELECT academic_year, semester, work_type, description 
-        FROM education_work 
-        WHERE teacher_id = ? 
-        ORDER BY academic_year DESC, semester DESC
-        """, (teacher_id,))
-        records = self.cursor.fetchall()
-        
+    def load_edu_work_info(self, tab, records):
         # 创建教育工作情况列表
         columns = ("学年", "学期", "工作类型", "工作描述")
         tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -713,17 +464,7 @@ class ArchiveManagementSystem:
             tree.insert("", tk.END, values=record)
     
     # 加载荣誉情况
-    def load_honor_info(self, tab, teacher_id):
-        # 从数据库加载荣誉信息
-        self.cursor.execute("""
-        SELECT a.award_name, a.award_level, a.award_unit, a.award_date, a.award_type, ar.rank 
-        FROM awards a 
-        JOIN award_recipients ar ON a.award_id = ar.award_id 
-        WHERE ar.teacher_id = ? 
-        ORDER BY a.award_date DESC
-        """, (teacher_id,))
-        records = self.cursor.fetchall()
-        
+    def load_honor_info(self, tab, records):
         # 创建荣誉情况列表
         columns = ("奖项名称", "获奖级别", "颁奖单位", "获奖时间", "奖项类型", "获奖等第")
         tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -744,16 +485,7 @@ class ArchiveManagementSystem:
             tree.insert("", tk.END, values=record)
     
     # 加载公开课情况
-    def load_lesson_info(self, tab, teacher_id):
-        # 从数据库加载公开课信息
-        self.cursor.execute("""
-        SELECT lesson_name, lesson_scope, lesson_date 
-        FROM public_lessons 
-        WHERE teacher_id = ? 
-        ORDER BY lesson_date DESC
-        """, (teacher_id,))
-        records = self.cursor.fetchall()
-        
+    def load_lesson_info(self, tab, records):
         # 创建公开课情况列表
         columns = ("课程名称", "课程范围", "授课时间")
         tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -774,16 +506,7 @@ class ArchiveManagementSystem:
             tree.insert("", tk.END, values=record)
     
     # 加载论文发表情况
-    def load_paper_info(self, tab, teacher_id):
-        # 从数据库加载论文信息
-        self.cursor.execute("""
-        SELECT paper_title, journal_name, paper_level, publish_date 
-        FROM papers 
-        WHERE teacher_id = ? 
-        ORDER BY publish_date DESC
-        """, (teacher_id,))
-        records = self.cursor.fetchall()
-        
+    def load_paper_info(self, tab, records):
         # 创建论文发表情况列表
         columns = ("论文题目", "期刊名称", "论文级别", "发表时间")
         tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -804,17 +527,7 @@ class ArchiveManagementSystem:
             tree.insert("", tk.END, values=record)
     
     # 加载课题管理情况
-    def load_project_info(self, tab, teacher_id):
-        # 从数据库加载课题信息
-        self.cursor.execute("""
-        SELECT rp.project_name, rp.project_level, rp.completion_date, pm.is_leader, pm.member_rank 
-        FROM research_projects rp 
-        JOIN project_members pm ON rp.project_id = pm.project_id 
-        WHERE pm.teacher_id = ? 
-        ORDER BY rp.completion_date DESC
-        """, (teacher_id,))
-        records = self.cursor.fetchall()
-        
+    def load_project_info(self, tab, records):
         # 创建课题管理情况列表
         columns = ("课题名称", "课题级别", "完成时间", "是否负责人", "成员排序")
         tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -838,16 +551,7 @@ class ArchiveManagementSystem:
             tree.insert("", tk.END, values=values)
     
     # 加载学生竞赛辅导情况
-    def load_competition_info(self, tab, teacher_id):
-        # 从数据库加载竞赛辅导信息
-        self.cursor.execute("""
-        SELECT competition_name, winner_count, award_level, competition_date 
-        FROM student_competitions 
-        WHERE teacher_id = ? 
-        ORDER BY competition_date DESC
-        """, (teacher_id,))
-        records = self.cursor.fetchall()
-        
+    def load_competition_info(self, tab, records):
         # 创建竞赛辅导情况列表
         columns = ("竞赛名称", "获奖学生数", "获奖级别", "竞赛时间")
         tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -868,17 +572,7 @@ class ArchiveManagementSystem:
             tree.insert("", tk.END, values=record)
     
     # 加载青蓝工程情况
-    def load_mentoring_info(self, tab, teacher_id):
-        # 从数据库加载青蓝工程信息
-        self.cursor.execute("""
-        SELECT t.name, m.start_date, m.end_date, m.achievements 
-        FROM mentoring m 
-        JOIN teacher_info t ON m.apprentice_id = t.teacher_id 
-        WHERE m.teacher_id = ? 
-        ORDER BY m.start_date DESC
-        """, (teacher_id,))
-        records = self.cursor.fetchall()
-        
+    def load_mentoring_info(self, tab, records):
         # 创建青蓝工程情况列表
         columns = ("徒弟姓名", "开始时间", "结束时间", "指导成果")
         tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -898,11 +592,7 @@ class ArchiveManagementSystem:
         for record in records:
             tree.insert("", tk.END, values=record)
     
-    def load_education_info(self, tab, teacher_id):
-        # 从数据库加载教师教育背景
-        self.cursor.execute("SELECT * FROM education WHERE teacher_id = ? ORDER BY obtain_date DESC", (teacher_id,))
-        educations = self.cursor.fetchall()
-        
+    def load_education_info(self, tab, educations):
         # 创建教育背景列表
         columns = ("类型", "学位", "院校", "取得时间", "扫描件")
         edu_tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -942,9 +632,7 @@ class ArchiveManagementSystem:
             scan_window.geometry("800x600")
             
             try:
-                img = Image.open(scan_path)
-                img = img.resize((150, 200), Image.Resampling.LANCZOS)
-                self.current_scan_photo = ImageTk.PhotoImage(img)  # 保存为实例属性
+                self.current_scan_photo = thumbnails.get_photo(scan_path, thumbnails.SCAN_VIEW_SIZE)  # 保存为实例属性
                 photo_label = tk.Label(scan_window, image=self.current_scan_photo)
                 photo_label.pack(padx=10, pady=10)
             except Exception as e:
@@ -952,11 +640,7 @@ class ArchiveManagementSystem:
         else:
             messagebox.showinfo("提示", "没有可用的扫描件")
     # 加载工作简历
-    def load_work_experience(self, tab, teacher_id):
-        # 从数据库加载工作简历
-        self.cursor.execute("SELECT * FROM work_experience WHERE teacher_id = ? ORDER BY start_date DESC", (teacher_id,))
-        experiences = self.cursor.fetchall()
-        
+    def load_work_experience(self, tab, experiences):
         # 创建工作简历列表
         columns = ("开始时间", "结束时间", "单位", "职务", "描述")
         work_tree = ttk.Treeview(tab, columns=columns, show="headings")
@@ -1066,30 +750,38 @@ class ArchiveManagementSystem:
         file_path = filedialog.askopenfilename(title="选择照片", filetypes=[("图片文件", "*.jpg;*.jpeg;*.png;*.gif")])
         
         if file_path:
-            try:
-                # 创建照片目录
-                os.makedirs('photos', exist_ok=True)
-                
-                # 生成唯一文件名
-                file_ext = os.path.splitext(file_path)[1]
-                new_filename = f"photo_{uuid.uuid4().hex}{file_ext}"
-                new_path = os.path.join('photos', new_filename)
-                
-                # 复制照片到应用程序目录
-                shutil.copy2(file_path, new_path)
-                
-                # 更新照片显示
-                img = Image.open(new_path)
-                img = img.resize((150, 200), Image.Resampling.LANCZOS)
-                self.current_photo = ImageTk.PhotoImage(img)  # 保存为实例属性
-                self.photo_label.configure(image=self.current_photo)
+            self.photo_label.configure(text="正在处理...", image="")
+            
+            def done(result):
+                # 处理期间表单可能已关闭
+                if not self.photo_label.winfo_exists():
+                    return
+                self.current_photo = thumbnails.get_photo(result.path, thumbnails.PHOTO_SIZE) if result.preview else None  # 保存为实例属性
+                self.photo_label.configure(image=self.current_photo or "", text="" if result.preview else "无法预览")
                 
                 # 保存照片路径
-                self.photo_path = new_path
+                self.photo_path = result.path
                 
                 messagebox.showinfo("成功", "照片上传成功")
-            except Exception as e:
-                messagebox.showerror("错误", f"照片上传失败: {e}")
+            
+            # 复制文件、生成缩略图在后台进行
+            self.ingest_file(file_path, "photo", done, "照片上传失败")
+    # 在后台处理一个上传的文件，成功后在界面线程中调用 on_done(result)
+    def ingest_file(self, file_path, kind, on_done, error_title):
+        self.root.config(cursor="watch")
+        
+        def finished(batch):
+            self.root.config(cursor="")
+            result = batch.results[0]
+            if result.error is not None:
+                messagebox.showerror("错误", f"{error_title}: {result.error}")
+            else:
+                # 登记为尚未保存的上传，表单长时间未保存时也不会被回收
+                with self.db.writing() as conn:
+                    blob_store.hold(conn, result.path)
+                on_done(result)
+        
+        self.ingestor.submit([file_path], kind, on_finished=finished)
     # 保存基本信息
     def save_basic_info(self):
         # 获取表单数据
@@ -1252,36 +944,24 @@ class ArchiveManagementSystem:
         file_path = filedialog.askopenfilename(title="选择扫描件", filetypes=[("图片文件", "*.jpg;*.jpeg;*.png;*.pdf")])
         
         if file_path:
-            try:
-                # 创建扫描件目录
-                os.makedirs('scans', exist_ok=True)
-                
-                # 生成唯一文件名
-                file_ext = os.path.splitext(file_path)[1]
-                new_filename = f"scan_{uuid.uuid4().hex}{file_ext}"
-                new_path = os.path.join('scans', new_filename)
-                
-                # 复制扫描件到应用程序目录
-                shutil.copy2(file_path, new_path)
-                
-                # 更新扫描件显示
-                if file_ext.lower() in [".jpg", ".jpeg", ".png"]:
-                    try:
-                        img = Image.open(new_path)
-                        img = img.resize((150, 200), Image.Resampling.LANCZOS)
-                        self.current_scan_photo = ImageTk.PhotoImage(img)  # 保存为实例属性
-                        self.scan_label.configure(image=self.current_scan_photo)
-                    except Exception:
-                        self.scan_label.configure(text="扫描件已上传", image="")
+            self.scan_label.configure(text="正在处理...", image="")
+            
+            def done(result):
+                if not self.scan_label.winfo_exists():
+                    return
+                # 更新扫描件显示(PDF 显示首页预览)
+                if result.preview:
+                    self.current_scan_photo = thumbnails.get_photo(result.path, thumbnails.PHOTO_SIZE)  # 保存为实例属性
+                    self.scan_label.configure(image=self.current_scan_photo)
                 else:
                     self.scan_label.configure(text="扫描件已上传", image="")
                 
                 # 保存扫描件路径
-                self.scan_path = new_path
+                self.scan_path = result.path
                 
                 messagebox.showinfo("成功", "扫描件上传成功")
-            except Exception as e:
-                messagebox.showerror("错误", f"扫描件上传失败: {e}")
+            
+            self.ingest_file(file_path, "scan", done, "扫描件上传失败")
     # 保存教育背景
     def save_education_info(self):
         # 获取表单数据
@@ -1452,7 +1132,8 @@ class ArchiveManagementSystem:
 
     # 显示业务情况管理页面
     def show_business_management(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_business_management"):
+            return
         
         # 创建业务情况管理页面
         ttk.Label(self.content_frame, text="业务情况管理", font=("Arial", 16, "bold")).pack(pady=10)
@@ -1479,7 +1160,8 @@ class ArchiveManagementSystem:
         ttk.Label(self.content_frame, text="请选择上方功能按钮进行操作", font=("Arial", 12)).pack(pady=50)
     # 显示教学工作情况页面
     def show_teaching_records(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_teaching_records"):
+            return
         
         # 创建标题和按钮框架
         ttk.Label(self.content_frame, text="教学工作情况", font=("Arial", 16, "bold")).pack(pady=10)
@@ -1504,7 +1186,7 @@ class ArchiveManagementSystem:
         
         # 创建教师列表
         columns = ("教师ID", "姓名", "任教学科", "班级数量")
-        self.teaching_tree = ttk.Treeview(list_frame, columns=columns, show="headings")
+        self.teaching_tree = VirtualTreeview(list_frame, columns=columns, show="headings")
         
         # 设置列标题
         for col in columns:
@@ -1512,8 +1194,8 @@ class ArchiveManagementSystem:
             self.teaching_tree.column(col, width=100)
         
         # 添加滚动条
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.teaching_tree.yview)
-        self.teaching_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
+        self.teaching_tree.attach_scrollbar(scrollbar)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.teaching_tree.pack(fill=tk.BOTH, expand=True)
         
@@ -1522,43 +1204,27 @@ class ArchiveManagementSystem:
         
         # 加载教师教学数据
         self.load_teaching_data()
+        self.screens.on_show(self.teaching_tree.refresh)
     # 加载教师教学数据
     def load_teaching_data(self):
-        # 清除现有数据
-        for item in self.teaching_tree.get_children():
-            self.teaching_tree.delete(item)
-        
         # 查询每个教师的教学记录
-        self.cursor.execute("""
-        SELECT t.teacher_id, t.name, t.teaching_subject,
-               COUNT(DISTINCT tr.classes) as class_count
-        FROM teacher_info t
-        LEFT JOIN teaching_records tr ON t.teacher_id = tr.teacher_id
-        GROUP BY t.teacher_id
-        """)
-        
-        teachers = self.cursor.fetchall()
-        for teacher in teachers:
-            self.teaching_tree.insert("", tk.END, values=teacher)
+        self.teaching_tree.set_query(self.conn, db_schema.sql("teaching_list"),
+                                     order_by=[("teacher_id", False)], cache=self.query_cache)
             
     def search_teaching(self, keyword):
-        # 清除现有数据
-        for item in self.teaching_tree.get_children():
-            self.teaching_tree.delete(item)
-        
-        # 搜索教师
-        self.cursor.execute("""
+        # 按姓名、任教学科全文检索
+        clause, params = search_index.match_clause(self.conn, "teacher", keyword, alias="t",
+                                                    columns=("name", "teaching_subject"))
+        query = """
         SELECT t.teacher_id, t.name, t.teaching_subject,
                COUNT(DISTINCT tr.classes) as class_count
         FROM teacher_info t
         LEFT JOIN teaching_records tr ON t.teacher_id = tr.teacher_id
-        WHERE t.name LIKE ? OR t.teaching_subject LIKE ?
+        WHERE """ + clause + """
         GROUP BY t.teacher_id
-        """, (f'%{keyword}%', f'%{keyword}%'))
-        
-        teachers = self.cursor.fetchall()
-        for teacher in teachers:
-            self.teaching_tree.insert("", tk.END, values=teacher)
+        """
+        self.teaching_tree.set_query(self.conn, query, params,
+                                     order_by=[("teacher_id", False)])
     # 显示教学详细信息
     def show_teaching_details(self, event):
         # 获取选中的教师ID
@@ -1669,15 +1335,11 @@ class ArchiveManagementSystem:
             
             ttk.Label(teacher_frame, text="选择教师：").pack(side=tk.LEFT)
             
-            # 获取所有教师
-            self.cursor.execute("SELECT teacher_id, name FROM teacher_info")
-            teachers = self.cursor.fetchall()
-            teacher_names = [f"{t[1]}" for t in teachers]
-            teacher_ids = [t[0] for t in teachers]
-            
+            # 教师下拉框(输入姓名或拼音可筛选)
             teacher_var = tk.StringVar()
-            teacher_combo = ttk.Combobox(teacher_frame, textvariable=teacher_var, values=teacher_names)
+            teacher_combo = ttk.Combobox(teacher_frame, textvariable=teacher_var)
             teacher_combo.pack(side=tk.LEFT, padx=5)
+            self.teacher_directory.attach(teacher_combo)
         
         # 创建输入框架
         input_frame = ttk.Frame(edit_window)
@@ -1756,22 +1418,14 @@ class ArchiveManagementSystem:
         def save_records():
             try:
                 # 获取选择的教师ID
-                current_teacher_id = teacher_id if teacher_id else teacher_ids[teacher_names.index(teacher_var.get())]
+                current_teacher_id = teacher_id if teacher_id else self.teacher_directory.resolve(teacher_var.get())
                 
                 # 验证输入
                 if not academic_year.get() or not semester.get() or not class_list:
                     raise ValueError("请填写完整的学年、学期和至少一个班级信息")
                 
-                # 开始事务
-                self.cursor.execute("BEGIN TRANSACTION")
-                
-                # 删除该教师在该学年学期的所有记录
-                self.cursor.execute("""
-                DELETE FROM teaching_records
-                WHERE teacher_id = ? AND academic_year = ? AND semester = ?
-                """, (current_teacher_id, academic_year.get(), semester.get()))
-                
-                # 插入新记录
+                # 新记录(全部验证通过后才写入)
+                records = []
                 for class_data in class_list:
                     class_name = class_data["class"].get()
                     student_count = class_data["count"].get()
@@ -1788,16 +1442,13 @@ class ArchiveManagementSystem:
                     except ValueError:
                         raise ValueError("人数和周课时必须是正整数")
                     
-                    self.cursor.execute("""
-                    INSERT INTO teaching_records
-                    (record_id, teacher_id, academic_year, semester, classes,
-                     student_count, weekly_hours, create_time, update_time)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
-                    """, (str(uuid.uuid4()), current_teacher_id, academic_year.get(),
-                           semester.get(), class_name, student_count, weekly_hours))
+                    records.append(repository.TeachingRecord(classes=class_name, student_count=student_count,
+                                                             weekly_hours=weekly_hours))
                 
-                # 提交事务
-                self.conn.commit()
+                # 在一个事务中替换该教师在该学年学期的所有记录
+                with self.db.writing() as conn, UnitOfWork(conn) as uow:
+                    repository.replace_teaching_records(uow, current_teacher_id, academic_year.get(),
+                                                        semester.get(), records)
                 
                 messagebox.showinfo("成功", "教学记录保存成功")
                 edit_window.destroy()
@@ -1823,7 +1474,8 @@ class ArchiveManagementSystem:
             add_class_row()
     # 显示教学工作情况页面
     def show_education_work(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_education_work"):
+            return
         ttk.Label(self.content_frame, text="教育工作情况", font=("Arial", 16, "bold")).pack(pady=10)
         
         # 创建主框架
@@ -1913,12 +1565,12 @@ class ArchiveManagementSystem:
         # 加载教育工作数据
         self.load_education_work_data()
         
+        # 再次进入页面时按当前筛选条件刷新数据
+        self.screens.on_show(self.filter_education_work)
+        
     def load_teacher_list(self):
-        # 从数据库加载教师列表
-        self.cursor.execute("SELECT teacher_id, name FROM teacher_info")
-        teachers = self.cursor.fetchall()
-        self.teacher_combobox['values'] = [teacher[1] for teacher in teachers]
-        self.teacher_dict = {teacher[1]: teacher[0] for teacher in teachers}
+        # 教师下拉框的选项来自教师名录，展开时总是最新的
+        self.teacher_directory.attach(self.teacher_combobox)
     
     def save_education_work(self):
         # 获取输入数据
@@ -1935,7 +1587,7 @@ class ArchiveManagementSystem:
         
         try:
             # 获取教师ID
-            teacher_id = self.teacher_dict[teacher_name]
+            teacher_id = self.teacher_directory.resolve(teacher_name)
             
             # 生成记录ID
             record_id = str(uuid.uuid4())
@@ -1966,13 +1618,9 @@ class ArchiveManagementSystem:
             messagebox.showerror("错误", f"保存失败: {str(e)}")
     
     def load_education_work_data(self, year=None, semester=None, teacher_name=None, work_type=None):
-        # 清除现有数据
-        for item in self.work_tree.get_children():
-            self.work_tree.delete(item)
-        
         # 构建查询语句
         query = """
-        SELECT t.name, e.academic_year, e.semester, e.work_type, e.description
+        SELECT t.name, e.academic_year, e.semester, e.work_type, e.description, e.record_id
         FROM education_work e
         JOIN teacher_info t ON e.teacher_id = t.teacher_id
         """
@@ -1987,24 +1635,25 @@ class ArchiveManagementSystem:
             conditions.append("e.semester = ?")
             params.append(semester)
         if teacher_name:
-            conditions.append("t.name LIKE ?")
-            params.append(f"%{teacher_name}%")
+            clause, clause_params = search_index.match_clause(self.conn, "teacher", teacher_name, alias="t",
+                                                              columns=("name",))
+            conditions.append(clause)
+            params.extend(clause_params)
         if work_type:
-            conditions.append("e.work_type LIKE ?")
-            params.append(f"%{work_type}%")
+            clause, clause_params = search_index.match_clause(self.conn, "edu_work", work_type, alias="e",
+                                                              columns=("work_type",))
+            conditions.append(clause)
+            params.extend(clause_params)
         
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
         
         query += " ORDER BY e.academic_year DESC, e.semester DESC"
         
-        # 执行查询
-        self.cursor.execute(query, params)
-        records = self.cursor.fetchall()
-        
-        # 显示数据
-        for record in records:
-            self.work_tree.insert("", tk.END, values=record)
+        # 后台查询，完成后按记录ID刷新表格
+        self.async_db.query(query, params, key="education_work", cached=True,
+                            on_done=lambda records: self.async_db.fill(self.work_tree, records,
+                                                                       lambda r: r[:-1], key=lambda r: r[-1]))
     
     def filter_education_work(self):
         year = self.filter_year.get()
@@ -2031,14 +1680,8 @@ class ArchiveManagementSystem:
             return
             
         try:
-            # 获取教师ID
-            teacher_id = self.teacher_dict[teacher_name]
-            
-            # 从数据库中删除记录
-            self.cursor.execute("""
-            DELETE FROM education_work
-            WHERE teacher_id = ? AND academic_year = ? AND semester = ?
-            """, (teacher_id, academic_year, semester))
+            # 从数据库中删除记录(表格行的ID即记录ID，同一学期的其他记录不受影响)
+            self.cursor.execute("DELETE FROM education_work WHERE record_id = ?", (selected_item[0],))
             
             self.conn.commit()
             
@@ -2052,7 +1695,8 @@ class ArchiveManagementSystem:
             messagebox.showerror("错误", f"删除失败: {str(e)}")
     # 荣誉管理
     def show_awards(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_awards"):
+            return
         ttk.Label(self.content_frame, text="荣誉管理", font=("Arial", 16, "bold")).pack(pady=10)
         
         # 创建主框架
@@ -2161,10 +1805,8 @@ class ArchiveManagementSystem:
             teacher_listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
             
             # 加载教师列表
-            self.cursor.execute("SELECT teacher_id, name FROM teacher_info")
-            teachers = self.cursor.fetchall()
-            for teacher in teachers:
-                teacher_listbox.insert(tk.END, f"{teacher[1]} (ID: {teacher[0]})")
+            for teacher in self.teacher_directory.teachers():
+                teacher_listbox.insert(tk.END, f"{teacher.name} (ID: {teacher.teacher_id})")
             
             # 确认选择按钮
             def confirm_selection():
@@ -2194,30 +1836,12 @@ class ArchiveManagementSystem:
                 return
             
             try:
-                # 开始事务
-                self.cursor.execute("BEGIN TRANSACTION")
-                
-                # 插入奖项记录
-                award_id = str(uuid.uuid4())
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                self.cursor.execute("""
-                INSERT INTO awards (award_id, award_name, award_level, award_unit, award_date, create_time, update_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (award_id, award_name, award_level, award_unit, award_date, current_time, current_time))
-                
-                # 插入获奖教师关联记录
-                for i, teacher_info in enumerate(selected_teachers.split(", ")):
-                    teacher_id = teacher_info.split("ID: ")[1].rstrip(")")
-                    relation_id = str(uuid.uuid4())
-                    
-                    self.cursor.execute("""
-                    INSERT INTO award_recipients (relation_id, award_id, teacher_id, rank, create_time, update_time)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """, (relation_id, award_id, teacher_id, i + 1, current_time, current_time))
-                
-                # 提交事务
-                self.conn.commit()
+                # 奖项及获奖教师关联记录在一个事务中写入，获奖等第按选择顺序
+                teacher_ids = [t.split("ID: ")[1].rstrip(")") for t in selected_teachers.split(", ")]
+                with self.db.writing() as conn, UnitOfWork(conn) as uow:
+                    repository.save_award(uow, repository.Award(award_name=award_name, award_level=award_level,
+                                                                award_unit=award_unit, award_date=award_date),
+                                          teacher_ids)
                 
                 # 清空表单
                 award_name_entry.delete(0, tk.END)
@@ -2251,7 +1875,7 @@ class ArchiveManagementSystem:
         
         # 创建表格
         columns = ("award_id", "表彰名称", "表彰级别", "表彰单位", "表彰时间", "获奖教师")
-        award_tree = ttk.Treeview(table_frame, columns=columns, show="headings")
+        award_tree = VirtualTreeview(table_frame, columns=columns, show="headings")
         
         # 设置列标题和宽度
         award_tree.heading("award_id", text="ID")
@@ -2262,8 +1886,8 @@ class ArchiveManagementSystem:
             award_tree.column(col, width=100)
         
         # 添加滚动条
-        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=award_tree.yview)
-        award_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL)
+        award_tree.attach_scrollbar(scrollbar)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         award_tree.pack(fill=tk.BOTH, expand=True)
         
@@ -2306,10 +1930,6 @@ class ArchiveManagementSystem:
         
         # 加载表彰数据
         def load_awards(filter_entries=None):
-            # 清除现有数据
-            for item in award_tree.get_children():
-                award_tree.delete(item)
-            
             # 构建查询条件
             conditions = []
             params = []
@@ -2336,42 +1956,24 @@ class ArchiveManagementSystem:
                     params.append(f"%{filter_entries['teacher_name'].get().strip()}%")
             
             # 构建SQL查询
-            query = """
-            SELECT a.award_id, a.award_name, a.award_level, a.award_unit, a.award_date, GROUP_CONCAT(t.name) as teachers
-            FROM awards a
-            LEFT JOIN award_recipients ar ON a.award_id = ar.award_id
-            LEFT JOIN teacher_info t ON ar.teacher_id = t.teacher_id
-            """
+            query = db_schema.sql("award_list")
             
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
             
-            query += """
-            GROUP BY a.award_id
-            ORDER BY 
-                CASE a.award_level
-                    WHEN '全球级' THEN 1
-                    WHEN '国家级' THEN 2
-                    WHEN '省级' THEN 3
-                    WHEN '市级' THEN 4
-                    WHEN '校级' THEN 5
-                    ELSE 6
-                END,
-                a.award_date DESC
-            """
-            
-            # 执行查询
-            self.cursor.execute(query, params)
-            awards = self.cursor.fetchall()
+            query += " GROUP BY a.award_id"
             
-            for award in awards:
-                award_tree.insert("", tk.END, values=award)
+            # 按级别、时间排序分页加载
+            award_tree.set_query(self.conn, query, params, order_by=db_schema.AWARD_LIST_ORDER,
+                                 cache=self.query_cache)
         
         # 初始加载数据
         load_awards()
+        self.screens.on_show(award_tree.refresh)
     #教学比武获奖
     def show_teachingfight_records(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_teachingfight_records"):
+            return
         
         # 创建标题
         ttk.Label(self.content_frame, text="教学比武获奖", font=("Arial", 16, "bold")).pack(pady=10)
@@ -2390,8 +1992,8 @@ class ArchiveManagementSystem:
         name_filter.grid(row=0, column=1, padx=5, pady=5)
         
         ttk.Label(filter_frame, text="获奖名称:").grid(row=0, column=2, padx=5, pady=5)
-        award_filter = ttk.Entry(filter_frame)
-        award_filter.grid(row=0, column=3, padx=5, pady=5)
+        award_name_filter = ttk.Entry(filter_frame)
+        award_name_filter.grid(row=0, column=3, padx=5, pady=5)
         
         ttk.Label(filter_frame, text="获奖级别:").grid(row=0, column=4, padx=5, pady=5)
         level_filter = ttk.Combobox(filter_frame, values=["", "全球级", "国家级", "省级", "市级", "校级"], state="readonly")
@@ -2432,11 +2034,8 @@ class ArchiveManagementSystem:
         teacher_combobox = ttk.Combobox(teacher_frame, state="readonly")
         teacher_combobox.pack(side=tk.LEFT, padx=5)
         
-        # 加载教师列表
-        self.cursor.execute("SELECT teacher_id, name FROM teacher_info")
-        teachers = self.cursor.fetchall()
-        teacher_combobox['values'] = [f"{t[1]}" for t in teachers]
-        teacher_dict = {t[1]: t[0] for t in teachers}
+        # 教师下拉框的选项来自教师名录
+        self.teacher_directory.attach(teacher_combobox)
         
         # 创建表格显示获奖记录
         columns = ("教师姓名", "获奖名称", "获奖级别", "获奖时间")
@@ -2452,22 +2051,19 @@ class ArchiveManagementSystem:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         award_tree.pack(fill=tk.BOTH, expand=True)
         
-        def load_awards():
-            # 清除现有数据
-            for item in award_tree.get_children():
-                award_tree.delete(item)
-            
+        # 根据筛选条件构建查询
+        def build_award_query():
             # 构建查询条件
-            conditions = ["a.award_type = '教学比武'"]
+            conditions = []
             params = []
             
             if name_filter.get().strip():
                 conditions.append("t.name LIKE ?")
                 params.append(f'%{name_filter.get().strip()}%')
             
-            if award_filter.get().strip():
+            if award_name_filter.get().strip():
                 conditions.append("a.award_name LIKE ?")
-                params.append(f'%{award_filter.get().strip()}%')
+                params.append(f'%{award_name_filter.get().strip()}%')
             
             if level_filter.get():
                 conditions.append("a.award_level = ?")
@@ -2477,30 +2073,22 @@ class ArchiveManagementSystem:
                 conditions.append("a.award_date LIKE ?")
                 params.append(f'%{date_filter.get().strip()}%')
             
-            # 构建SQL查询
-            query = """
-                SELECT t.name, a.award_name, a.award_level, a.award_date, a.award_id
-                FROM awards a 
-                JOIN award_recipients ar ON a.award_id = ar.award_id 
-                JOIN teacher_info t ON ar.teacher_id = t.teacher_id 
-                WHERE " + " AND ".join(conditions) + "
-                ORDER BY 
-                    CASE a.award_level 
-                        WHEN '全球级' THEN 1 
-                        WHEN '国家级' THEN 2 
-                        WHEN '省级' THEN 3 
-                        WHEN '市级' THEN 4 
-                        WHEN '校级' THEN 5 
-                        ELSE 6 
-                    END
-            """
-            
-            # 执行查询
-            self.cursor.execute(query, params)
-            awards = self.cursor.fetchall()
-            
-            for award in awards:
-                award_tree.insert("", tk.END, values=award[:-1], tags=(award[-1],))
+            # 构建SQL查询(按级别从高到低)
+            query = (db_schema.sql("teachingfight_list") + "".join(" AND " + c for c in conditions)
+                     + " ORDER BY " + db_schema.AWARD_LEVEL_RANK)
+            return query, params
+        
+        # 显示查询结果(按获奖人员记录增量刷新，标签为表彰ID)
+        def fill_awards(awards):
+            tree_diff.sync(award_tree, awards, key=lambda a: a[5], values=lambda a: a[:4], tags=lambda a: (a[4],))
+        
+        # 筛选在后台执行，输入停顿后才查询
+        award_filter = FilterEngine(award_tree, self.async_db, build_award_query, fill_awards)
+        
+        # 数据修改后重新加载
+        def load_awards():
+            award_filter.invalidate()
+            award_filter.refresh()
         
         def save_award():
             # 获取输入数据
@@ -2515,29 +2103,11 @@ class ArchiveManagementSystem:
                 return
             
             try:
-                # 开始事务
-                self.cursor.execute("BEGIN TRANSACTION")
-                
-                # 插入奖项记录
-                award_id = str(uuid.uuid4())
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                self.cursor.execute("""
-                    INSERT INTO awards (award_id, award_name, award_level, award_date, award_type, create_time, update_time)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (award_id, award_name, award_level, award_date, "教学比武", current_time, current_time))
-                
-                # 插入获奖人员关联记录
-                relation_id = str(uuid.uuid4())
-                teacher_id = teacher_dict[teacher_name]
-                
-                self.cursor.execute("""
-                    INSERT INTO award_recipients (relation_id, award_id, teacher_id, rank, create_time, update_time)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (relation_id, award_id, teacher_id, 1, current_time, current_time))
-                
-                # 提交事务
-                self.conn.commit()
+                # 奖项及获奖人员关联记录在一个事务中写入
+                with self.db.writing() as conn, UnitOfWork(conn) as uow:
+                    repository.save_award(uow, repository.Award(award_name=award_name, award_level=award_level,
+                                                                award_date=award_date, award_type="教学比武"),
+                                          [self.teacher_directory.resolve(teacher_name)])
                 messagebox.showinfo("成功", "获奖记录已保存")
                 
                 # 清空输入框
@@ -2585,6 +2155,7 @@ class ArchiveManagementSystem:
                 
                 # 从树形视图中移除
                 award_tree.delete(selected_item[0])
+                award_filter.invalidate()
                 
                 messagebox.showinfo("成功", "已删除获奖记录")
                 
@@ -2602,19 +2173,20 @@ class ArchiveManagementSystem:
         ttk.Button(button_frame, text="删除", command=delete_award).pack(side=tk.LEFT, padx=5)
         
         # 绑定筛选条件变化事件
-        def on_filter_change(*args):
-            load_awards()
-        
-        name_filter.bind('<KeyRelease>', on_filter_change)
-        award_filter.bind('<KeyRelease>', on_filter_change)
-        level_filter.bind('<<ComboboxSelected>>', on_filter_change)
-        date_filter.bind('<KeyRelease>', on_filter_change)
+        name_filter.bind('<KeyRelease>', award_filter.schedule)
+        award_name_filter.bind('<KeyRelease>', award_filter.schedule)
+        level_filter.bind('<<ComboboxSelected>>', award_filter.schedule)
+        date_filter.bind('<KeyRelease>', award_filter.schedule)
         
         # 初始加载获奖记录
-        load_awards()
+        award_filter.refresh()
+        
+        # 再次进入页面时重新加载获奖记录
+        self.screens.on_show(load_awards)
     #公开课管理
     def show_public_lessons(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_public_lessons"):
+            return
         
         # 创建标题
         ttk.Label(self.content_frame, text="公开课管理", font=("Arial", 16, "bold")).pack(pady=10)
@@ -2641,11 +2213,8 @@ class ArchiveManagementSystem:
         lesson_date_entry.grid(row=1, column=3, padx=5, pady=5)
         lesson_date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
         
-        # 加载教师列表
-        self.cursor.execute("SELECT teacher_id, name FROM teacher_info")
-        teachers = self.cursor.fetchall()
-        teacher_combobox['values'] = [f"{t[1]}" for t in teachers]
-        teacher_dict = {t[1]: t[0] for t in teachers}
+        # 教师下拉框的选项来自教师名录
+        self.teacher_directory.attach(teacher_combobox)
         
         # 创建保存按钮
         def save_lesson():
@@ -2662,7 +2231,7 @@ class ArchiveManagementSystem:
             
             try:
                 # 获取教师ID
-                teacher_id = teacher_dict[teacher_name]
+                teacher_id = self.teacher_directory.resolve(teacher_name)
                 
                 # 生成记录ID
                 lesson_id = str(uuid.uuid4())
@@ -2732,12 +2301,8 @@ class ArchiveManagementSystem:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         lesson_tree.pack(fill=tk.BOTH, expand=True)
         
-        # 加载公开课列表
-        def load_lessons():
-            # 清除现有数据
-            for item in lesson_tree.get_children():
-                lesson_tree.delete(item)
-            
+        # 根据筛选条件构建查询
+        def build_lesson_query():
             # 构建查询条件
             conditions = []
             params = []
@@ -2760,7 +2325,7 @@ class ArchiveManagementSystem:
             
             # 构建SQL查询
             query = """
-            SELECT t.name, p.lesson_name, p.lesson_scope, p.lesson_date 
+            SELECT t.name, p.lesson_name, p.lesson_scope, p.lesson_date, p.lesson_id
             FROM public_lessons p 
             JOIN teacher_info t ON p.teacher_id = t.teacher_id
             """
@@ -2769,23 +2334,25 @@ class ArchiveManagementSystem:
                 query += " WHERE " + " AND ".join(conditions)
             
             query += " ORDER BY p.lesson_date DESC"
-            
-            # 执行查询
-            self.cursor.execute(query, params)
-            lessons = self.cursor.fetchall()
-            
-            # 添加到表格
-            for lesson in lessons:
-                lesson_tree.insert("", tk.END, values=lesson)
+            return query, params
         
-        # 绑定筛选条件变化事件
-        def on_filter_change(*args):
-            load_lessons()
+        # 显示查询结果(按公开课ID增量刷新)
+        def fill_lessons(lessons):
+            tree_diff.sync(lesson_tree, lessons, key=lambda l: l[4], values=lambda l: l[:4])
+        
+        # 筛选在后台执行，输入停顿后才查询
+        lesson_filter = FilterEngine(lesson_tree, self.async_db, build_lesson_query, fill_lessons)
+        
+        # 数据修改后重新加载
+        def load_lessons():
+            lesson_filter.invalidate()
+            lesson_filter.refresh()
         
-        filter_teacher.bind('<KeyRelease>', on_filter_change)
-        filter_lesson.bind('<KeyRelease>', on_filter_change)
-        filter_scope.bind('<<ComboboxSelected>>', on_filter_change)
-        filter_date.bind('<KeyRelease>', on_filter_change)
+        # 绑定筛选条件变化事件
+        filter_teacher.bind('<KeyRelease>', lesson_filter.schedule)
+        filter_lesson.bind('<KeyRelease>', lesson_filter.schedule)
+        filter_scope.bind('<<ComboboxSelected>>', lesson_filter.schedule)
+        filter_date.bind('<KeyRelease>', lesson_filter.schedule)
         
         # 定义删除公开课记录的函数
         def delete_lesson():
@@ -2796,17 +2363,14 @@ class ArchiveManagementSystem:
                 if not messagebox.askyesno("确认删除", f"确定要删除{lesson_info[0]}老师的{lesson_info[1]}公开课记录吗？\n此操作不可恢复！"):
                     return
                 
-                # 从数据库中删除记录
-                self.cursor.execute("""
-                DELETE FROM public_lessons
-                WHERE teacher_id = (SELECT teacher_id FROM teacher_info WHERE name = ?)
-                AND lesson_name = ? AND lesson_scope = ? AND lesson_date = ?
-                """, (lesson_info[0], lesson_info[1], lesson_info[2], lesson_info[3]))
+                # 从数据库中删除记录(表格行的ID即公开课ID)
+                self.cursor.execute("DELETE FROM public_lessons WHERE lesson_id = ?", (selected_item,))
                 
                 self.conn.commit()
                 
                 # 从树形视图中删除
                 lesson_tree.delete(selected_item)
+                lesson_filter.invalidate()
                 
                 messagebox.showinfo("成功", "已删除公开课记录")
                 
@@ -2820,10 +2384,14 @@ class ArchiveManagementSystem:
         ttk.Button(input_frame, text="删除", command=delete_lesson).grid(row=1, column=5, padx=10, pady=5)
         
         # 初始加载数据
-        load_lessons()
+        lesson_filter.refresh()
+        
+        # 再次进入页面时重新加载公开课记录
+        self.screens.on_show(load_lessons)
     #论文管理
     def show_papers(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_papers"):
+            return
         
         # 创建标题和按钮框架
         ttk.Label(self.content_frame, text="论文发表情况", font=("Arial", 16, "bold")).pack(pady=10)
@@ -2848,7 +2416,7 @@ class ArchiveManagementSystem:
         
         # 创建论文列表
         columns = ("教师ID", "教师姓名", "论文数量")
-        self.papers_tree = ttk.Treeview(list_frame, columns=columns, show="headings")
+        self.papers_tree = VirtualTreeview(list_frame, columns=columns, show="headings")
         
         # 设置列标题和宽度
         for col in columns:
@@ -2856,8 +2424,8 @@ class ArchiveManagementSystem:
             self.papers_tree.column(col, width=100)
         
         # 添加滚动条
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.papers_tree.yview)
-        self.papers_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL)
+        self.papers_tree.attach_scrollbar(scrollbar)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.papers_tree.pack(fill=tk.BOTH, expand=True)
         
@@ -2866,49 +2434,28 @@ class ArchiveManagementSystem:
         
         # 加载论文数据
         self.load_papers_data()
+        self.screens.on_show(self.papers_tree.refresh)
     
     # 加载论文数据
     def load_papers_data(self):
-        # 清除现有数据
-        for item in self.papers_tree.get_children():
-            self.papers_tree.delete(item)
-        
         # 查询每个教师的论文数量
-        self.cursor.execute("""
-        SELECT t.teacher_id, t.name, COUNT(p.paper_id) as paper_count
-        FROM teacher_info t
-        LEFT JOIN papers p ON t.teacher_id = p.teacher_id
-        GROUP BY t.teacher_id, t.name
-        ORDER BY t.name
-        """)
-        
-        teachers_papers = self.cursor.fetchall()
-        
-        # 将数据添加到树形视图
-        for teacher in teachers_papers:
-            self.papers_tree.insert("", tk.END, values=teacher)
+        self.papers_tree.set_query(self.conn, db_schema.sql("papers_list"),
+                                   order_by=[("name", False, False), ("teacher_id", False)], cache=self.query_cache)
     
     # 搜索论文
     def search_papers(self, keyword):
-        # 清除现有数据
-        for item in self.papers_tree.get_children():
-            self.papers_tree.delete(item)
-        
-        # 搜索教师及其论文
-        self.cursor.execute("""
+        # 按姓名、身份证号全文检索教师
+        clause, params = search_index.match_clause(self.conn, "teacher", keyword, alias="t",
+                                                    columns=("name", "id_number"))
+        query = """
         SELECT t.teacher_id, t.name, COUNT(p.paper_id) as paper_count
         FROM teacher_info t
         LEFT JOIN papers p ON t.teacher_id = p.teacher_id
-        WHERE t.name LIKE ? OR t.id_number LIKE ?
+        WHERE """ + clause + """
         GROUP BY t.teacher_id, t.name
-        ORDER BY t.name
-        """, (f'%{keyword}%', f'%{keyword}%'))
-        
-        teachers_papers = self.cursor.fetchall()
-        
-        # 将数据添加到树形视图
-        for teacher in teachers_papers:
-            self.papers_tree.insert("", tk.END, values=teacher)
+        """
+        self.papers_tree.set_query(self.conn, query, params,
+                                   order_by=[("name", False, False), ("teacher_id", False)])
     
     # 双击论文记录事件
     def on_paper_selected(self, event):
@@ -3107,11 +2654,9 @@ class ArchiveManagementSystem:
         teacher_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # 加载教师数据
-        self.cursor.execute("SELECT teacher_id, name, gender, teaching_subject FROM teacher_info ORDER BY name")
-        teachers = self.cursor.fetchall()
-        
-        for teacher in teachers:
-            teacher_tree.insert("", tk.END, values=teacher)
+        for teacher in self.teacher_directory.teachers():
+            teacher_tree.insert("", tk.END, values=(teacher.teacher_id, teacher.label, teacher.gender,
+                                                    teacher.teaching_subject))
         
         # 搜索功能
         def search_teacher():
@@ -3121,18 +2666,10 @@ class ArchiveManagementSystem:
             for item in teacher_tree.get_children():
                 teacher_tree.delete(item)
             
-            # 搜索教师
-            self.cursor.execute("""
-            SELECT teacher_id, name, gender, teaching_subject 
-            FROM teacher_info 
-            WHERE name LIKE ? OR id_number LIKE ?
-            ORDER BY name
-            """, (f'%{keyword}%', f'%{keyword}%'))
-            
-            teachers = self.cursor.fetchall()
-            
-            for teacher in teachers:
-                teacher_tree.insert("", tk.END, values=teacher)
+            # 按姓名、身份证号或拼音搜索教师
+            for teacher in self.teacher_directory.search(keyword):
+                teacher_tree.insert("", tk.END, values=(teacher.teacher_id, teacher.label, teacher.gender,
+                                                        teacher.teaching_subject))
         
         ttk.Button(search_frame, text="搜索", command=search_teacher).pack(side=tk.LEFT, padx=5)
         
@@ -3268,12 +2805,11 @@ class ArchiveManagementSystem:
     
     # 获取教师姓名
     def get_teacher_name(self, teacher_id):
-        self.cursor.execute("SELECT name FROM teacher_info WHERE teacher_id = ?", (teacher_id,))
-        result = self.cursor.fetchone()
-        return result[0] if result else "未知教师"
+        return self.teacher_directory.name(teacher_id, "未知教师")
     # 显示课题解题管理页面
     def show_research_projects(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_research_projects"):
+            return
         ttk.Label(self.content_frame, text="课题结题管理", font=("Arial", 16, "bold")).pack(pady=10)
         
         # 创建主框架
@@ -3327,6 +2863,14 @@ class ArchiveManagementSystem:
         
         # 加载课题数据
         self.load_research_projects()
+        
+        # 再次进入页面时按搜索框中的条件刷新
+        def refresh():
+            if search_entry.get().strip():
+                self.search_projects(search_entry.get())
+            else:
+                self.load_research_projects()
+        self.screens.on_show(refresh)
 
     def add_research_project(self, project_data=None):
         # 创建新窗口
@@ -3359,19 +2903,16 @@ class ArchiveManagementSystem:
         leader_combobox = ttk.Combobox(form_frame, width=37)
         leader_combobox.grid(row=3, column=1, columnspan=2, sticky=tk.W, pady=5)
         
-        # 获取所有教师列表
-        self.cursor.execute("SELECT teacher_id, name FROM teacher_info")
-        teachers = self.cursor.fetchall()
-        teacher_list = [f"{t[1]}" for t in teachers]
-        teacher_ids = [t[0] for t in teachers]
-        leader_combobox['values'] = teacher_list
+        # 获取所有教师列表(重名教师显示身份证号)
+        self.teacher_directory.attach(leader_combobox)
+        teachers = self.teacher_directory.teachers()
         
         # 核心成员选择
         ttk.Label(form_frame, text="核心成员:").grid(row=4, column=0, sticky=tk.W, pady=5)
         members_listbox = tk.Listbox(form_frame, selectmode=tk.MULTIPLE, width=40, height=6)
         members_listbox.grid(row=4, column=1, columnspan=2, sticky=tk.W, pady=5)
-        for teacher in teacher_list:
-            members_listbox.insert(tk.END, teacher)
+        for teacher in teachers:
+            members_listbox.insert(tk.END, teacher.label)
         
         # 保存按钮
         def save_project():
@@ -3379,8 +2920,6 @@ class ArchiveManagementSystem:
             project_name = name_entry.get().strip()
             project_level = level_combobox.get().strip()
             completion_date = completion_entry.get().strip()
-            leader_index = teacher_list.index(leader_combobox.get())
-            leader_id = teacher_ids[leader_index]
             
             # 验证必填字段
             if not all([project_name, project_level, completion_date, leader_combobox.get()]):
@@ -3388,40 +2927,14 @@ class ArchiveManagementSystem:
                 return
             
             try:
-                # 开始事务
-                self.cursor.execute("BEGIN TRANSACTION")
-                
-                # 生成项目ID
-                project_id = str(uuid.uuid4())
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                # 插入课题信息
-                self.cursor.execute("""
-                INSERT INTO research_projects 
-                (project_id, project_name, project_level, completion_date, create_time, update_time)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """, (project_id, project_name, project_level, completion_date, current_time, current_time))
-                
-                # 插入主持人信息
-                self.cursor.execute("""
-                INSERT INTO project_members 
-                (relation_id, project_id, teacher_id, is_leader, member_rank, create_time, update_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (str(uuid.uuid4()), project_id, leader_id, True, 1, current_time, current_time))
-                
-                # 插入核心成员信息
-                selected_indices = members_listbox.curselection()
-                for rank, idx in enumerate(selected_indices, start=2):
-                    if teacher_list[idx] != leader_combobox.get():  # 避免重复添加主持人
-                        member_id = teacher_ids[idx]
-                        self.cursor.execute("""
-                        INSERT INTO project_members 
-                        (relation_id, project_id, teacher_id, is_leader, member_rank, create_time, update_time)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """, (str(uuid.uuid4()), project_id, member_id, False, rank, current_time, current_time))
-                
-                # 提交事务
-                self.conn.commit()
+                leader_id = self.teacher_directory.resolve(leader_combobox.get())
+                # 课题、主持人及核心成员在一个事务中写入(成员中的主持人不重复添加)
+                member_ids = [teachers[idx].teacher_id for idx in members_listbox.curselection()]
+                with self.db.writing() as conn, UnitOfWork(conn) as uow:
+                    repository.save_project(uow, repository.ResearchProject(project_name=project_name,
+                                                                            project_level=project_level,
+                                                                            completion_date=completion_date),
+                                            leader_id, member_ids)
                 messagebox.showinfo("成功", "课题信息保存成功")
                 project_window.destroy()
                 self.load_research_projects()  # 刷新课题列表
@@ -3438,56 +2951,35 @@ class ArchiveManagementSystem:
             name_entry.insert(0, project_data['project_name'])
             level_combobox.set(project_data['project_level'])
             completion_entry.insert(0, project_data['completion_date'])
-            leader_combobox.set(project_data['leader_name'])
+            leader_combobox.set(self.teacher_directory.label(project_data['leader_id']))
             
             # 选择核心成员
-            for member in project_data['members']:
-                if member in teacher_list:
-                    idx = teacher_list.index(member)
+            for idx, teacher in enumerate(teachers):
+                if teacher.teacher_id in project_data['member_ids']:
                     members_listbox.selection_set(idx)
     
     def load_research_projects(self):
-        # 清除现有数据
-        for item in self.project_tree.get_children():
-            self.project_tree.delete(item)
-        
-        # 查询课题信息，包括主持人姓名
-        self.cursor.execute("""
-        SELECT rp.project_id, rp.project_name, rp.project_level, rp.completion_date, 
-               ti.name as leader_name
-        FROM research_projects rp
-        LEFT JOIN project_members pm ON rp.project_id = pm.project_id AND pm.is_leader = 1
-        LEFT JOIN teacher_info ti ON pm.teacher_id = ti.teacher_id
-        ORDER BY rp.completion_date DESC
-        """)
-        
-        projects = self.cursor.fetchall()
-        
-        # 将数据添加到树形视图
-        for project in projects:
-            self.project_tree.insert("", tk.END, values=project)
+        # 查询课题信息，包括主持人姓名，完成后添加到树形视图
+        self.async_db.query(db_schema.sql("projects_list"), key="projects", cached=True,
+                            on_done=lambda projects: self.async_db.fill(self.project_tree, projects,
+                                                                        key=lambda p: p[0]))
     
     def search_projects(self, keyword):
-        # 清除现有数据
-        for item in self.project_tree.get_children():
-            self.project_tree.delete(item)
-        
-        # 搜索课题
-        self.cursor.execute("""
+        # 按课题名称、主持人姓名全文检索，课题级别直接匹配
+        project_clause, project_params = search_index.match_clause(self.conn, "project", keyword, alias="rp")
+        leader_clause, leader_params = search_index.match_clause(self.conn, "teacher", keyword, alias="ti",
+                                                                 columns=("name",))
+        self.async_db.query("""
         SELECT rp.project_id, rp.project_name, rp.project_level, rp.completion_date, 
                ti.name as leader_name
         FROM research_projects rp
         LEFT JOIN project_members pm ON rp.project_id = pm.project_id AND pm.is_leader = 1
         LEFT JOIN teacher_info ti ON pm.teacher_id = ti.teacher_id
-        WHERE rp.project_name LIKE ? OR rp.project_level LIKE ? OR ti.name LIKE ?
+        WHERE """ + project_clause + " OR rp.project_level LIKE ? OR " + leader_clause + """
         ORDER BY rp.completion_date DESC
-        """, (f'%{keyword}%', f'%{keyword}%', f'%{keyword}%'))
-        
-        projects = self.cursor.fetchall()
-        
-        # 将数据添加到树形视图
-        for project in projects:
-            self.project_tree.insert("", tk.END, values=project)
+        """, project_params + [f'%{keyword}%'] + leader_params, key="projects",
+                            on_done=lambda projects: self.async_db.fill(self.project_tree, projects,
+                                                                        key=lambda p: p[0]))
     
     def edit_research_project(self, event):
         # 获取选中的课题信息
@@ -3496,13 +2988,11 @@ class ArchiveManagementSystem:
         
         # 查询课题详细信息
         self.cursor.execute("""
-        SELECT rp.*, ti.name as leader_name,
-               GROUP_CONCAT(t2.name) as member_names
+        SELECT rp.*, pm.teacher_id as leader_id,
+               GROUP_CONCAT(pm2.teacher_id) as member_ids
         FROM research_projects rp
         LEFT JOIN project_members pm ON rp.project_id = pm.project_id AND pm.is_leader = 1
-        LEFT JOIN teacher_info ti ON pm.teacher_id = ti.teacher_id
         LEFT JOIN project_members pm2 ON rp.project_id = pm2.project_id AND pm2.is_leader = 0
-        LEFT JOIN teacher_info t2 ON pm2.teacher_id = t2.teacher_id
         WHERE rp.project_id = ?
         GROUP BY rp.project_id
         """, (project_id,))
@@ -3515,15 +3005,16 @@ class ArchiveManagementSystem:
                 'project_name': project[1],
                 'project_level': project[2],
                 'completion_date': project[3],
-                'leader_name': project[6],
-                'members': project[7].split(',') if project[7] else []
+                'leader_id': project[6],
+                'member_ids': project[7].split(',') if project[7] else []
             }
             
             # 打开编辑窗口
             self.add_research_project(project_data)
     # 显示学生竞赛辅导页面
     def show_student_competitions(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_student_competitions"):
+            return
         
         # 创建标题
         ttk.Label(self.content_frame, text="学生竞赛辅导管理", font=("Arial", 16, "bold")).pack(pady=10)
@@ -3579,6 +3070,8 @@ class ArchiveManagementSystem:
         
         # 创建竞赛列表
         self.create_competition_list()
+        # 再次进入页面时按当前筛选条件刷新
+        self.screens.on_show(self.apply_competition_filters)
 
     def show_add_competition_dialog(self):
         # 创建对话框
@@ -3628,16 +3121,12 @@ class ArchiveManagementSystem:
             # 将输入的教师姓名分割成列表
             teacher_names = [name.strip() for name in teachers_input.split(',')]
             
-            # 查询教师ID
-            selected_teachers = []
-            for name in teacher_names:
-                self.cursor.execute("SELECT teacher_id FROM teacher_info WHERE name = ?", (name,))
-                result = self.cursor.fetchone()
-                if result:
-                    selected_teachers.append(result[0])
-                else:
-                    messagebox.showerror("错误", f"找不到教师：{name}")
-                    return
+            # 查询教师ID(重名教师需输入“姓名 (身份证号)”)
+            try:
+                selected_teachers = [self.teacher_directory.resolve(name) for name in teacher_names]
+            except ValueError as e:
+                messagebox.showerror("错误", str(e))
+                return
                 
             # 验证输入
             if not all([competition_name.get(), winner_count.get(), award_level.get(), competition_date.get()]):
@@ -3695,23 +3184,23 @@ class ArchiveManagementSystem:
         self.apply_competition_filters()
 
     def apply_competition_filters(self, event=None):
-        # 清空现有数据
-        for item in self.competition_tree.get_children():
-            self.competition_tree.delete(item)
-        
         # 构建查询条件
         conditions = []
         params = []
         
         # 竞赛名称筛选
         if hasattr(self, 'competition_name_filter') and self.competition_name_filter.get():
-            conditions.append("c.competition_name LIKE ?")
-            params.append(f"%{self.competition_name_filter.get()}%")
+            clause, clause_params = search_index.match_clause(self.conn, "competition",
+                                                              self.competition_name_filter.get(), alias="c")
+            conditions.append(clause)
+            params.extend(clause_params)
         
         # 辅导教师筛选
         if hasattr(self, 'teacher_filter') and self.teacher_filter.get():
-            conditions.append("t.name LIKE ?")
-            params.append(f"%{self.teacher_filter.get()}%")
+            clause, clause_params = search_index.match_clause(self.conn, "teacher", self.teacher_filter.get(),
+                                                              alias="t", columns=("name",))
+            conditions.append(clause)
+            params.extend(clause_params)
         
         # 获奖人数筛选
         if hasattr(self, 'winner_count_filter') and self.winner_count_filter.get():
@@ -3748,13 +3237,10 @@ class ArchiveManagementSystem:
         ORDER BY c.competition_date DESC
         """
         
-        # 执行查询
-        self.cursor.execute(query, params)
-        competitions = self.cursor.fetchall()
-        
-        # 更新表格
-        for comp in competitions:
-            self.competition_tree.insert("", tk.END, values=comp)
+        # 后台查询，完成后更新表格(连续输入时只保留最后一次查询)
+        self.async_db.query(query, params, key="competitions", cached=True,
+                            on_done=lambda competitions: self.async_db.fill(self.competition_tree, competitions,
+                                                                            key=lambda c: c[0]))
 
     def edit_competition(self, tree):
         try:
@@ -3795,19 +3281,15 @@ class ArchiveManagementSystem:
             teacher_frame = ttk.Frame(input_frame)
             teacher_frame.grid(row=1, column=1, columnspan=2, sticky=tk.W, pady=5)
             
-            # 获取所有教师列表
-            self.cursor.execute("SELECT teacher_id, name FROM teacher_info")
-            teachers = self.cursor.fetchall()
-            
             # 获取当前选中的教师ID列表
             selected_teacher_ids = comp_data[4].split(',') if comp_data[4] else []
             
             # 创建教师选择框
             teacher_vars = {}
-            for i, (tid, name) in enumerate(teachers):
-                var = tk.BooleanVar(value=tid in selected_teacher_ids)
-                teacher_vars[tid] = var
-                ttk.Checkbutton(teacher_frame, text=name, variable=var).grid(row=i//3, column=i%3, padx=5)
+            for i, teacher in enumerate(self.teacher_directory.teachers()):
+                var = tk.BooleanVar(value=teacher.teacher_id in selected_teacher_ids)
+                teacher_vars[teacher.teacher_id] = var
+                ttk.Checkbutton(teacher_frame, text=teacher.label, variable=var).grid(row=i//3, column=i%3, padx=5)
             
             # 获奖人数
             ttk.Label(input_frame, text="获奖人数:").grid(row=2, column=0, sticky=tk.W, pady=5)
@@ -3938,7 +3420,8 @@ class ArchiveManagementSystem:
     
     # 显示青蓝工程页面    
     def show_mentoring(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_mentoring"):
+            return
         ttk.Label(self.content_frame, text="青蓝工程", font=("Arial", 16, "bold")).pack(pady=10)
         
         # 创建主框架
@@ -4023,18 +3506,13 @@ class ArchiveManagementSystem:
         # 加载现有师徒关系数据
         self.load_mentoring_data()
         
-    def load_teacher_data_to_combobox(self):
-        # 从数据库加载教师数据
-        self.cursor.execute("SELECT teacher_id, name FROM teacher_info")
-        teachers = self.cursor.fetchall()
-        
-        # 创建教师ID到姓名的映射
-        self.teacher_id_map = {teacher[0]: teacher[1] for teacher in teachers}
+        # 再次进入页面时重新加载师徒关系
+        self.screens.on_show(self.load_mentoring_data)
         
-        # 设置下拉框选项
-        teacher_names = [teacher[1] for teacher in teachers]
-        self.mentor_combobox['values'] = teacher_names
-        self.apprentice_combobox['values'] = teacher_names
+    def load_teacher_data_to_combobox(self):
+        # 下拉框选项来自教师名录
+        self.teacher_directory.attach(self.mentor_combobox)
+        self.teacher_directory.attach(self.apprentice_combobox)
     
     def save_mentoring(self):
         # 获取输入数据
@@ -4050,33 +3528,23 @@ class ArchiveManagementSystem:
             return
         
         # 获取教师ID
-        mentor_id = None
-        apprentice_id = None
-        for teacher_id, name in self.teacher_id_map.items():
-            if name == mentor_name:
-                mentor_id = teacher_id
-            if name == apprentice_name:
-                apprentice_id = teacher_id
+        try:
+            mentor_id = self.teacher_directory.resolve(mentor_name)
+            apprentice_id = self.teacher_directory.resolve(apprentice_name)
+        except ValueError as e:
+            messagebox.showerror("错误", str(e))
+            return
         
         if mentor_id == apprentice_id:
             messagebox.showerror("错误", "指导教师和徒弟不能是同一人")
             return
         
         try:
-            # 生成记录ID
-            mentoring_id = str(uuid.uuid4())
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
             # 保存到数据库
-            self.cursor.execute("""
-            INSERT INTO mentoring (
-                mentoring_id, teacher_id, apprentice_id, start_date, end_date,
-                achievements, create_time, update_time
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (mentoring_id, mentor_id, apprentice_id, start_date, end_date,
-                  achievements, current_time, current_time))
-            
-            self.conn.commit()
+            with self.db.writing() as conn, UnitOfWork(conn) as uow:
+                repository.save_mentoring(uow, repository.Mentoring(teacher_id=mentor_id, apprentice_id=apprentice_id,
+                                                                    start_date=start_date, end_date=end_date,
+                                                                    achievements=achievements))
             
             # 清空输入框
             self.mentor_combobox.set('')
@@ -4095,10 +3563,6 @@ class ArchiveManagementSystem:
             messagebox.showerror("错误", f"保存失败: {e}")
     
     def load_mentoring_data(self):
-        # 清除现有数据
-        for item in self.mentoring_tree.get_children():
-            self.mentoring_tree.delete(item)
-        
         # 获取筛选条件
         mentor_filter = self.mentor_filter.get().strip()
         apprentice_filter = self.apprentice_filter.get().strip()
@@ -4122,22 +3586,19 @@ class ArchiveManagementSystem:
             
         query += " ORDER BY m.start_date DESC"
         
-        # 执行查询
-        self.cursor.execute(query, params)
-        mentoring_records = self.cursor.fetchall()
-        
-        # 将数据添加到表格
-        for record in mentoring_records:
-            mentor_name = self.teacher_id_map.get(record[1], "未知")
-            apprentice_name = self.teacher_id_map.get(record[2], "未知")
-            self.mentoring_tree.insert("", tk.END, values=(
-                record[0],  # mentoring_id
-                mentor_name,
-                apprentice_name,
+        def row_values(record):
+            return (
+                self.teacher_directory.name(record[1], "未知"),  # mentor_name
+                self.teacher_directory.name(record[2], "未知"),  # apprentice_name
                 record[3],  # start_date
                 record[4] if record[4] else "",  # end_date
                 record[5] if record[5] else ""  # achievements
-            ))
+            )
+        
+        # 后台查询，完成后按记录ID刷新表格
+        self.async_db.query(query, params, key="mentoring", cached=True,
+                            on_done=lambda records: self.async_db.fill(self.mentoring_tree, records, row_values,
+                                                                       key=lambda r: r[0]))
 
     def delete_mentoring(self):
         # 检查是否选择了记录
@@ -4148,9 +3609,9 @@ class ArchiveManagementSystem:
 
         # 获取选中记录的信息
         selected_item = selected_items[0]
-        mentoring_id = self.mentoring_tree.item(selected_item, "values")[0]
-        mentor_name = self.mentoring_tree.item(selected_item, "values")[1]
-        apprentice_name = self.mentoring_tree.item(selected_item, "values")[2]
+        mentoring_id = selected_item
+        mentor_name = self.mentoring_tree.item(selected_item, "values")[0]
+        apprentice_name = self.mentoring_tree.item(selected_item, "values")[1]
 
         # 确认删除
         if not messagebox.askyesno("确认删除", f"确定要删除{mentor_name}和{apprentice_name}的师徒关系记录吗？\n此操作不可恢复！"):
@@ -4171,7 +3632,8 @@ class ArchiveManagementSystem:
             messagebox.showerror("错误", f"删除失败: {e}")
     # 显示专业引领页面
     def show_professional_leadership(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_professional_leadership"):
+            return
         
         # 创建标题
         ttk.Label(self.content_frame, text="名师工作室", font=("Arial", 16, "bold")).pack(pady=10)
@@ -4290,9 +3752,11 @@ class ArchiveManagementSystem:
         
         # 初始显示数据
         refresh_display()
+        self.screens.on_show(refresh_display)
     #变化情况
     def change_situation(self):
-        self.clear_content_frame()
+        if self.enter_screen("change_situation"):
+            return
         
         # 创建标题
         ttk.Label(self.content_frame, text="变化情况", font=("Arial", 16, "bold")).pack(pady=10)
@@ -4347,30 +3811,22 @@ class ArchiveManagementSystem:
         
         tab_control.pack(expand=True, fill="both")
         
+        # 选择教师后在这两个选项卡中显示变化情况
+        self.change_education_tab = education_tab
+        self.change_title_tab = title_tab
+        
         # 加载教师列表
         self.load_teachers_for_change()
         
         # 绑定选择事件
         self.change_teacher_tree.bind("<<TreeviewSelect>>", self.on_change_teacher_selected)
+        self.screens.on_show(self.load_teachers_for_change)
     
     def load_teachers_for_change(self):
-        # 清除现有数据
-        for item in self.change_teacher_tree.get_children():
-            self.change_teacher_tree.delete(item)
-        
-        # 获取搜索关键词
-        search_keyword = self.teacher_search_var.get().strip()
-        
-        # 从数据库加载教师数据
-        if search_keyword:
-            self.cursor.execute("SELECT teacher_id, name FROM teacher_info WHERE name LIKE ?", (f'%{search_keyword}%',))
-        else:
-            self.cursor.execute("SELECT teacher_id, name FROM teacher_info")
-        teachers = self.cursor.fetchall()
-        
-        # 将数据添加到树形视图
-        for teacher in teachers:
-            self.change_teacher_tree.insert("", tk.END, values=teacher)
+        # 按姓名、拼音筛选教师名录，按教师ID增量刷新(保持选中的教师)
+        teachers = self.teacher_directory.search(self.teacher_search_var.get())
+        tree_diff.sync(self.change_teacher_tree, teachers, key=lambda t: t.teacher_id,
+                       values=lambda t: (t.teacher_id, t.label))
     
     def on_change_teacher_selected(self, event):
         # 获取选中的教师ID
@@ -4383,8 +3839,7 @@ class ArchiveManagementSystem:
     
     def show_teacher_changes(self, teacher_id):
         # 获取教师姓名
-        self.cursor.execute("SELECT name FROM teacher_info WHERE teacher_id = ?", (teacher_id,))
-        teacher_name = self.cursor.fetchone()[0]
+        teacher_name = self.teacher_directory.name(teacher_id)
         
         # 获取学历变化记录
         self.cursor.execute("""
@@ -4405,7 +3860,7 @@ class ArchiveManagementSystem:
         title_changes = self.cursor.fetchall()
         
         # 显示学历变化
-        education_tab = self.content_frame.winfo_children()[1].winfo_children()[1].winfo_children()[0].winfo_children()[0]
+        education_tab = self.change_education_tab
         
         # 清除现有内容
         for widget in education_tab.winfo_children():
@@ -4436,7 +3891,7 @@ class ArchiveManagementSystem:
         ttk.Button(edu_btn_frame, text="删除学历变化", command=lambda: self.delete_education_change(teacher_id, edu_tree)).pack(side=tk.LEFT, padx=5)
         
         # 显示职称变化
-        title_tab = self.content_frame.winfo_children()[1].winfo_children()[1].winfo_children()[0].winfo_children()[1]
+        title_tab = self.change_title_tab
         
         # 清除现有内容
         for widget in title_tab.winfo_children():
@@ -4664,7 +4119,8 @@ class ArchiveManagementSystem:
         ttk.Button(dialog, text="保存", command=save_title).pack(pady=10)
     #显示考试成绩页面
     def show_exam_results(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_exam_results"):
+            return
         
         # 创建标题和按钮框架
         title_frame = ttk.Frame(self.content_frame)
@@ -4699,26 +4155,19 @@ class ArchiveManagementSystem:
         
         # 加载考试记录
         self.load_exam_records()
+        self.screens.on_show(self.load_exam_records)
     
     # 加载考试记录
     def load_exam_records(self):
-        # 清除现有数据
-        for item in self.exam_tree.get_children():
-            self.exam_tree.delete(item)
-        
-        # 从数据库加载考试记录
-        self.cursor.execute("""
-        SELECT DISTINCT exam_name, exam_date
-        FROM exam_results
-        GROUP BY exam_name, exam_date
-        ORDER BY exam_date DESC
-        """)
-        
-        exams = self.cursor.fetchall()
-        for exam in exams:
-            exam_id = str(uuid.uuid4())  # 生成唯一ID
+        def row_values(exam):
+            exam_id = str(uuid.uuid5(uuid.NAMESPACE_OID, f"{exam[0]}\t{exam[1]}"))  # 由考试名称和时间生成，刷新后不变
             grade = exam[0].split()[0]  # 从考试名称中提取年级
-            self.exam_tree.insert("", tk.END, values=(exam_id, exam[0], grade, exam[1]))
+            return (exam_id, exam[0], grade, exam[1])
+        
+        # 从数据库加载考试记录(后台查询)
+        self.async_db.query(db_schema.sql("exam_list"), key="exams", cached=True,
+                            on_done=lambda exams: self.async_db.fill(self.exam_tree, exams, row_values,
+                                                                     key=lambda e: f"{e[0]}\t{e[1]}"))
     
     # 添加考试记录
     def delete_exam_record(self):
@@ -4917,7 +4366,8 @@ class ArchiveManagementSystem:
             class_tree.insert("", tk.END, values=(f"班级{i}", score[0], score[1]))
     # 显示数据导入导出页面
     def show_data_io(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_data_io"):
+            return
         ttk.Label(self.content_frame, text="数据导入导出", font=("Arial", 16, "bold")).pack(pady=10)
         
         # 创建子功能按钮框架
@@ -4932,13 +4382,275 @@ class ArchiveManagementSystem:
         ttk.Label(self.content_frame, text="请选择上方功能按钮进行操作", font=("Arial", 12)).pack(pady=50)
     # 数据导入导出功能
     def import_data(self):
-        messagebox.showinfo("提示", "数据导入功能正在开发中...")
+        import_window = tk.Toplevel(self.root)
+        import_window.title("导入数据")
+        import_window.geometry("640x480")
+        
+        form_frame = ttk.Frame(import_window, padding=10)
+        form_frame.pack(fill=tk.X)
+        
+        ttk.Label(form_frame, text="导入内容:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        target_combobox = ttk.Combobox(form_frame, values=list(importer.IMPORT_TARGETS), state="readonly")
+        target_combobox.grid(row=0, column=1, sticky=tk.W, pady=5)
+        target_combobox.current(0)
+        
+        ttk.Label(form_frame, text="文件:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        path_entry = ttk.Entry(form_frame, width=50)
+        path_entry.grid(row=1, column=1, sticky=tk.W, pady=5)
+        
+        def choose_file():
+            path = filedialog.askopenfilename(parent=import_window, title="选择导入文件",
+                                              filetypes=[("Excel/CSV 文件", "*.xlsx *.csv"), ("所有文件", "*.*")])
+            if path:
+                path_entry.delete(0, tk.END)
+                path_entry.insert(0, path)
+        
+        ttk.Button(form_frame, text="浏览...", command=choose_file).grid(row=1, column=2, padx=5, pady=5)
+        
+        # 进度
+        status_label = ttk.Label(import_window, text="每行一条记录，第一行为表头，按教师姓名(重名时按身份证号)对应教师")
+        status_label.pack(fill=tk.X, padx=10)
+        progress_bar = ttk.Progressbar(import_window, mode="indeterminate")
+        progress_bar.pack(fill=tk.X, padx=10, pady=5)
+        
+        # 出错的行
+        error_frame = ttk.Frame(import_window)
+        error_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        error_tree = ttk.Treeview(error_frame, columns=("行号", "错误信息"), show="headings")
+        error_tree.heading("行号", text="行号")
+        error_tree.heading("错误信息", text="错误信息")
+        error_tree.column("行号", width=60)
+        error_tree.column("错误信息", width=520)
+        error_scrollbar = ttk.Scrollbar(error_frame, orient=tk.VERTICAL, command=error_tree.yview)
+        error_tree.configure(yscrollcommand=error_scrollbar.set)
+        error_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        error_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        btn_frame = ttk.Frame(import_window)
+        btn_frame.pack(pady=10)
+        
+        # 导入在后台线程中用写连接执行，进度通过队列传回界面线程
+        messages = queue.Queue()
+        cancel_event = threading.Event()
+        state = {"report": None}
+        
+        def worker(target_name, path):
+            try:
+                # 只在每块写入时持有写锁，导入期间界面的保存不必等导入结束
+                report = importer.run_import(self.db.writer(), target_name, path,
+                                             progress=lambda r: messages.put(("progress", r.total, r.imported, r.rate)),
+                                             cancelled=cancel_event.is_set, lock=self.db.write_lock)
+                messages.put(("done", report))
+            except Exception as e:
+                # 任何错误都要通知界面，否则对话框会一直停在“正在导入”
+                messages.put(("error", e))
+        
+        def poll():
+            if not import_window.winfo_exists():
+                return
+            finished = False
+            while True:
+                try:
+                    message = messages.get_nowait()
+                except queue.Empty:
+                    break
+                if message[0] == "progress":
+                    _, total, imported, rate = message
+                    status_label.config(text=f"已处理 {total} 行，导入 {imported} 行，{rate:.0f} 行/秒")
+                elif message[0] == "done":
+                    finished = True
+                    report = state["report"] = message[1]
+                    status_label.config(text=report.summary())
+                    # 错误可能很多，界面只列出前 1000 条，全部错误可另存
+                    for row_no, error in report.errors[:1000]:
+                        error_tree.insert("", tk.END, values=(row_no, error))
+                else:
+                    finished = True
+                    status_label.config(text=f"导入失败: {message[1]}")
+            if finished:
+                progress_bar.stop()
+                start_btn.config(state=tk.NORMAL)
+                cancel_btn.config(state=tk.DISABLED)
+                if state["report"] is not None and state["report"].errors:
+                    save_btn.config(state=tk.NORMAL)
+            else:
+                import_window.after(100, poll)
+        
+        def start_import():
+            path = path_entry.get().strip()
+            if not path or not os.path.exists(path):
+                messagebox.showerror("错误", "请选择要导入的文件", parent=import_window)
+                return
+            error_tree.delete(*error_tree.get_children())
+            state["report"] = None
+            cancel_event.clear()
+            start_btn.config(state=tk.DISABLED)
+            cancel_btn.config(state=tk.NORMAL)
+            save_btn.config(state=tk.DISABLED)
+            status_label.config(text="正在导入...")
+            progress_bar.start(10)
+            threading.Thread(target=worker, args=(target_combobox.get(), path), daemon=True).start()
+            import_window.after(100, poll)
+        
+        def save_errors():
+            path = filedialog.asksaveasfilename(parent=import_window, title="保存错误报告", defaultextension=".csv",
+                                                filetypes=[("CSV 文件", "*.csv")])
+            if path:
+                importer.write_error_report(state["report"], path)
+        
+        start_btn = ttk.Button(btn_frame, text="开始导入", command=start_import)
+        start_btn.pack(side=tk.LEFT, padx=5)
+        cancel_btn = ttk.Button(btn_frame, text="取消", command=cancel_event.set, state=tk.DISABLED)
+        cancel_btn.pack(side=tk.LEFT, padx=5)
+        save_btn = ttk.Button(btn_frame, text="保存错误报告", command=save_errors, state=tk.DISABLED)
+        save_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 关闭窗口时停止导入(当前块写完后停止)
+        import_window.protocol("WM_DELETE_WINDOW", lambda: (cancel_event.set(), import_window.destroy()))
     # 数据导入导出功能
     def export_data(self):
-        messagebox.showinfo("提示", "数据导出功能正在开发中...")
+        export_window = tk.Toplevel(self.root)
+        export_window.title("导出数据")
+        export_window.geometry("520x520")
+        
+        mode = tk.StringVar(value="table")
+        
+        # 按数据表导出
+        ttk.Radiobutton(export_window, text="按数据表导出(可多选)", variable=mode, value="table").pack(anchor=tk.W, padx=10, pady=(10, 0))
+        table_listbox = tk.Listbox(export_window, selectmode=tk.MULTIPLE, height=8, exportselection=False)
+        for name in exporter.TABLE_EXPORTS:
+            table_listbox.insert(tk.END, name)
+        table_listbox.pack(fill=tk.X, padx=30, pady=5)
+        
+        # 按教师导出完整档案
+        ttk.Radiobutton(export_window, text="导出所选教师的完整档案(每部分一个工作表)", variable=mode, value="dossier").pack(anchor=tk.W, padx=10, pady=(10, 0))
+        teacher_frame = ttk.Frame(export_window)
+        teacher_frame.pack(fill=tk.BOTH, expand=True, padx=30, pady=5)
+        teacher_listbox = tk.Listbox(teacher_frame, selectmode=tk.EXTENDED, exportselection=False)
+        teacher_scrollbar = ttk.Scrollbar(teacher_frame, orient=tk.VERTICAL, command=teacher_listbox.yview)
+        teacher_listbox.configure(yscrollcommand=teacher_scrollbar.set)
+        teacher_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        teacher_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        teacher_ids = []
+        for teacher in self.teacher_directory.teachers():
+            teacher_listbox.insert(tk.END, f"{teacher.name} ({teacher.id_number})" if teacher.id_number else teacher.name)
+            teacher_ids.append(teacher.teacher_id)
+        
+        def start():
+            if mode.get() == "table":
+                names = [table_listbox.get(i) for i in table_listbox.curselection()]
+                if not names:
+                    messagebox.showerror("错误", "请选择要导出的数据表", parent=export_window)
+                    return
+                sheets = [exporter.table_sheet(name) for name in names]
+                default_name = names[0] if len(names) == 1 else "教师档案数据"
+            else:
+                selected = [teacher_ids[i] for i in teacher_listbox.curselection()]
+                if not selected:
+                    messagebox.showerror("错误", "请选择教师(按住 Ctrl 或 Shift 可多选)", parent=export_window)
+                    return
+                sheets = exporter.dossier_sheets(selected)
+                default_name = "教师档案"
+            self.start_export(sheets, default_name, parent=export_window)
+        
+        ttk.Button(export_window, text="导出...", command=start).pack(pady=10)
+    # 列表右键菜单
+    def show_tree_menu(self, event):
+        tree = event.widget
+        menu = tk.Menu(tree, tearoff=0)
+        menu.add_command(label="导出当前列表...", command=lambda: self.export_view(tree))
+        menu.tk_popup(event.x_root, event.y_root)
+    # 导出列表中的数据，虚拟列表导出当前筛选条件下的全部结果
+    def export_view(self, tree):
+        columns = list(tree["columns"])
+        display = list(tree["displaycolumns"])
+        if not display or display == ["#all"]:
+            display = columns
+        indexes = [columns.index(column) for column in display]
+        headers = [tree.heading(column, "text") or column for column in display]
+        
+        if isinstance(tree, VirtualTreeview):
+            if tree.source is None:
+                return
+            sql, params = tree.source.export_query()
+            sheet = exporter.query_sheet("列表", headers, sql, params, indexes=indexes)
+        else:
+            rows = []
+            for item in tree.get_children():
+                values = tree.item(item, "values")
+                rows.append(tuple(values[i] if i < len(values) else "" for i in indexes))
+            sheet = exporter.rows_sheet("列表", headers, rows)
+        self.start_export([sheet], "导出列表", parent=tree.winfo_toplevel())
+    # 在后台线程中导出，显示进度，可取消
+    def start_export(self, sheets, default_name, parent=None):
+        parent = parent or self.root
+        path = filedialog.asksaveasfilename(parent=parent, title="导出到", initialfile=default_name, defaultextension=".xlsx",
+                                            filetypes=[("Excel 文件", "*.xlsx"), ("CSV 文件", "*.csv")])
+        if not path:
+            return
+        
+        progress_window = tk.Toplevel(parent)
+        progress_window.title("正在导出")
+        progress_window.geometry("420x130")
+        progress_window.transient(parent)
+        
+        status_label = ttk.Label(progress_window, text="正在准备导出...")
+        status_label.pack(fill=tk.X, padx=10, pady=10)
+        progress_bar = ttk.Progressbar(progress_window, mode="determinate")
+        progress_bar.pack(fill=tk.X, padx=10)
+        
+        # 导出在后台线程中用只读连接执行，进度通过队列传回界面线程
+        messages = queue.Queue()
+        cancel_event = threading.Event()
+        
+        def worker():
+            try:
+                report = exporter.run_export(self.db.reader(), sheets, path,
+                                             progress=lambda r: messages.put(("progress", r.written, r.total)),
+                                             cancelled=cancel_event.is_set)
+                messages.put(("done", report))
+            except Exception as e:
+                # 任何错误都要通知界面，否则进度窗口会一直停在导出中
+                messages.put(("error", e))
+        
+        def poll():
+            if not progress_window.winfo_exists():
+                return
+            while True:
+                try:
+                    message = messages.get_nowait()
+                except queue.Empty:
+                    break
+                if message[0] == "progress":
+                    _, written, total = message
+                    progress_bar.config(maximum=max(total, 1), value=written)
+                    status_label.config(text=f"已导出 {written} / {total} 行")
+                elif message[0] == "done":
+                    progress_window.destroy()
+                    report = message[1]
+                    text = report.summary() if report.cancelled else report.summary() + "\n" + "\n".join(report.paths)
+                    messagebox.showinfo("导出数据", text, parent=parent)
+                    return
+                else:
+                    progress_window.destroy()
+                    messagebox.showerror("错误", f"导出失败: {message[1]}", parent=parent)
+                    return
+            progress_window.after(100, poll)
+        
+        def cancel():
+            cancel_event.set()
+            status_label.config(text="正在取消...")
+        
+        ttk.Button(progress_window, text="取消", command=cancel).pack(pady=10)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        progress_window.after(100, poll)
     # 综合查询功能
     def show_query(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_query"):
+            return
         ttk.Label(self.content_frame, text="综合查询功能", font=("Arial", 16, "bold")).pack(pady=10)
         
         # 创建查询框架
@@ -4951,24 +4663,124 @@ class ArchiveManagementSystem:
         keyword_entry.grid(row=0, column=1, padx=5, pady=5)
         
         ttk.Label(query_frame, text="查询类型:").grid(row=0, column=2, padx=5, pady=5)
-        query_type = ttk.Combobox(query_frame, values=["基本信息", "职称信息", "教育背景", "工作简历", "教学工作", "获奖情况"])
+        query_type = ttk.Combobox(query_frame, values=["全文检索", "基本信息", "职称信息", "教育背景", "工作简历", "教学工作", "获奖情况"])
         query_type.grid(row=0, column=3, padx=5, pady=5)
         query_type.current(0)
         
         ttk.Button(query_frame, text="查询", command=lambda: self.perform_query(keyword_entry.get(), query_type.get())).grid(row=0, column=4, padx=10, pady=5)
+        keyword_entry.bind("<Return>", lambda event: self.perform_query(keyword_entry.get(), query_type.get()))
+        ttk.Label(query_frame, text="可用“字段:值”组合多个条件，如：姓名:张三 年份:2020", foreground="gray").grid(row=1, column=0, columnspan=5, sticky=tk.W, padx=5)
         
         # 显示结果区域
-        result_frame = ttk.Frame(self.content_frame)
-        result_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.query_result_frame = ttk.Frame(self.content_frame)
+        self.query_result_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # 创建结果显示区
-        ttk.Label(result_frame, text="查询结果将显示在这里", font=("Arial", 12)).pack(pady=50)
+        ttk.Label(self.query_result_frame, text="查询结果将显示在这里", font=("Arial", 12)).pack(pady=50)
     # 执行查询
     def perform_query(self, keyword, query_type):
-        messagebox.showinfo("提示", f"正在查询: {query_type} - {keyword}\n此功能正在开发中...")
+        if query_type == "全文检索":
+            self.perform_fulltext_query(keyword)
+            return
+        
+        # 不再读取上一次的查询结果
+        if self.query_result is not None:
+            self.query_result.close()
+        
+        try:
+            result = self.query_engine.execute(query_type, keyword)
+        except QuerySpecError as e:
+            messagebox.showerror("错误", str(e))
+            return
+        self.query_result = result
+        
+        # 清除上次的结果
+        for widget in self.query_result_frame.winfo_children():
+            widget.destroy()
+        
+        info_frame = ttk.Frame(self.query_result_frame)
+        info_frame.pack(fill=tk.X)
+        info_label = ttk.Label(info_frame)
+        info_label.pack(side=tk.LEFT)
+        more_button = ttk.Button(info_frame, text="加载更多")
+        more_button.pack(side=tk.RIGHT)
+        
+        result_tree = ttk.Treeview(self.query_result_frame, columns=result.columns, show="headings")
+        for col in result.columns:
+            result_tree.heading(col, text=col)
+            result_tree.column(col, width=100)
+        
+        # 添加滚动条
+        scrollbar = ttk.Scrollbar(self.query_result_frame, orient=tk.VERTICAL, command=result_tree.yview)
+        result_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        result_tree.pack(fill=tk.BOTH, expand=True)
+        
+        # 分页读取结果，第一列为教师ID
+        def load_page():
+            for row in result.fetch_page():
+                result_tree.insert("", tk.END, values=row[1:], tags=(row[0],))
+            status = f"已显示 {result.fetched} 条，用时 {result.elapsed:.1f} 毫秒"
+            if result.exhausted:
+                more_button.state(["disabled"])
+            else:
+                status += "，还有更多结果"
+            info_label.config(text=status)
+        
+        more_button.config(command=load_page)
+        load_page()
+        
+        # 双击打开教师档案
+        def on_result_selected(event):
+            selected = result_tree.selection()
+            if selected:
+                self.show_teacher_details(result_tree.item(selected[0], "tags")[0])
+        
+        result_tree.bind("<Double-1>", on_result_selected)
+    # 全文检索
+    def perform_fulltext_query(self, keyword):
+        if not keyword.strip():
+            messagebox.showerror("错误", "请输入关键字")
+            return
+        
+        # 在教师、表彰、论文、课题等信息中检索，按相关度排序
+        results = search_index.search_all(self.conn, keyword)
+        
+        # 清除上次的结果
+        for widget in self.query_result_frame.winfo_children():
+            widget.destroy()
+        
+        ttk.Label(self.query_result_frame, text=f"共找到 {len(results)} 条结果（双击查看教师档案）").pack(anchor=tk.W)
+        
+        columns = ("类别", "名称", "详细信息", "相关教师")
+        result_tree = ttk.Treeview(self.query_result_frame, columns=columns, show="headings")
+        for col in columns:
+            result_tree.heading(col, text=col)
+            result_tree.column(col, width=150)
+        
+        # 添加滚动条
+        scrollbar = ttk.Scrollbar(self.query_result_frame, orient=tk.VERTICAL, command=result_tree.yview)
+        result_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        result_tree.pack(fill=tk.BOTH, expand=True)
+        
+        for category, teacher_id, title, detail, teachers in results:
+            result_tree.insert("", tk.END, values=(category, title, detail, teachers or ""), tags=(teacher_id or "",))
+        
+        # 双击打开相关教师的档案
+        def on_result_selected(event):
+            selected = result_tree.selection()
+            if not selected:
+                return
+            tags = result_tree.item(selected[0], "tags")
+            if tags and tags[0]:
+                self.show_teacher_details(tags[0])
+        
+        result_tree.bind("<Double-1>", on_result_selected)
     # 统计分析功能
     def show_statistics(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_statistics"):
+            return
         ttk.Label(self.content_frame, text="统计分析", font=("Arial", 16, "bold")).pack(pady=10)
         
         # 创建统计类型选择框架
@@ -4977,24 +4789,124 @@ class ArchiveManagementSystem:
         
         # 添加统计类型选择
         ttk.Label(stats_frame, text="统计类型:").grid(row=0, column=0, padx=5, pady=5)
-        stats_type = ttk.Combobox(stats_frame, values=["教师年龄分布", "职称分布", "学历分布", "获奖情况统计"])
+        stats_type = ttk.Combobox(stats_frame, values=["教师年龄分布", "职称分布", "学历分布", "获奖情况统计", "获奖年度统计",
+                                                      "获奖去重统计", "获奖排名统计"])
         stats_type.grid(row=0, column=1, padx=5, pady=5)
         stats_type.current(0)
         
-        ttk.Button(stats_frame, text="生成统计", command=lambda: self.generate_statistics(stats_type.get())).grid(row=0, column=2, padx=10, pady=5)
+        # 有效排名范围，只统计名次在此范围内的获奖，留空不限
+        ttk.Label(stats_frame, text="有效排名前:").grid(row=0, column=2, padx=5, pady=5)
+        self.stats_max_rank = ttk.Spinbox(stats_frame, from_=1, to=20, width=5)
+        self.stats_max_rank.grid(row=0, column=3, padx=5, pady=5)
+        
+        ttk.Button(stats_frame, text="生成统计", command=lambda: self.generate_statistics(stats_type.get())).grid(row=0, column=4, padx=10, pady=5)
         
         # 显示统计图表区域
-        chart_frame = ttk.Frame(self.content_frame)
-        chart_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.stats_chart_frame = ttk.Frame(self.content_frame)
+        self.stats_chart_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # 创建提示信息
-        ttk.Label(chart_frame, text="统计图表将显示在这里", font=("Arial", 12)).pack(pady=50)
+        ttk.Label(self.stats_chart_frame, text="统计图表将显示在这里", font=("Arial", 12)).pack(pady=50)
     # 生成统计
     def generate_statistics(self, stats_type):
-        messagebox.showinfo("提示", f"正在生成统计: {stats_type}\n此功能正在开发中...")
+        # 统计数据来自汇总表，不再扫描原始数据
+        teacher_stats = {
+            "教师年龄分布": ("birth_decade", "出生年代"),
+            "职称分布": ("current_title", "现任职称"),
+            "学历分布": ("highest_degree", "最高学位"),
+        }
+        award_stats = {
+            "获奖情况统计": ("award_level", "获奖级别"),
+            "获奖年度统计": ("award_year", "获奖年度"),
+        }
+        
+        max_rank = self.stats_max_rank.get().strip()
+        if max_rank and not max_rank.isdigit():
+            messagebox.showerror("错误", "有效排名必须是正整数")
+            return
+        max_rank = int(max_rank) if max_rank else None
+        
+        # 清除上次的图表
+        for widget in self.stats_chart_frame.winfo_children():
+            widget.destroy()
+        
+        # matplotlib 较大，第一次生成图表时才导入
+        import matplotlib
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
+        # 中文字体
+        matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'PingFang SC', 'Noto Sans CJK SC', 'WenQuanYi Micro Hei', 'DejaVu Sans']
+        matplotlib.rcParams['axes.unicode_minus'] = False
+        
+        figure = Figure(figsize=(8, 4.5), dpi=100)
+        ax = figure.add_subplot(111)
+        
+        if stats_type in teacher_stats:
+            dimension, xlabel = teacher_stats[stats_type]
+            rows = stats_store.teacher_distribution(self.conn, dimension)
+            labels = [row[0] for row in rows]
+            bars = ax.bar(range(len(rows)), [row[1] for row in rows], color="#4C72B0")
+            ax.set_ylabel("人数")
+        elif stats_type in award_stats:
+            dimension, xlabel = award_stats[stats_type]
+            rows = stats_store.award_counts(self.conn, dimension)
+            labels = [row[0] for row in rows]
+            positions = range(len(rows))
+            award_bars = ax.bar([p - 0.2 for p in positions], [row[1] for row in rows], width=0.4, label="证书数", color="#4C72B0")
+            recipient_bars = ax.bar([p + 0.2 for p in positions], [row[2] for row in rows], width=0.4, label="获奖人次", color="#DD8452")
+            bars = list(award_bars) + list(recipient_bars)
+            ax.legend()
+        elif stats_type == "获奖去重统计":
+            # 同一获奖按最高级别为准(需要 pandas，用到时才导入)
+            import award_analytics
+            xlabel = "获奖级别"
+            awards = award_analytics.dedup_highest(award_analytics.load_awards(self.conn))
+            rows = award_analytics.level_summary(award_analytics.filter_valid_rank(awards, max_rank))
+            labels = [row[0] for row in rows]
+            bars = ax.bar(range(len(rows)), [row[1] for row in rows], color="#4C72B0")
+            ax.set_ylabel("获奖人次")
+        elif stats_type == "获奖排名统计":
+            # 获奖最多的前 20 位教师，按级别堆叠
+            import award_analytics
+            xlabel = "教师"
+            table = award_analytics.award_ranking(self.conn, max_rank=max_rank).head(20)
+            rows = table.values.tolist()
+            labels = table["name"].tolist()
+            bottom = [0] * len(rows)
+            for level in award_analytics.AWARD_LEVELS:
+                counts = table[level].tolist()
+                if any(counts):
+                    ax.bar(range(len(rows)), counts, bottom=bottom, label=level)
+                    bottom = [b + c for b, c in zip(bottom, counts)]
+            bars = []
+            ax.set_ylabel("获奖数")
+            ax.legend()
+        else:
+            messagebox.showerror("错误", f"未知的统计类型: {stats_type}")
+            return
+        
+        if not rows:
+            ttk.Label(self.stats_chart_frame, text="暂无数据", font=("Arial", 12)).pack(pady=50)
+            return
+        
+        # 柱顶标注数值
+        for bar in bars:
+            ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), str(int(bar.get_height())),
+                    ha="center", va="bottom")
+        ax.set_title(stats_type)
+        ax.set_xlabel(xlabel)
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels)
+        figure.tight_layout()
+        
+        canvas = FigureCanvasTkAgg(figure, master=self.stats_chart_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
     # 照片/扫描件管理功能
     def show_document_management(self):
-        self.clear_content_frame()
+        if self.enter_screen("show_document_management"):
+            return
         ttk.Label(self.content_frame, text="照片/扫描件管理", font=("Arial", 16, "bold")).pack(pady=10)
         
         # 创建子功能按钮框架
@@ -5002,18 +4914,115 @@ class ArchiveManagementSystem:
         btn_frame.pack(pady=10)
         
         # 添加子功能按钮
-        ttk.Button(btn_frame, text="上传照片", command=self.upload_photo).grid(row=0, column=0, padx=10, pady=5)
-        ttk.Button(btn_frame, text="上传扫描件", command=self.upload_scan).grid(row=0, column=1, padx=10, pady=5)
+        ttk.Button(btn_frame, text="批量上传照片", command=self.upload_photo_new).grid(row=0, column=0, padx=10, pady=5)
+        ttk.Button(btn_frame, text="批量上传扫描件", command=self.upload_scan_new).grid(row=0, column=1, padx=10, pady=5)
         ttk.Button(btn_frame, text="查看文件", command=self.view_documents).grid(row=0, column=2, padx=10, pady=5)
         
         # 显示提示信息
-        ttk.Label(self.content_frame, text="请选择上方功能按钮进行操作", font=("Arial", 12)).pack(pady=50)
-    # 上传照片/扫描件功能
+        ttk.Label(self.content_frame, text="批量上传时按文件名对应教师：照片为“姓名.jpg”或“身份证号.jpg”，\n"
+                                           "扫描件为“姓名_学位.jpg”(该教师只有一条教育背景时可省略学位)",
+                  font=("Arial", 12)).pack(pady=50)
+    # 批量上传照片，文件名为教师姓名或身份证号
     def upload_photo_new(self):
-        messagebox.showinfo("提示", "上传照片功能正在开发中...")
-    # 上传照片/扫描件功能
+        file_paths = filedialog.askopenfilenames(title="选择照片(文件名为教师姓名或身份证号)",
+                                                 filetypes=[("图片文件", "*.jpg;*.jpeg;*.png;*.gif")])
+        if not file_paths:
+            return
+        
+        teachers = importer.load_teacher_map(self.conn)
+        matched = {}
+        problems = []
+        for path in file_paths:
+            key = os.path.splitext(os.path.basename(path))[0].strip()
+            try:
+                matched[path] = importer.find_teacher(teachers, key, key if key in teachers[0] else None)
+            except ValueError as e:
+                problems.append(f"{os.path.basename(path)}: {e}")
+        
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        def on_result(result):
+            self.cursor.execute("UPDATE teacher_info SET photo_path = ?, update_time = ? WHERE teacher_id = ?",
+                                (result.path, current_time, matched[result.source]))
+        
+        self.ingest_batch(list(matched), "photo", "批量上传照片", on_result, problems)
+    # 批量上传扫描件，文件名为“姓名_学位”或“身份证号_学位”，对应该教师的教育背景记录
     def upload_scan_new(self):
-        messagebox.showinfo("提示", "上传扫描件功能正在开发中...")
+        file_paths = filedialog.askopenfilenames(title="选择扫描件(文件名为“姓名_学位”)",
+                                                 filetypes=[("扫描件", "*.jpg;*.jpeg;*.png;*.pdf")])
+        if not file_paths:
+            return
+        
+        teachers = importer.load_teacher_map(self.conn)
+        matched = {}
+        problems = []
+        for path in file_paths:
+            parts = os.path.splitext(os.path.basename(path))[0].strip().split("_", 1)
+            try:
+                teacher_id = importer.find_teacher(teachers, parts[0], parts[0] if parts[0] in teachers[0] else None)
+                self.cursor.execute("SELECT record_id, edu_type, degree FROM education WHERE teacher_id = ?", (teacher_id,))
+                records = self.cursor.fetchall()
+                if len(parts) > 1:
+                    records = [r for r in records if parts[1] in (r[1], r[2])]
+                if len(records) != 1:
+                    raise ValueError("找不到对应的教育背景记录" if not records else "有多条教育背景记录，请在文件名中注明学位")
+                matched[path] = records[0][0]
+            except ValueError as e:
+                problems.append(f"{os.path.basename(path)}: {e}")
+        
+        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        def on_result(result):
+            self.cursor.execute("UPDATE education SET scan_file_path = ?, update_time = ? WHERE record_id = ?",
+                                (result.path, current_time, matched[result.source]))
+        
+        self.ingest_batch(list(matched), "scan", "批量上传扫描件", on_result, problems)
+    # 批量处理上传文件，显示进度，可取消；problems 为提交前已发现的问题，与处理失败的文件一起列出
+    def ingest_batch(self, paths, kind, title, on_result, problems=()):
+        problems = list(problems)
+        if not paths:
+            messagebox.showerror("错误", "没有可上传的文件\n" + "\n".join(problems[:20]))
+            return
+        
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title(title)
+        progress_window.geometry("420x130")
+        progress_window.transient(self.root)
+        
+        status_label = ttk.Label(progress_window, text=f"已处理 0 / {len(paths)} 个文件")
+        status_label.pack(fill=tk.X, padx=10, pady=10)
+        progress_bar = ttk.Progressbar(progress_window, mode="determinate", maximum=len(paths))
+        progress_bar.pack(fill=tk.X, padx=10)
+        uploaded = []
+        
+        def result_done(result):
+            if result.error is not None:
+                problems.append(f"{os.path.basename(result.source)}: {result.error}")
+            else:
+                on_result(result)
+                uploaded.append(result.path)
+        
+        def progress(done, total):
+            progress_bar.config(value=done)
+            status_label.config(text=f"已处理 {done} / {total} 个文件")
+        
+        def finished(batch):
+            self.conn.commit()
+            # 被替换的旧文件
+            self.release_files()
+            progress_window.destroy()
+            text = f"成功上传 {len(uploaded)} 个文件"
+            if batch.cancelled:
+                text = "上传已取消，" + text
+            if problems:
+                text += f"，{len(problems)} 个文件未上传:\n" + "\n".join(problems[:20])
+                if len(problems) > 20:
+                    text += "\n..."
+            messagebox.showinfo(title, text)
+        
+        batch = self.ingestor.submit(paths, kind, on_result=result_done, on_progress=progress, on_finished=finished)
+        ttk.Button(progress_window, text="取消", command=batch.cancel).pack(pady=10)
+        progress_window.protocol("WM_DELETE_WINDOW", batch.cancel)
     # 查看文件功能
     def view_documents(self):
         # 检查是否选择了教师
@@ -5085,9 +5094,7 @@ class ArchiveManagementSystem:
         # 显示现有照片
         if self.edit_photo_path and os.path.exists(self.edit_photo_path):
             try:
-                img = Image.open(self.edit_photo_path)
-                img = img.resize((150, 200), Image.Resampling.LANCZOS)
-                self.current_edit_photo = ImageTk.PhotoImage(img)  # 保存为实例属性
+                self.current_edit_photo = thumbnails.get_photo(self.edit_photo_path, thumbnails.PHOTO_SIZE)  # 保存为实例属性
                 self.edit_photo_label.configure(image=self.current_edit_photo)
             except Exception:
                 self.edit_photo_label.configure(text="无法加载照片")
@@ -5135,30 +5142,20 @@ class ArchiveManagementSystem:
         file_path = filedialog.askopenfilename(title="选择照片", filetypes=[("图片文件", "*.jpg;*.jpeg;*.png;*.gif")])
         
         if file_path:
-            try:
-                # 创建照片目录
-                os.makedirs('photos', exist_ok=True)
-                
-                # 生成唯一文件名
-                file_ext = os.path.splitext(file_path)[1]
-                new_filename = f"photo_{uuid.uuid4().hex}{file_ext}"
-                new_path = os.path.join('photos', new_filename)
-                
-                # 复制照片到应用程序目录
-                shutil.copy2(file_path, new_path)
-                
-                # 更新照片显示
-                img = Image.open(new_path)
-                img = img.resize((150, 200), Image.Resampling.LANCZOS)
-                self.current_edit_photo = ImageTk.PhotoImage(img)  # 保存为实例属性
-                self.edit_photo_label.configure(image=self.current_edit_photo)
+            self.edit_photo_label.configure(text="正在处理...", image="")
+            
+            def done(result):
+                if not self.edit_photo_label.winfo_exists():
+                    return
+                self.current_edit_photo = thumbnails.get_photo(result.path, thumbnails.PHOTO_SIZE) if result.preview else None  # 保存为实例属性
+                self.edit_photo_label.configure(image=self.current_edit_photo or "", text="" if result.preview else "无法预览")
                 
                 # 保存照片路径
-                self.edit_photo_path = new_path
+                self.edit_photo_path = result.path
                 
                 messagebox.showinfo("成功", "照片更新成功")
-            except Exception as e:
-                messagebox.showerror("错误", f"照片更新失败: {e}")
+            
+            self.ingest_file(file_path, "photo", done, "照片更新失败")
     # 更新基本信息
     def update_basic_info(self, teacher_id):
         # 获取表单数据
@@ -5197,6 +5194,7 @@ class ArchiveManagementSystem:
             ))
             
             self.conn.commit()
+            self.release_files()
             messagebox.showinfo("成功", "基本信息更新成功")
             
             # 刷新教师列表
@@ -5212,7 +5210,7 @@ class ArchiveManagementSystem:
         form_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
         # 从数据库加载教师职称信息
-        self.cursor.execute("SELECT * FROM title_history WHERE teacher_id = ? ORDER BY obtain_date DESC", (teacher_id,))
+        self.cursor.execute(db_schema.sql("teacher_titles"), (teacher_id,))
         titles = self.cursor.fetchall()
         
         # 创建职称信息列表
@@ -5310,7 +5308,7 @@ class ArchiveManagementSystem:
             messagebox.showinfo("成功", "职称信息添加成功")
             
             # 刷新职称列表
-            self.cursor.execute("SELECT * FROM title_history WHERE teacher_id = ? ORDER BY obtain_date DESC", (teacher_id,))
+            self.cursor.execute(db_schema.sql("teacher_titles"), (teacher_id,))
             titles = self.cursor.fetchall()
             
             # 清空列表
@@ -5405,7 +5403,7 @@ class ArchiveManagementSystem:
             teacher_id = self.cursor.fetchone()[0]
             
             # 刷新职称列表
-            self.cursor.execute("SELECT * FROM title_history WHERE teacher_id = ? ORDER BY obtain_date DESC", (teacher_id,))
+            self.cursor.execute(db_schema.sql("teacher_titles"), (teacher_id,))
             titles = self.cursor.fetchall()
             
             # 清空列表
@@ -5446,7 +5444,7 @@ class ArchiveManagementSystem:
             messagebox.showinfo("成功", "职称记录已删除")
             
             # 刷新职称列表
-            self.cursor.execute("SELECT * FROM title_history WHERE teacher_id = ? ORDER BY obtain_date DESC", (teacher_id,))
+            self.cursor.execute(db_schema.sql("teacher_titles"), (teacher_id,))
             titles = self.cursor.fetchall()
             
             # 清空列表
@@ -5557,14 +5555,15 @@ class ArchiveManagementSystem:
         def upload_scan():
             file_path = filedialog.askopenfilename(filetypes=[("图片文件", "*.jpg;*.jpeg;*.png;*.gif;*.bmp")])
             if file_path:
-                # 复制文件到scans目录
-                if not os.path.exists("scans"):
-                    os.makedirs("scans")
-                file_name = f"scan_{uuid.uuid4().hex}{os.path.splitext(file_path)[1]}"
-                new_path = os.path.join("scans", file_name)
-                shutil.copy2(file_path, new_path)
-                self.scan_path = new_path
-                self.scan_label.configure(text=os.path.basename(file_path))
+                # 存入文件存储并生成缩略图(后台进行)
+                self.scan_label.configure(text="正在处理...")
+                
+                def done(result, name=os.path.basename(file_path)):
+                    self.scan_path = result.path
+                    if self.scan_label.winfo_exists():
+                        self.scan_label.configure(text=name)
+                
+                self.ingest_file(file_path, "scan", done, "扫描件上传失败")
         
         ttk.Button(form_frame, text="上传扫描件", command=upload_scan).grid(row=len(fields)+1, column=1, sticky=tk.W, pady=5)
         
@@ -5657,14 +5656,15 @@ class ArchiveManagementSystem:
         def upload_scan():
             file_path = filedialog.askopenfilename(filetypes=[("图片文件", "*.jpg;*.jpeg;*.png;*.gif;*.bmp")])
             if file_path:
-                # 复制文件到scans目录
-                if not os.path.exists("scans"):
-                    os.makedirs("scans")
-                file_name = f"scan_{uuid.uuid4().hex}{os.path.splitext(file_path)[1]}"
-                new_path = os.path.join("scans", file_name)
-                shutil.copy2(file_path, new_path)
-                self.scan_path = new_path
-                self.scan_label.configure(text=os.path.basename(file_path))
+                # 存入文件存储并生成缩略图(后台进行)
+                self.scan_label.configure(text="正在处理...")
+                
+                def done(result, name=os.path.basename(file_path)):
+                    self.scan_path = result.path
+                    if self.scan_label.winfo_exists():
+                        self.scan_label.configure(text=name)
+                
+                self.ingest_file(file_path, "scan", done, "扫描件上传失败")
         
         ttk.Button(form_frame, text="上传扫描件", command=upload_scan).grid(row=len(fields)+1, column=1, sticky=tk.W, pady=5)
         
@@ -5696,6 +5696,7 @@ class ArchiveManagementSystem:
                 ))
                 
                 self.conn.commit()
+                self.release_files()
                 messagebox.showinfo("成功", "教育背景更新成功")
                 education_window.destroy()
                 self.load_education_records(teacher_id)
@@ -5719,15 +5720,10 @@ class ArchiveManagementSystem:
             return
         
         try:
-            # 删除扫描件文件
-            self.cursor.execute("SELECT scan_file_path FROM education WHERE record_id = ?", (record_id,))
-            scan_file_path = self.cursor.fetchone()[0]
-            if scan_file_path and os.path.exists(scan_file_path):
-                os.remove(scan_file_path)
-            
-            # 从数据库中删除记录
+            # 从数据库中删除记录，再删除不再使用的扫描件
             self.cursor.execute("DELETE FROM education WHERE record_id = ?", (record_id,))
             self.conn.commit()
+            self.release_files()
             
             # 刷新显示
             self.load_education_records(teacher_id)
@@ -0,0 +1,127 @@
+# 查询结果缓存
+# 列表页面的查询结果按 (SQL, 参数) 缓存，切换页面后再回来时数据没有变化就直接显示，不再执行查询
+# 每张数据表的修改次数由触发器记录在 table_versions 表中，任何连接、任何写入(界面、后台导入、命令行)都会更新
+# 缓存项记下所依赖的表(SQL 中出现的表名)当时的版本，这些表的版本都没变时才使用；修改一张表只会使依赖它的缓存项失效
+# 只用于读取业务数据表的查询，不涉及已记录版本的表的查询不缓存
+import re
+import threading
+from collections import OrderedDict
+
+
+_TABLES = [
+    # 表名 -> 修改次数
+    """
+    CREATE TABLE IF NOT EXISTS table_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """,
+]
+
+
+def _triggers(table):
+    bump = f"UPDATE table_versions SET version = version + 1 WHERE name = '{table}'; "
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS version_{table}_{event.lower()} AFTER {event} ON {table} BEGIN {bump}END"
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+# 建表并为 tables 中的每张表建触发器(数据库迁移时调用)
+def create_all(conn, tables):
+    for statement in _TABLES:
+        conn.execute(statement)
+    for table in tables:
+        conn.execute("INSERT OR IGNORE INTO table_versions (name) VALUES (?)", (table,))
+        for statement in _triggers(table):
+            conn.execute(statement)
+
+
+# 各表当前的版本: 表名 -> 修改次数
+def versions(conn):
+    return dict(conn.execute("SELECT name, version FROM table_versions"))
+
+
+class QueryCache:
+    # max_rows: 全部缓存项合计的最多行数，超过时淘汰最久未用的项
+    def __init__(self, max_rows=200000):
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        # (SQL, 参数) -> (依赖表的版本, 结果行)，最近使用的在后
+        self._entries = OrderedDict()
+        self._rows = 0
+        # SQL -> 依赖的表
+        self._dependencies = {}
+        self._table_re = None
+        self._lock = threading.Lock()
+
+    # SQL 中出现的已记录版本的表
+    def dependencies(self, sql, current):
+        tables = self._dependencies.get(sql)
+        if tables is None:
+            if not current:
+                return frozenset()
+            if self._table_re is None:
+                names = sorted(current, key=len, reverse=True)
+                self._table_re = re.compile(r"\b(" + "|".join(map(re.escape, names)) + r")\b")
+            tables = self._dependencies[sql] = frozenset(self._table_re.findall(sql))
+        return tables
+
+    # 取缓存的结果，依赖的表修改过或没有缓存时返回 None
+    def get(self, conn, sql, params=()):
+        key = (sql, tuple(params))
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            stamp, rows = entry
+            current = versions(conn)
+            if all(current.get(table) == version for table, version in stamp):
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self.hits += 1
+                return rows
+        with self._lock:
+            # 依赖的表已修改，旧结果不会再用到
+            if entry is not None and self._entries.get(key) is entry:
+                del self._entries[key]
+                self._rows -= len(entry[1])
+            self.misses += 1
+        return None
+
+    # 执行查询并缓存结果；先读版本再查询，期间发生的修改只会使该项下次失效，不会返回旧数据
+    def execute(self, conn, sql, params=()):
+        current = versions(conn)
+        rows = conn.execute(sql, tuple(params)).fetchall()
+        tables = self.dependencies(sql, current)
+        if tables:
+            self.put(sql, params, rows, tuple((table, current.get(table)) for table in tables))
+        return rows
+
+    # 有可用的缓存时直接返回，否则执行查询
+    def fetch(self, conn, sql, params=()):
+        rows = self.get(conn, sql, params)
+        if rows is None:
+            rows = self.execute(conn, sql, params)
+        return rows
+
+    def put(self, sql, params, rows, stamp):
+        key = (sql, tuple(params))
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._rows -= len(old[1])
+            if len(rows) > self.max_rows:
+                return
+            self._entries[key] = (stamp, rows)
+            self._rows += len(rows)
+            while self._rows > self.max_rows:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._rows -= len(evicted)
+
+    # 清空缓存(如切换数据库文件后)
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
@@ -0,0 +1,235 @@
+# 综合查询
+# 把查询条件转换为一条带参数的 SQL，文本相同的 SQL 由 sqlite3 的语句缓存复用已编译的执行计划
+# 结果按键集分页读取(virtual_list.KeysetSource)，每页是一条读完的语句，不会在页与页之间一直占着连接的读快照
+import time
+
+import search_index
+from virtual_list import KeysetSource
+
+
+# 查询类型定义
+class QueryType:
+    def __init__(self, name, columns, select, fields, default_fields, order_by):
+        self.name = name
+        # 结果列标题(第一列固定为教师ID，不显示)
+        self.columns = columns
+        self.select = select
+        # 可用条件: 字段名 -> (列, 匹配方式)，匹配方式为 like/eq/prefix/teacher(教师姓名全文检索)
+        self.fields = fields
+        # 只输入关键字时参与匹配的字段
+        self.default_fields = default_fields
+        # 分页的排序键 [(结果列名, 是否降序[, 可否为空])]，最后一项为 select 中唯一的 row_key 列
+        self.order_by = order_by
+
+
+QUERY_TYPES = {
+    "基本信息": QueryType(
+        "基本信息",
+        ("姓名", "性别", "出生年月", "民族", "籍贯", "身份证号", "任教学科", "现任职务"),
+        """
+        SELECT t.teacher_id, t.name, t.gender, t.birth_date, t.ethnicity, t.hometown, t.id_number,
+               t.teaching_subject, t.current_position, t.teacher_id AS row_key
+        FROM teacher_info t
+        """,
+        {
+            "姓名": ("t.name", "teacher"),
+            "身份证号": ("t.id_number", "like"),
+            "性别": ("t.gender", "eq"),
+            "民族": ("t.ethnicity", "like"),
+            "籍贯": ("t.hometown", "like"),
+            "学科": ("t.teaching_subject", "like"),
+            "职务": ("t.current_position", "like"),
+            "出生年份": ("t.birth_date", "prefix"),
+        },
+        ("姓名", "身份证号"),
+        [("name", False, False), ("row_key", False)],
+    ),
+    "职称信息": QueryType(
+        "职称信息",
+        ("姓名", "职称", "取得时间", "岗位", "聘任时间"),
+        """
+        SELECT t.teacher_id, t.name, th.title, th.obtain_date, th.post, th.appointment_date, th.record_id AS row_key
+        FROM title_history th
+        JOIN teacher_info t ON th.teacher_id = t.teacher_id
+        """,
+        {
+            "姓名": ("t.name", "teacher"),
+            "职称": ("th.title", "like"),
+            "岗位": ("th.post", "like"),
+            "年份": ("th.obtain_date", "prefix"),
+        },
+        ("姓名", "职称"),
+        [("obtain_date", True), ("name", False, False), ("row_key", False)],
+    ),
+    "教育背景": QueryType(
+        "教育背景",
+        ("姓名", "类型", "学位", "院校", "取得时间"),
+        """
+        SELECT t.teacher_id, t.name, e.edu_type, e.degree, e.institution, e.obtain_date, e.record_id AS row_key
+        FROM education e
+        JOIN teacher_info t ON e.teacher_id = t.teacher_id
+        """,
+        {
+            "姓名": ("t.name", "teacher"),
+            "类型": ("e.edu_type", "like"),
+            "学位": ("e.degree", "like"),
+            "院校": ("e.institution", "like"),
+            "年份": ("e.obtain_date", "prefix"),
+        },
+        ("姓名", "学位", "院校"),
+        [("obtain_date", True), ("name", False, False), ("row_key", False)],
+    ),
+    "工作简历": QueryType(
+        "工作简历",
+        ("姓名", "开始时间", "结束时间", "单位", "职务"),
+        """
+        SELECT t.teacher_id, t.name, w.start_date, w.end_date, w.organization, w.position, w.record_id AS row_key
+        FROM work_experience w
+        JOIN teacher_info t ON w.teacher_id = t.teacher_id
+        """,
+        {
+            "姓名": ("t.name", "teacher"),
+            "单位": ("w.organization", "like"),
+            "职务": ("w.position", "like"),
+            "年份": ("w.start_date", "prefix"),
+        },
+        ("姓名", "单位"),
+        [("start_date", True), ("name", False, False), ("row_key", False)],
+    ),
+    "教学工作": QueryType(
+        "教学工作",
+        ("姓名", "学年", "学期", "学科", "任教班级", "学生人数", "周课时数"),
+        """
+        SELECT t.teacher_id, t.name, tr.academic_year, tr.semester, tr.subject, tr.classes,
+               tr.student_count, tr.weekly_hours, tr.record_id AS row_key
+        FROM teaching_records tr
+        JOIN teacher_info t ON tr.teacher_id = t.teacher_id
+        """,
+        {
+            "姓名": ("t.name", "teacher"),
+            "学年": ("tr.academic_year", "prefix"),
+            "学期": ("tr.semester", "eq"),
+            "学科": ("tr.subject", "like"),
+            "班级": ("tr.classes", "like"),
+        },
+        ("姓名", "学科", "班级"),
+        [("academic_year", True), ("semester", True), ("name", False, False), ("row_key", False)],
+    ),
+    "获奖情况": QueryType(
+        "获奖情况",
+        ("姓名", "奖项名称", "获奖级别", "颁奖单位", "获奖时间", "奖项类型", "获奖等第"),
+        """
+        SELECT t.teacher_id, t.name, a.award_name, a.award_level, a.award_unit, a.award_date,
+               a.award_type, ar.rank, ar.relation_id AS row_key
+        FROM award_recipients ar
+        JOIN awards a ON ar.award_id = a.award_id
+        JOIN teacher_info t ON ar.teacher_id = t.teacher_id
+        """,
+        {
+            "姓名": ("t.name", "teacher"),
+            "奖项": ("a.award_name", "like"),
+            "级别": ("a.award_level", "eq"),
+            "单位": ("a.award_unit", "like"),
+            "类型": ("a.award_type", "eq"),
+            "年份": ("a.award_date", "prefix"),
+        },
+        ("姓名", "奖项"),
+        [("award_date", True), ("name", False, False), ("row_key", False)],
+    ),
+}
+
+
+# 查询条件格式错误
+class QuerySpecError(ValueError):
+    pass
+
+
+# 解析查询输入: "字段:值" 为指定条件，其余关键字在默认字段中匹配
+# 返回 [(字段名或 None, 值)]，多个条件之间为"并且"关系
+def parse_spec(text, query_type):
+    spec = []
+    for token in text.replace("：", ":").split():
+        if ":" in token:
+            field, value = token.split(":", 1)
+            if field not in query_type.fields:
+                raise QuerySpecError(f"{query_type.name}不支持按“{field}”查询，可用条件: {'、'.join(query_type.fields)}")
+            if value:
+                spec.append((field, value))
+        else:
+            spec.append((None, token))
+    return spec
+
+
+# 查询结果，按页读取
+# 每页按上一页最后一行的排序键单独查询，两页之间不留未读完的语句
+class QueryResult:
+    def __init__(self, source, columns, sql):
+        self.source = source
+        self.columns = columns
+        self.sql = sql
+        # 已读取各页的总耗时，单位毫秒
+        self.elapsed = 0.0
+        self.fetched = 0
+        self.exhausted = False
+
+    # 读取下一页，没有更多数据时返回空列表；每行去掉末尾的 row_key 列
+    def fetch_page(self, size=200):
+        if self.exhausted:
+            return []
+        start = time.perf_counter()
+        rows = [values[:-1] for _, values in self.source.rows(self.fetched, self.fetched + size)]
+        self.elapsed += (time.perf_counter() - start) * 1000
+        self.fetched += len(rows)
+        if len(rows) < size:
+            self.close()
+        return rows
+
+    # 不再读取(离开页面或开始新的查询时调用)
+    def close(self):
+        self.exhausted = True
+        self.source = None
+
+
+class QueryEngine:
+    def __init__(self, conn):
+        self.conn = conn
+
+    # 单个条件的 SQL 片段及参数
+    def _condition(self, query_type, field, value):
+        column, mode = query_type.fields[field]
+        if mode == "teacher":
+            alias = column.split(".")[0]
+            return search_index.match_clause(self.conn, "teacher", value, alias=alias, columns=("name",))
+        if mode == "eq":
+            return f"{column} = ?", [value]
+        if mode == "prefix":
+            return f"{column} LIKE ?", [f"{value}%"]
+        return f"{column} LIKE ?", [f"%{value}%"]
+
+    # 把条件组合编译为 SQL(不含排序，排序由分页时指定)
+    def compile(self, query_type, spec):
+        conditions = []
+        params = []
+        for field, value in spec:
+            if field is None:
+                # 关键字在任一默认字段中出现即可
+                parts = [self._condition(query_type, f, value) for f in query_type.default_fields]
+                conditions.append("(" + " OR ".join(p[0] for p in parts) + ")")
+                for _, part_params in parts:
+                    params.extend(part_params)
+            else:
+                clause, clause_params = self._condition(query_type, field, value)
+                conditions.append(clause)
+                params.extend(clause_params)
+
+        sql = query_type.select
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return sql, params
+
+    # 准备查询，返回可分页读取的结果(读取第一页时才执行)
+    def execute(self, type_name, text, page_size=200):
+        query_type = QUERY_TYPES[type_name]
+        sql, params = self.compile(query_type, parse_spec(text, query_type))
+        source = KeysetSource(self.conn, sql, params, query_type.order_by, page_size=page_size)
+        return QueryResult(source, query_type.columns, sql)
@@ -0,0 +1,187 @@
+# 数据访问层
+# 每张表对应一个实体类(__slots__ 即表的列)，写入先登记到 UnitOfWork，提交时同一语句的多行用 executemany 一次写入
+# 不依赖界面，脚本和批处理任务中也可直接使用:
+#     with UnitOfWork(conn) as uow:
+#         save_award(uow, Award(award_name="...", award_level="市级"), teacher_ids)
+import uuid
+from datetime import datetime
+
+
+def now_text():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def new_id():
+    return str(uuid.uuid4())
+
+
+# 实体基类: 子类给出表名、主键及 __slots__(列名，顺序与插入语句一致)
+class Entity:
+    __slots__ = ()
+    TABLE = None
+    KEY = None
+
+    def __init__(self, **values):
+        for column in self.__slots__:
+            setattr(self, column, values.pop(column, None))
+        if values:
+            raise TypeError(f"{type(self).__name__} 没有列: {', '.join(values)}")
+        if getattr(self, self.KEY) is None:
+            setattr(self, self.KEY, new_id())
+        if "create_time" in self.__slots__:
+            stamp = self.create_time or now_text()
+            self.create_time = stamp
+            self.update_time = self.update_time or stamp
+
+    def values(self):
+        return tuple(getattr(self, column) for column in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{column}={getattr(self, column)!r}" for column in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(**dict(zip(cls.__slots__, row)))
+
+
+class Award(Entity):
+    __slots__ = ("award_id", "award_name", "award_level", "award_unit", "award_date", "award_type",
+                 "create_time", "update_time")
+    TABLE = "awards"
+    KEY = "award_id"
+
+
+class AwardRecipient(Entity):
+    __slots__ = ("relation_id", "award_id", "teacher_id", "rank", "create_time", "update_time")
+    TABLE = "award_recipients"
+    KEY = "relation_id"
+
+
+class ResearchProject(Entity):
+    __slots__ = ("project_id", "project_name", "project_level", "completion_date", "create_time", "update_time")
+    TABLE = "research_projects"
+    KEY = "project_id"
+
+
+class ProjectMember(Entity):
+    __slots__ = ("relation_id", "project_id", "teacher_id", "is_leader", "member_rank", "create_time", "update_time")
+    TABLE = "project_members"
+    KEY = "relation_id"
+
+
+class TeachingRecord(Entity):
+    __slots__ = ("record_id", "teacher_id", "academic_year", "semester", "subject", "classes",
+                 "student_count", "weekly_hours", "create_time", "update_time")
+    TABLE = "teaching_records"
+    KEY = "record_id"
+
+
+class Mentoring(Entity):
+    __slots__ = ("mentoring_id", "teacher_id", "apprentice_id", "start_date", "end_date", "achievements",
+                 "create_time", "update_time")
+    TABLE = "mentoring"
+    KEY = "mentoring_id"
+
+
+# 各实体的 SQL 只生成一次，相同的语句文本可复用 sqlite3 模块缓存的预编译语句
+_sql_cache = {}
+
+
+def _insert_sql(cls):
+    key = ("insert", cls)
+    if key not in _sql_cache:
+        columns = ", ".join(cls.__slots__)
+        marks = ", ".join("?" * len(cls.__slots__))
+        _sql_cache[key] = f"INSERT INTO {cls.TABLE} ({columns}) VALUES ({marks})"
+    return _sql_cache[key]
+
+
+def _delete_sql(cls, columns):
+    key = ("delete", cls, columns)
+    if key not in _sql_cache:
+        where = " AND ".join(f"{column} = ?" for column in columns)
+        _sql_cache[key] = f"DELETE FROM {cls.TABLE} WHERE {where}"
+    return _sql_cache[key]
+
+
+# 一次保存中的全部写入，flush() 时按登记顺序执行，连续的同一语句合并为一次 executemany
+class UnitOfWork:
+    def __init__(self, conn):
+        self.conn = conn
+        self._operations = []
+
+    def add(self, entity):
+        self._operations.append((_insert_sql(type(entity)), entity.values()))
+        return entity
+
+    # 删除 cls 表中各列等于给定值的行: uow.delete(TeachingRecord, teacher_id=..., semester=...)
+    def delete(self, cls, **where):
+        columns = tuple(where)
+        self._operations.append((_delete_sql(cls, columns), tuple(where[c] for c in columns)))
+
+    def flush(self):
+        operations, self._operations = self._operations, []
+        start = 0
+        while start < len(operations):
+            sql = operations[start][0]
+            end = start
+            while end < len(operations) and operations[end][0] == sql:
+                end += 1
+            self.conn.executemany(sql, [params for _, params in operations[start:end]])
+            start = end
+
+    # 在一个事务中写入全部登记的修改，出错时回滚
+    def commit(self):
+        try:
+            self.flush()
+            self.conn.commit()
+        except BaseException:
+            self._operations = []
+            self.conn.rollback()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self._operations = []
+            self.conn.rollback()
+        return False
+
+
+# 表彰及获奖人员，获奖等第按 teacher_ids 的顺序从 1 开始
+def save_award(uow, award, teacher_ids):
+    uow.add(award)
+    for rank, teacher_id in enumerate(teacher_ids, start=1):
+        uow.add(AwardRecipient(award_id=award.award_id, teacher_id=teacher_id, rank=rank,
+                               create_time=award.create_time, update_time=award.update_time))
+    return award
+
+
+# 课题及成员: 主持人排名第 1，其余成员依次排在后面(与主持人相同的成员忽略)
+def save_project(uow, project, leader_id, member_ids=()):
+    uow.add(project)
+    members = [leader_id] + [m for m in member_ids if m != leader_id]
+    for rank, teacher_id in enumerate(members, start=1):
+        uow.add(ProjectMember(project_id=project.project_id, teacher_id=teacher_id, is_leader=rank == 1,
+                              member_rank=rank, create_time=project.create_time, update_time=project.update_time))
+    return project
+
+
+# 用 records 替换教师在某学年学期的全部教学记录
+def replace_teaching_records(uow, teacher_id, academic_year, semester, records):
+    uow.delete(TeachingRecord, teacher_id=teacher_id, academic_year=academic_year, semester=semester)
+    for record in records:
+        record.teacher_id = teacher_id
+        record.academic_year = academic_year
+        record.semester = semester
+        uow.add(record)
+    return records
+
+
+def save_mentoring(uow, mentoring):
+    return uow.add(mentoring)
@@ -0,0 +1,68 @@
+# 页面池
+# 每个功能页面的控件只创建一次，离开时隐藏(pack_forget)，再次进入时重新显示并只刷新数据，不再销毁、重建上百个控件
+# 保留的页面数有上限，超过时销毁最久未显示的页面，下次进入时重新创建
+from tkinter import ttk
+from collections import OrderedDict
+
+
+# 一个页面
+class Screen:
+    def __init__(self, name, frame):
+        self.name = name
+        self.frame = frame
+        # 再次进入页面时调用(刷新数据)
+        self.refresh = None
+
+
+class ScreenRegistry:
+    # container: 页面所在的内容区域；max_screens: 最多保留的页面数
+    def __init__(self, container, max_screens=8):
+        self.container = container
+        self.max_screens = max_screens
+        self.current = None
+        # 页面名 -> Screen，最近显示的在后
+        self._screens = OrderedDict()
+
+    # 显示页面 name，返回 (Screen, 是否新建)
+    # 已有的页面重新显示并刷新数据；新建的页面为空框架，由调用方创建控件并用 on_show 登记刷新方法
+    def show(self, name):
+        screen = self._screens.get(name)
+        if screen is not None and not screen.frame.winfo_exists():
+            del self._screens[name]
+            screen = None
+        if self.current is not None and self.current is not screen and self.current.frame.winfo_exists():
+            self.current.frame.pack_forget()
+
+        created = screen is None
+        if created:
+            screen = self._screens[name] = Screen(name, ttk.Frame(self.container))
+        else:
+            self._screens.move_to_end(name)
+        if self.current is not screen:
+            screen.frame.pack(fill="both", expand=True)
+        self.current = screen
+        self._evict()
+
+        if not created and screen.refresh is not None:
+            screen.refresh()
+        return screen, created
+
+    # 登记当前页面再次进入时的刷新方法
+    def on_show(self, refresh):
+        self.current.refresh = refresh
+
+    # 销毁页面，下次进入时重新创建
+    def discard(self, name):
+        screen = self._screens.pop(name, None)
+        if screen is None:
+            return
+        if screen is self.current:
+            self.current = None
+        screen.frame.destroy()
+
+    def _evict(self):
+        while len(self._screens) > self.max_screens:
+            name = next(iter(self._screens))
+            if self._screens[name] is self.current:
+                break
+            self.discard(name)
@@ -0,0 +1,150 @@
+# 全文检索
+# 基于 FTS5 trigram 分词的外部内容索引，由触发器与原表保持同步
+# trigram 分词按三个字符切分，中文同样适用；少于三个字符的关键字无法走索引，退回 LIKE 匹配
+# 原表没有 INTEGER PRIMARY KEY，VACUUM 后 rowid 可能变化，VACUUM 之后需要调用 rebuild()
+import sqlite3
+
+
+# 检索对象: 名称 -> (索引表, 原表, 索引列)
+INDEXES = {
+    "teacher": ("teacher_fts", "teacher_info", ("name", "id_number", "teaching_subject")),
+    "award": ("award_fts", "awards", ("award_name", "award_unit")),
+    "paper": ("paper_fts", "papers", ("paper_title", "journal_name")),
+    "project": ("project_fts", "research_projects", ("project_name",)),
+    "edu_work": ("edu_work_fts", "education_work", ("work_type", "description")),
+    "competition": ("competition_fts", "student_competitions", ("competition_name",)),
+}
+
+# trigram 分词能检索的最短关键字
+MIN_MATCH_LENGTH = 3
+
+# 综合检索结果的显示方式: 名称 -> (类别, SQL)，SQL 输出 (教师ID, 名称, 详细信息, 教师姓名)
+SEARCH_RESULTS = {
+    "teacher": ("教师", """
+        SELECT x.teacher_id, x.name, IFNULL(x.id_number, '') || ' ' || IFNULL(x.teaching_subject, ''), x.name
+        FROM teacher_info x
+        """),
+    "award": ("表彰", """
+        SELECT NULL, x.award_name, IFNULL(x.award_level, '') || ' ' || IFNULL(x.award_unit, '') || ' ' || IFNULL(x.award_date, ''),
+               (SELECT GROUP_CONCAT(t.name) FROM award_recipients ar JOIN teacher_info t ON ar.teacher_id = t.teacher_id
+                WHERE ar.award_id = x.award_id)
+        FROM awards x
+        """),
+    "paper": ("论文", """
+        SELECT x.teacher_id, x.paper_title, IFNULL(x.journal_name, '') || ' ' || IFNULL(x.publish_date, ''), t.name
+        FROM papers x LEFT JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """),
+    "project": ("课题", """
+        SELECT NULL, x.project_name, IFNULL(x.project_level, '') || ' ' || IFNULL(x.completion_date, ''),
+               (SELECT GROUP_CONCAT(t.name) FROM project_members pm JOIN teacher_info t ON pm.teacher_id = t.teacher_id
+                WHERE pm.project_id = x.project_id)
+        FROM research_projects x
+        """),
+    "edu_work": ("教育工作", """
+        SELECT x.teacher_id, x.work_type, IFNULL(x.academic_year, '') || ' ' || IFNULL(x.description, ''), t.name
+        FROM education_work x LEFT JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """),
+    "competition": ("学生竞赛", """
+        SELECT x.teacher_id, x.competition_name, IFNULL(x.award_level, '') || ' ' || IFNULL(x.competition_date, ''), t.name
+        FROM student_competitions x LEFT JOIN teacher_info t ON x.teacher_id = t.teacher_id
+        """),
+}
+
+
+# 当前 SQLite 是否支持 trigram 分词(3.34 及以上)
+def is_supported(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp.fts_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+# 索引是否已建立
+def is_available(conn, entity="teacher"):
+    fts_table = INDEXES[entity][0]
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)).fetchone()
+    return row is not None
+
+
+# 创建全部索引表及同步触发器(由 db_schema 的迁移调用，不支持 FTS5 时跳过，检索退回 LIKE)
+def create_all(conn):
+    if not is_supported(conn):
+        return
+    for fts_table, table, columns in INDEXES.values():
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{c}" for c in columns)
+        old_values = ", ".join(f"old.{c}" for c in columns)
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+                {column_list}, content='{table}', content_rowid='rowid', tokenize='trigram')
+            """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.rowid, {new_values});
+            END
+            """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+            END
+            """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_list} ON {table} BEGIN
+                INSERT INTO {fts_table} ({fts_table}, rowid, {column_list}) VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO {fts_table} (rowid, {column_list}) VALUES (new.rowid, {new_values});
+            END
+            """)
+        conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+
+# 按原表内容重建全部索引
+def rebuild(conn):
+    for entity, (fts_table, _, _) in INDEXES.items():
+        if is_available(conn, entity):
+            conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+    conn.commit()
+
+
+# FTS5 查询表达式: 限定列并按短语匹配
+def _match_expression(keyword, columns):
+    phrase = '"' + keyword.replace('"', '""') + '"'
+    return "{" + " ".join(columns) + "} : " + phrase
+
+
+# 生成可嵌入 WHERE 的检索条件，返回 (SQL片段, 参数)
+# alias 为原表在查询中的别名，columns 为参与匹配的列(默认全部索引列)
+def match_clause(conn, entity, keyword, alias=None, columns=None):
+    fts_table, table, indexed = INDEXES[entity]
+    columns = tuple(columns or indexed)
+    prefix = f"{alias}." if alias else ""
+    keyword = keyword.strip()
+    if len(keyword) >= MIN_MATCH_LENGTH and is_available(conn, entity):
+        clause = f"{prefix}rowid IN (SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ?)"
+        return clause, [_match_expression(keyword, columns)]
+    clause = "(" + " OR ".join(f"{prefix}{c} LIKE ?" for c in columns) + ")"
+    return clause, [f"%{keyword}%"] * len(columns)
+
+
+# 综合检索，返回按相关度排序的 [(类别, 教师ID, 名称, 详细信息, 教师姓名)]
+def search_all(conn, keyword, limit=50):
+    keyword = keyword.strip()
+    if not keyword:
+        return []
+    scored = []
+    for entity, (category, select) in SEARCH_RESULTS.items():
+        fts_table, _, columns = INDEXES[entity]
+        if len(keyword) >= MIN_MATCH_LENGTH and is_available(conn, entity):
+            # bm25 越小越相关
+            sql = select + f" JOIN {fts_table} f ON x.rowid = f.rowid WHERE {fts_table} MATCH ? ORDER BY f.rank LIMIT ?"
+            sql = sql.replace("SELECT ", "SELECT f.rank, ", 1)
+            params = [_match_expression(keyword, columns), limit]
+        else:
+            clause, params = match_clause(conn, entity, keyword, alias="x")
+            sql = select.replace("SELECT ", "SELECT 0, ", 1) + f" WHERE {clause} LIMIT ?"
+            params = params + [limit]
+        for row in conn.execute(sql, params):
+            scored.append((row[0], category) + tuple(row[1:]))
+    scored.sort(key=lambda r: r[0])
+    return [row[1:] for row in scored[:limit]]
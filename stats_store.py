@@ -0,0 +1,235 @@
+# 统计汇总
+# 统计图表读取预先汇总好的计数，不再每次扫描 teacher_info、title_history、education、awards
+# 表彰计数由触发器实时维护；教师分布由触发器记录变化的教师，统计前 refresh() 只重算这些教师
+import sqlite3
+
+
+# 学位从高到低
+DEGREE_ORDER = ("博士", "硕士", "学士", "其他")
+
+# 表彰级别从高到低
+AWARD_LEVELS = ("全球级", "国家级", "省级", "市级", "校级")
+
+# 教师分布的统计维度
+TEACHER_DIMENSIONS = ("birth_decade", "current_title", "highest_degree")
+
+# 表彰计数的统计维度
+AWARD_DIMENSIONS = ("award_level", "award_year", "award_type")
+
+_DEGREE_RANK = "CASE e.degree " + " ".join(
+    f"WHEN '{degree}' THEN {i}" for i, degree in enumerate(DEGREE_ORDER)) + " ELSE 9 END"
+
+# 表彰的汇总键
+_AWARD_KEY = {
+    "award_level": "IFNULL({0}.award_level, '未知')",
+    "award_year": "IFNULL(substr({0}.award_date, 1, 4), '未知')",
+    "award_type": "IFNULL({0}.award_type, '综合表彰')",
+}
+
+_TABLES = [
+    # 每位教师的统计属性
+    """
+    CREATE TABLE IF NOT EXISTS stats_teacher_facts (
+        teacher_id TEXT PRIMARY KEY,
+        birth_decade TEXT,
+        current_title TEXT,
+        highest_degree TEXT
+    )
+    """,
+    # 需要重算的教师(变更日志)
+    """
+    CREATE TABLE IF NOT EXISTS stats_dirty_teachers (
+        teacher_id TEXT PRIMARY KEY
+    )
+    """,
+    # 教师分布计数
+    """
+    CREATE TABLE IF NOT EXISTS stats_teacher_counts (
+        dimension TEXT,
+        value TEXT,
+        teacher_count INTEGER,
+        PRIMARY KEY (dimension, value)
+    )
+    """,
+    # 表彰计数: 证书数及获奖人次
+    """
+    CREATE TABLE IF NOT EXISTS stats_award_counts (
+        award_level TEXT,
+        award_year TEXT,
+        award_type TEXT,
+        award_count INTEGER,
+        recipient_count INTEGER,
+        PRIMARY KEY (award_level, award_year, award_type)
+    )
+    """,
+]
+
+
+def _mark_dirty(table, events):
+    # 档案变化时记录受影响的教师
+    triggers = []
+    for name, event, refs in events:
+        body = "".join(f"INSERT OR IGNORE INTO stats_dirty_teachers (teacher_id) VALUES ({ref}.teacher_id); "
+                       for ref in refs)
+        triggers.append(f"""
+            CREATE TRIGGER IF NOT EXISTS stats_{table}_{name}
+            AFTER {event} ON {table} BEGIN {body}END
+            """)
+    return triggers
+
+
+def _award_upsert(key_alias, award_delta, recipient_delta, source=None):
+    # 把某个表彰的汇总键计数加上增量
+    keys = ", ".join(_AWARD_KEY[d].format(key_alias) for d in AWARD_DIMENSIONS)
+    select = f"SELECT {keys}, {award_delta}, {recipient_delta}"
+    if source:
+        select += f" FROM awards {key_alias} WHERE {source}"
+    else:
+        select += " WHERE 1"
+    return f"""
+        INSERT INTO stats_award_counts (award_level, award_year, award_type, award_count, recipient_count)
+        {select}
+        ON CONFLICT (award_level, award_year, award_type) DO UPDATE SET
+            award_count = award_count + excluded.award_count,
+            recipient_count = recipient_count + excluded.recipient_count;
+        """
+
+
+def _triggers():
+    triggers = []
+    triggers += _mark_dirty("teacher_info", [
+        ("insert", "INSERT", ("new",)),
+        ("update", "UPDATE OF teacher_id, birth_date", ("old", "new")),
+        ("delete", "DELETE", ("old",))])
+    for table in ("title_history", "education"):
+        triggers += _mark_dirty(table, [
+            ("insert", "INSERT", ("new",)),
+            ("update", "UPDATE", ("old", "new")),
+            ("delete", "DELETE", ("old",))])
+
+    # 教师属性变化时维护分布计数
+    for event, ref, delta in (("INSERT", "new", 1), ("DELETE", "old", -1)):
+        body = "".join(f"""
+            INSERT INTO stats_teacher_counts (dimension, value, teacher_count)
+            VALUES ('{d}', {ref}.{d}, {delta})
+            ON CONFLICT (dimension, value) DO UPDATE SET teacher_count = teacher_count + excluded.teacher_count;
+            """ for d in TEACHER_DIMENSIONS)
+        triggers.append(f"""
+            CREATE TRIGGER IF NOT EXISTS stats_teacher_facts_{event.lower()}
+            AFTER {event} ON stats_teacher_facts BEGIN {body} END
+            """)
+
+    # 表彰计数
+    recipients_of = "(SELECT COUNT(*) FROM award_recipients WHERE award_id = {0}.award_id)"
+    triggers.append(f"""
+        CREATE TRIGGER IF NOT EXISTS stats_awards_insert AFTER INSERT ON awards BEGIN
+            {_award_upsert("new", 1, recipients_of.format("new"))}
+        END
+        """)
+    triggers.append(f"""
+        CREATE TRIGGER IF NOT EXISTS stats_awards_delete AFTER DELETE ON awards BEGIN
+            {_award_upsert("old", -1, "-" + recipients_of.format("old"))}
+        END
+        """)
+    triggers.append(f"""
+        CREATE TRIGGER IF NOT EXISTS stats_awards_update AFTER UPDATE OF award_level, award_date, award_type ON awards BEGIN
+            {_award_upsert("old", -1, "-" + recipients_of.format("old"))}
+            {_award_upsert("new", 1, recipients_of.format("new"))}
+        END
+        """)
+    triggers.append(f"""
+        CREATE TRIGGER IF NOT EXISTS stats_award_recipients_insert AFTER INSERT ON award_recipients BEGIN
+            {_award_upsert("a", 0, 1, "a.award_id = new.award_id")}
+        END
+        """)
+    triggers.append(f"""
+        CREATE TRIGGER IF NOT EXISTS stats_award_recipients_delete AFTER DELETE ON award_recipients BEGIN
+            {_award_upsert("a", 0, -1, "a.award_id = old.award_id")}
+        END
+        """)
+    triggers.append(f"""
+        CREATE TRIGGER IF NOT EXISTS stats_award_recipients_update AFTER UPDATE OF award_id ON award_recipients BEGIN
+            {_award_upsert("a", 0, -1, "a.award_id = old.award_id")}
+            {_award_upsert("a", 0, 1, "a.award_id = new.award_id")}
+        END
+        """)
+    return triggers
+
+
+# 创建汇总表和触发器，并用现有数据初始化(由 db_schema 的迁移调用)
+def create_all(conn):
+    for statement in _TABLES + _triggers():
+        conn.execute(statement)
+    conn.execute("INSERT OR IGNORE INTO stats_dirty_teachers (teacher_id) SELECT teacher_id FROM teacher_info")
+    conn.execute("DELETE FROM stats_award_counts")
+    keys = ", ".join(_AWARD_KEY[d].format("a") for d in AWARD_DIMENSIONS)
+    conn.execute(f"""
+        INSERT INTO stats_award_counts (award_level, award_year, award_type, award_count, recipient_count)
+        SELECT {keys}, COUNT(*), SUM((SELECT COUNT(*) FROM award_recipients ar WHERE ar.award_id = a.award_id))
+        FROM awards a
+        GROUP BY 1, 2, 3
+        """)
+
+
+# 重算变更日志中的教师，返回重算的人数
+def refresh(conn):
+    dirty = conn.execute("SELECT COUNT(*) FROM stats_dirty_teachers").fetchone()[0]
+    if not dirty:
+        return 0
+    own_transaction = not conn.in_transaction
+    try:
+        if own_transaction:
+            conn.execute("BEGIN")
+        conn.execute("DELETE FROM stats_teacher_facts WHERE teacher_id IN (SELECT teacher_id FROM stats_dirty_teachers)")
+        conn.execute(f"""
+            INSERT INTO stats_teacher_facts (teacher_id, birth_decade, current_title, highest_degree)
+            SELECT t.teacher_id,
+                   CASE WHEN length(t.birth_date) >= 4 THEN substr(t.birth_date, 1, 3) || '0年代' ELSE '未知' END,
+                   IFNULL((SELECT th.title FROM title_history th WHERE th.teacher_id = t.teacher_id
+                           ORDER BY th.obtain_date DESC LIMIT 1), '无职称'),
+                   IFNULL((SELECT e.degree FROM education e WHERE e.teacher_id = t.teacher_id
+                           ORDER BY {_DEGREE_RANK} LIMIT 1), '未知')
+            FROM teacher_info t
+            WHERE t.teacher_id IN (SELECT teacher_id FROM stats_dirty_teachers)
+            """)
+        conn.execute("DELETE FROM stats_dirty_teachers")
+        if own_transaction:
+            conn.execute("COMMIT")
+    except sqlite3.Error:
+        if own_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    return dirty
+
+
+# 教师分布 [(值, 人数)]
+def teacher_distribution(conn, dimension):
+    if dimension not in TEACHER_DIMENSIONS:
+        raise ValueError(f"未知的统计维度: {dimension}")
+    refresh(conn)
+    rows = conn.execute("""
+        SELECT value, teacher_count FROM stats_teacher_counts
+        WHERE dimension = ? AND teacher_count > 0
+        ORDER BY value
+        """, (dimension,)).fetchall()
+    if dimension == "highest_degree":
+        rows.sort(key=lambda r: DEGREE_ORDER.index(r[0]) if r[0] in DEGREE_ORDER else len(DEGREE_ORDER))
+    return rows
+
+
+# 表彰计数 [(值, 证书数, 获奖人次)]，可按其他维度筛选，如 award_counts(conn, "award_year", award_type="教学比武")
+def award_counts(conn, dimension, **filters):
+    if dimension not in AWARD_DIMENSIONS or not set(filters) <= set(AWARD_DIMENSIONS):
+        raise ValueError(f"未知的统计维度: {dimension}")
+    where = "".join(f" AND {column} = ?" for column in filters)
+    order = dimension
+    if dimension == "award_level":
+        order = "CASE award_level " + " ".join(
+            f"WHEN '{level}' THEN {i}" for i, level in enumerate(AWARD_LEVELS)) + " ELSE 9 END"
+    return conn.execute(f"""
+        SELECT {dimension}, SUM(award_count), SUM(recipient_count) FROM stats_award_counts
+        WHERE 1 = 1{where}
+        GROUP BY {dimension}
+        HAVING SUM(award_count) > 0
+        ORDER BY {order}
+        """, tuple(filters.values())).fetchall()
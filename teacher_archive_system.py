@@ -5,11 +5,13 @@ import os
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
-import shutil
 from datetime import datetime
 import uuid
 
+import thumbnails
+import blob_store
+import db_schema
+
 # 尝试导入tkcalendar，如果不存在则提供一个简单的替代方案
 try:
     from tkcalendar import Calendar
@@ -336,11 +338,14 @@ class ArchiveManagementSystem:
         ''')
         
         self.conn.commit()
+        
+        # 执行结构迁移(索引、照片和扫描件的引用计数等)
+        db_schema.migrate(self.conn)
     
     def setup_folders(self):
-        # 创建存储照片和扫描件的文件夹
-        os.makedirs('photos', exist_ok=True)
-        os.makedirs('scans', exist_ok=True)
+        # 创建存储照片和扫描件的文件夹(按内容存放，相同文件只保存一份)
+        os.makedirs(blob_store.BLOB_DIR, exist_ok=True)
+        os.makedirs(thumbnails.THUMB_DIR, exist_ok=True)
     
     def create_main_interface(self):
         # 创建主框架
@@ -534,9 +539,7 @@ class ArchiveManagementSystem:
             
             if teacher[7] and os.path.exists(teacher[7]):  # photo_path
                 try:
-                    img = Image.open(teacher[7])
-                    img = img.resize((150, 200), Image.LANCZOS)
-                    photo = ImageTk.PhotoImage(img)
+                    photo = thumbnails.get_photo(teacher[7], thumbnails.PHOTO_SIZE)
                     photo_label = ttk.Label(photo_frame, image=photo)
                     photo_label.image = photo  # 保持引用
                     photo_label.pack()
@@ -636,9 +639,7 @@ class ArchiveManagementSystem:
             scan_window.geometry("800x600")
             
             try:
-                img = Image.open(scan_path)
-                img = img.resize((700, 500), Image.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
+                photo = thumbnails.get_photo(scan_path, thumbnails.SCAN_VIEW_SIZE)
                 photo_label = ttk.Label(scan_window, image=photo)
                 photo_label.image = photo  # 保持引用
                 photo_label.pack(padx=10, pady=10)
@@ -775,21 +776,12 @@ class ArchiveManagementSystem:
         
         if file_path:
             try:
-                # 创建照片目录
-                os.makedirs('photos', exist_ok=True)
-                
-                # 生成唯一文件名
-                file_ext = os.path.splitext(file_path)[1]
-                new_filename = f"photo_{uuid.uuid4().hex}{file_ext}"
-                new_path = os.path.join('photos', new_filename)
+                # 存入文件存储(相同文件只保存一份)
+                new_path = blob_store.put(file_path)[0]
                 
-                # 复制照片到应用程序目录
-                shutil.copy2(file_path, new_path)
-                
-                # 更新照片显示
-                img = Image.open(new_path)
-                img = img.resize((150, 200), Image.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
+                # 生成缩略图并更新照片显示
+                thumbnails.prepare(new_path, thumbnails.PHOTO_SIZES)
+                photo = thumbnails.get_photo(new_path, thumbnails.PHOTO_SIZE)
                 self.photo_label.configure(image=photo, text="")
                 self.photo_label.image = photo  # 保持引用
                 
@@ -992,23 +984,15 @@ class ArchiveManagementSystem:
         
         if file_path:
             try:
-                # 创建扫描件目录
-                os.makedirs('scans', exist_ok=True)
-                
-                # 生成唯一文件名
+                # 存入文件存储(相同文件只保存一份)
+                new_path = blob_store.put(file_path)[0]
                 file_ext = os.path.splitext(file_path)[1]
-                new_filename = f"scan_{uuid.uuid4().hex}{file_ext}"
-                new_path = os.path.join('scans', new_filename)
-                
-                # 复制扫描件到应用程序目录
-                shutil.copy2(file_path, new_path)
                 
                 # 更新扫描件显示
                 if file_ext.lower() in [".jpg", ".jpeg", ".png"]:
                     try:
-                        img = Image.open(new_path)
-                        img = img.resize((150, 200), Image.LANCZOS)
-                        photo = ImageTk.PhotoImage(img)
+                        thumbnails.prepare(new_path, thumbnails.SCAN_SIZES)
+                        photo = thumbnails.get_photo(new_path, thumbnails.PHOTO_SIZE)
                         self.scan_label.configure(image=photo)
                         self.scan_label.image = photo  # 保持引用
                     except Exception:
@@ -1238,9 +1222,7 @@ class ArchiveManagementSystem:
             if result and result[0] and os.path.exists(result[0]):
                 try:
                     # 显示照片
-                    img = Image.open(result[0])
-                    img = img.resize((200, 250), Image.LANCZOS)
-                    photo = ImageTk.PhotoImage(img)
+                    photo = thumbnails.get_photo(result[0], thumbnails.PHOTO_LARGE_SIZE)
                     self.photo_display.configure(image=photo)
                     self.photo_display.image = photo  # 保持引用
                 except Exception as e:
@@ -1265,26 +1247,17 @@ class ArchiveManagementSystem:
         
         if file_path:
             try:
-                # 创建照片目录
-                os.makedirs('photos', exist_ok=True)
-                
-                # 生成唯一文件名
-                file_ext = os.path.splitext(file_path)[1]
-                new_filename = f"photo_{uuid.uuid4().hex}{file_ext}"
-                new_path = os.path.join('photos', new_filename)
-                
-                # 复制照片到应用程序目录
-                shutil.copy2(file_path, new_path)
+                # 存入文件存储(相同文件只保存一份)
+                new_path = blob_store.put(file_path)[0]
                 
                 # 更新数据库中的照片路径
                 self.cursor.execute("UPDATE teacher_info SET photo_path = ?, update_time = ? WHERE teacher_id = ?",
                                    (new_path, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), teacher_id))
                 self.conn.commit()
                 
-                # 更新照片显示
-                img = Image.open(new_path)
-                img = img.resize((200, 250), Image.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
+                # 生成缩略图并更新照片显示
+                thumbnails.prepare(new_path, thumbnails.PHOTO_SIZES)
+                photo = thumbnails.get_photo(new_path, thumbnails.PHOTO_LARGE_SIZE)
                 self.photo_display.configure(image=photo)
                 self.photo_display.image = photo  # 保持引用
                 
@@ -1310,13 +1283,11 @@ class ArchiveManagementSystem:
             # 确认删除
             if messagebox.askyesno("确认", "确定要删除该照片吗？"):
                 try:
-                    # 删除文件
-                    os.remove(result[0])
-                    
-                    # 更新数据库
+                    # 更新数据库，再删除不再使用的文件
                     self.cursor.execute("UPDATE teacher_info SET photo_path = NULL, update_time = ? WHERE teacher_id = ?",
                                        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), teacher_id))
                     self.conn.commit()
+                    blob_store.collect_garbage(self.conn)
                     
                     # 更新显示
                     self.photo_display.configure(text="照片已删除")
@@ -1435,9 +1406,7 @@ class ArchiveManagementSystem:
                 # 如果是图片文件
                 file_ext = os.path.splitext(result[0])[1].lower()
                 if file_ext in [".jpg", ".jpeg", ".png", ".gif"]:
-                    img = Image.open(result[0])
-                    img = img.resize((700, 500), Image.LANCZOS)
-                    photo = ImageTk.PhotoImage(img)
+                    photo = thumbnails.get_photo(result[0], thumbnails.SCAN_VIEW_SIZE)
                     photo_label = ttk.Label(scan_window, image=photo)
                     photo_label.image = photo  # 保持引用
                     photo_label.pack(padx=10, pady=10)
@@ -1472,16 +1441,11 @@ class ArchiveManagementSystem:
         
         if file_path:
             try:
-                # 创建扫描件目录
-                os.makedirs('scans', exist_ok=True)
-                
-                # 生成唯一文件名
+                # 存入文件存储(相同文件只保存一份)
+                new_path = blob_store.put(file_path)[0]
                 file_ext = os.path.splitext(file_path)[1]
-                new_filename = f"scan_{uuid.uuid4().hex}{file_ext}"
-                new_path = os.path.join('scans', new_filename)
-                
-                # 复制扫描件到应用程序目录
-                shutil.copy2(file_path, new_path)
+                if file_ext.lower() in [".jpg", ".jpeg", ".png"]:
+                    thumbnails.prepare(new_path, thumbnails.SCAN_SIZES)
                 
                 # 更新数据库中的扫描件路径
                 self.cursor.execute("UPDATE education SET scan_file_path = ?, update_time = ? WHERE record_id = ?",
@@ -1513,13 +1477,11 @@ class ArchiveManagementSystem:
             # 确认删除
             if messagebox.askyesno("确认", "确定要删除该扫描件吗？"):
                 try:
-                    # 删除文件
-                    os.remove(result[0])
-                    
-                    # 更新数据库
+                    # 更新数据库，再删除不再使用的文件
                     self.cursor.execute("UPDATE education SET scan_file_path = NULL, update_time = ? WHERE record_id = ?",
                                        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), record_id))
                     self.conn.commit()
+                    blob_store.collect_garbage(self.conn)
                     
                     # 刷新扫描件列表
                     self.on_scan_teacher_selected(None)
@@ -0,0 +1,135 @@
+# 教师名录
+# 下拉框、姓名查找共用一份内存中的教师名录(教师ID -> 教师、姓名 -> 教师ID 列表)，不再各自查询 teacher_info
+# 重名教师在选项中显示为“姓名 (身份证号)”，选择后能准确对应到教师ID
+# 名录记下读取时 teacher_info 的修改版本(query_cache 的 table_versions)，教师信息修改后下次使用时自动重新读取
+# 输入时可按姓名、身份证号片段或拼音、拼音首字母前缀筛选(拼音需要安装 pypinyin)
+from bisect import bisect_left
+from collections import namedtuple
+
+import query_cache
+
+
+# label: 下拉框中显示的名称，全部教师中唯一
+Teacher = namedtuple("Teacher", ["teacher_id", "name", "id_number", "gender", "teaching_subject", "label"])
+
+
+# 姓名 -> (全拼, 首字母)，没有安装 pypinyin 时返回 None
+def _pinyin_keys():
+    try:
+        from pypinyin import Style, lazy_pinyin
+    except ImportError:
+        return None
+
+    def keys(name):
+        return ("".join(lazy_pinyin(name)).lower(),
+                "".join(lazy_pinyin(name, style=Style.FIRST_LETTER)).lower())
+    return keys
+
+
+class TeacherDirectory:
+    def __init__(self, conn):
+        self.conn = conn
+        # 读取名录时 teacher_info 的版本
+        self._version = None
+        self._teachers = None
+        self._by_id = {}
+        self._by_name = {}
+        self._by_label = {}
+        # 拼音前缀索引: 按拼音排序的 [(拼音, 教师序号)]
+        self._pinyin = []
+
+    # teacher_info 修改过(或尚未读取)时重新读取
+    def refresh(self):
+        version = query_cache.versions(self.conn).get("teacher_info")
+        if self._teachers is not None and version is not None and version == self._version:
+            return
+        rows = self.conn.execute("""
+            SELECT teacher_id, name, id_number, gender, teaching_subject
+            FROM teacher_info
+            ORDER BY name, teacher_id
+            """).fetchall()
+
+        by_name = {}
+        for row in rows:
+            by_name.setdefault(row[1], []).append(row[0])
+        teachers = [Teacher(teacher_id, name, id_number, gender, subject,
+                            name if len(by_name[name]) == 1 else f"{name} ({id_number or teacher_id})")
+                    for teacher_id, name, id_number, gender, subject in rows]
+
+        pinyin = []
+        keys = _pinyin_keys()
+        if keys is not None:
+            for i, teacher in enumerate(teachers):
+                pinyin.extend((key, i) for key in set(keys(teacher.name)))
+            pinyin.sort()
+
+        self._teachers = teachers
+        self._by_id = {teacher.teacher_id: teacher for teacher in teachers}
+        self._by_name = by_name
+        self._by_label = {teacher.label: teacher for teacher in teachers}
+        self._pinyin = pinyin
+        self._version = version
+
+    # 全部教师(按姓名排序)
+    def teachers(self):
+        self.refresh()
+        return self._teachers
+
+    # 下拉框选项
+    def labels(self):
+        return [teacher.label for teacher in self.teachers()]
+
+    def get(self, teacher_id):
+        self.refresh()
+        return self._by_id.get(teacher_id)
+
+    def name(self, teacher_id, default=None):
+        teacher = self.get(teacher_id)
+        return teacher.name if teacher is not None else default
+
+    def label(self, teacher_id, default=""):
+        teacher = self.get(teacher_id)
+        return teacher.label if teacher is not None else default
+
+    # 同名教师的ID
+    def ids(self, name):
+        self.refresh()
+        return list(self._by_name.get(name, ()))
+
+    # 由下拉框选项或不重名的姓名得到教师ID，找不到或重名时抛出 ValueError
+    def resolve(self, text):
+        self.refresh()
+        text = text.strip()
+        teacher = self._by_label.get(text)
+        if teacher is not None:
+            return teacher.teacher_id
+        ids = self._by_name.get(text)
+        if not ids:
+            raise ValueError(f"教师“{text}”不存在")
+        raise ValueError(f"存在多位名为“{text}”的教师，请选择“姓名 (身份证号)”")
+
+    # 姓名或身份证号包含 text、拼音或拼音首字母以 text 开头的教师(按姓名排序)
+    def search(self, text, limit=None):
+        teachers = self.teachers()
+        text = text.strip()
+        if not text:
+            return teachers[:limit] if limit else teachers
+        found = {i for i, teacher in enumerate(teachers)
+                 if text in teacher.name or (teacher.id_number and text in teacher.id_number)}
+        key = text.lower()
+        for pinyin, i in self._pinyin[bisect_left(self._pinyin, (key,)):]:
+            if not pinyin.startswith(key):
+                break
+            found.add(i)
+        matched = [teachers[i] for i in sorted(found)]
+        return matched[:limit] if limit else matched
+
+    # 教师下拉框: 每次展开时按已输入的内容筛选选项(已选中某位教师时列出全部)，选项总是最新的
+    def attach(self, combobox):
+        def update():
+            text = combobox.get()
+            self.refresh()
+            teachers = self._teachers if text in self._by_label else self.search(text)
+            combobox.configure(values=[teacher.label for teacher in teachers])
+        combobox.configure(postcommand=update)
+        update()
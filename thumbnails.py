@@ -0,0 +1,172 @@
+# 缩略图缓存
+# 照片、扫描件原图可能有几千万像素，每次显示都解码原图会很慢
+# 上传时按内容的 sha256 生成固定尺寸的缩略图保存在 thumbs/ 目录，显示时直接读取缩略图
+# 最近显示过的图片在内存中保留解码后的 PhotoImage
+# PDF 扫描件先把首页渲染为预览图(需要 PyMuPDF)，再由预览图生成缩略图
+# Pillow 在第一次生成或显示缩略图时才导入，只用到文件存储的批处理任务不必加载
+import hashlib
+import os
+from collections import OrderedDict
+
+
+THUMB_DIR = "thumbs"
+
+# 常用尺寸(宽, 高)，缩略图保持原图比例，不超过此尺寸
+PHOTO_SIZE = (150, 200)
+PHOTO_LARGE_SIZE = (200, 250)
+SCAN_VIEW_SIZE = (700, 500)
+
+# 上传时预先生成的尺寸
+PHOTO_SIZES = (PHOTO_SIZE, PHOTO_LARGE_SIZE)
+SCAN_SIZES = (PHOTO_SIZE, SCAN_VIEW_SIZE)
+
+# PDF 首页预览图的尺寸上限
+PDF_PREVIEW_SIZE = (1400, 1000)
+
+# 内存中保留的 PhotoImage 数
+CACHE_SIZE = 64
+
+# 内存中保留的旧文件 sha256 数
+DIGEST_CACHE_SIZE = 1024
+
+# (路径, 修改时间, 文件大小) -> sha256，文件未变化时不必重新计算，最近使用的在后
+_digests = OrderedDict()
+# (sha256, 尺寸) -> PhotoImage
+_photos = OrderedDict()
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+# 文件内容的 sha256
+# 文件存储中的文件名就是 sha256，不必读取；只有 photos/、scans/ 等旧路径才需要计算
+def file_digest(path):
+    # blob_store 导入了本模块，在调用时再导入
+    import blob_store
+    if blob_store.is_blob(path):
+        return os.path.basename(path)[:64]
+    key = _stat_key(path)
+    digest = _digests.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+    _remember(key, digest)
+    return digest
+
+
+def _remember(key, digest):
+    _digests[key] = digest
+    _digests.move_to_end(key)
+    while len(_digests) > DIGEST_CACHE_SIZE:
+        _digests.popitem(last=False)
+
+
+# 复制文件时已计算出 sha256，记下来免得再读一遍(存储中的文件按文件名即可得到)
+def remember_digest(path, digest):
+    import blob_store
+    if not blob_store.is_blob(path):
+        _remember(_stat_key(path), digest)
+
+
+def thumbnail_path(digest, size):
+    return os.path.join(THUMB_DIR, digest[:2], f"{digest}_{size[0]}x{size[1]}.png")
+
+
+def is_pdf(path):
+    return path.lower().endswith(".pdf")
+
+
+# 把 PDF 首页渲染为预览图，返回预览图路径
+def pdf_preview(path):
+    digest = file_digest(path)
+    target = os.path.join(THUMB_DIR, digest[:2], f"{digest}_page1.png")
+    if os.path.exists(target):
+        return target
+    try:
+        import fitz
+    except ImportError:
+        raise OSError("预览 PDF 需要安装 PyMuPDF")
+    with fitz.open(path) as doc:
+        if doc.page_count == 0:
+            raise OSError("PDF 文件没有页面")
+        page = doc[0]
+        zoom = min(PDF_PREVIEW_SIZE[0] / page.rect.width, PDF_PREVIEW_SIZE[1] / page.rect.height)
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp = f"{target}.{os.getpid()}.tmp"
+        pixmap.save(temp, output="png")
+        os.replace(temp, target)
+    return target
+
+
+# 从原图生成缩略图
+def _render(path, size):
+    from PIL import Image, ImageOps
+    with Image.open(pdf_preview(path) if is_pdf(path) else path) as img:
+        # JPEG 直接按 1/2、1/4、1/8 比例解码，不必解码全尺寸
+        img.draft("RGB", size)
+        # 手机照片按 EXIF 方向信息转正
+        img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        img = img.convert("RGBA")
+    return _shrink(img, size)
+
+
+def _shrink(img, size):
+    from PIL import Image
+    # 先用 reduce 按整数倍快速缩小到目标的两倍以内，再用 LANCZOS 精细缩放
+    factor = min(img.width // (size[0] * 2), img.height // (size[1] * 2))
+    if factor > 1:
+        img = img.reduce(factor)
+    else:
+        img = img.copy()
+    img.thumbnail(size, getattr(Image, "Resampling", Image).LANCZOS)
+    return img
+
+
+def _save(img, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # 先写临时文件再改名，避免留下不完整的缩略图
+    temp = f"{target}.{os.getpid()}.tmp"
+    img.save(temp, "PNG")
+    os.replace(temp, target)
+
+
+# 确保缩略图已生成，返回缩略图路径
+def ensure_thumbnail(path, size):
+    target = thumbnail_path(file_digest(path), size)
+    if not os.path.exists(target):
+        _save(_render(path, size), target)
+    return target
+
+
+# 上传时生成各尺寸的缩略图，原图只解码一次
+def prepare(path, sizes=PHOTO_SIZES):
+    digest = file_digest(path)
+    missing = [size for size in sizes if not os.path.exists(thumbnail_path(digest, size))]
+    if not missing:
+        return
+    base = _render(path, (max(w for w, _ in missing), max(h for _, h in missing)))
+    for size in missing:
+        _save(_shrink(base, size), thumbnail_path(digest, size))
+
+
+# 取得用于显示的 PhotoImage(需在界面线程中调用)
+def get_photo(path, size=PHOTO_SIZE):
+    key = (file_digest(path), size)
+    photo = _photos.get(key)
+    if photo is not None:
+        _photos.move_to_end(key)
+        return photo
+    from PIL import Image, ImageTk
+    with Image.open(ensure_thumbnail(path, size)) as img:
+        photo = ImageTk.PhotoImage(img)
+    _photos[key] = photo
+    while len(_photos) > CACHE_SIZE:
+        _photos.popitem(last=False)
+    return photo
@@ -0,0 +1,101 @@
+# 按主键增量刷新 Treeview
+# 新的查询结果与表格中已有的行按主键(用作 Treeview 的 iid)比较，只插入新增的行、修改变化的行、删除消失的行，
+# 顺序改变的行只移动其中最少的一部分；保存或删除一条记录后刷新上万行的表格也只需改动几行
+# 表格中各行上次显示的值记在控件上，用于判断是否变化，因此有主键的表格应只通过本模块增删行
+import operator
+from bisect import bisect_left
+from collections import namedtuple
+
+
+# 一次刷新的改动行数
+Changes = namedtuple("Changes", ["inserted", "updated", "deleted", "moved"])
+
+
+def _shown(tree):
+    shown = getattr(tree, "_shown_values", None)
+    if shown is None:
+        shown = tree._shown_values = {}
+    return shown
+
+
+# 按 key(row) 生成 [(iid, 显示的值, 标签)]，values(row)、tags(row) 默认为整行、无标签
+def _items(rows, key, values, tags):
+    return [(str(key(row)), tuple(row if values is None else values(row)), () if tags is None else tuple(tags(row)))
+            for row in rows]
+
+
+# 在 index 处插入一行并记录其显示的值
+def insert(tree, index, iid, values, tags=()):
+    tree.insert("", index, iid=iid, values=values, tags=tags)
+    _shown(tree)[iid] = (values, tags)
+
+
+# 清空表格
+def clear(tree):
+    tree.delete(*tree.get_children())
+    _shown(tree).clear()
+
+
+# 最长递增子序列(返回其在 positions 中的下标)，这些行相对顺序已经正确，不需要移动
+def _longest_increasing(positions):
+    # 常见情况: 只有增删改，已有行的顺序没变
+    if all(map(operator.lt, positions, positions[1:])):
+        return set(range(len(positions)))
+    tails = []
+    tail_index = []
+    previous = [-1] * len(positions)
+    for i, position in enumerate(positions):
+        j = bisect_left(tails, position)
+        if j == len(tails):
+            tails.append(position)
+            tail_index.append(i)
+        else:
+            tails[j] = position
+            tail_index[j] = i
+        previous[i] = tail_index[j - 1] if j else -1
+    result = set()
+    i = tail_index[-1] if tail_index else -1
+    while i >= 0:
+        result.add(i)
+        i = previous[i]
+    return result
+
+
+# 把表格刷新为 rows，key(row) 为行的主键，返回 Changes
+# 需要插入和移动的行超过 max_changes 时不做修改并返回 None，由调用方整表重建(如分批插入)
+def sync(tree, rows, key, values=None, tags=None, max_changes=None):
+    items = _items(rows, key, values, tags)
+    order = {iid: i for i, (iid, _, _) in enumerate(items)}
+    if len(order) != len(items):
+        raise ValueError("表格中的行主键重复")
+
+    current = tree.get_children()
+    stale = [iid for iid in current if iid not in order]
+    kept = [iid for iid in current if iid in order]
+    stay = {kept[i] for i in _longest_increasing([order[iid] for iid in kept])}
+    movers = [iid for iid in kept if iid not in stay]
+    if max_changes is not None and len(movers) + len(items) - len(kept) > max_changes:
+        return None
+
+    shown = _shown(tree)
+    if stale:
+        tree.delete(*stale)
+    # 先摘下需要移动的行，剩下的行相对顺序都正确；之后按新顺序逐行放到位置 i，前 i 行始终已排好
+    if movers:
+        tree.detach(*movers)
+    kept = set(kept)
+    new_shown = {}
+    inserted = updated = 0
+    for i, (iid, row_values, row_tags) in enumerate(items):
+        if iid not in kept:
+            tree.insert("", i, iid=iid, values=row_values, tags=row_tags)
+            inserted += 1
+        else:
+            if iid not in stay:
+                tree.move(iid, "", i)
+            if shown.get(iid) != (row_values, row_tags):
+                tree.item(iid, values=row_values, tags=row_tags)
+                updated += 1
+        new_shown[iid] = (row_values, row_tags)
+    tree._shown_values = new_shown
+    return Changes(inserted, updated, len(stale), len(movers))
@@ -0,0 +1,249 @@
+# 虚拟列表
+# Treeview 中只保留当前可见的行，滚动时按键集分页从数据库读取，适合数万行的大列表
+# 总行数和各页可以使用查询结果缓存(query_cache)，重新打开页面时数据没有变化就不再查询
+from tkinter import ttk
+from collections import OrderedDict
+
+import tree_diff
+
+
+# 分页数据源
+# 以基础查询为子查询，按排序键做键集分页；页面之间跳转时先用 OFFSET 定位，之后顺序翻页都走键集
+class KeysetSource:
+    # cache: 查询结果缓存(query_cache.QueryCache)，为 None 时不缓存
+    def __init__(self, conn, sql, params=(), order_by=(), page_size=200, max_pages=8, cache=None):
+        # order_by: [(表达式, 是否降序[, 可否为空])]，表达式引用基础查询结果中的列名，最后一项必须唯一且不为空
+        # 可否为空默认为是；不会为空的列应注明，这样排序、翻页可以使用该列的索引
+        if not order_by:
+            raise ValueError("虚拟列表需要至少一个排序键")
+        self.conn = conn
+        self.cache = cache
+        self.sql = sql
+        self.params = tuple(params)
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        # 空值无法参与大小比较，可为空的键转换为空字符串(唯一键不为空)
+        keys = []
+        for key in order_by[:-1]:
+            expr, desc = key[:2]
+            nullable = key[2] if len(key) > 2 else True
+            keys.append((f"IFNULL({expr}, '')" if nullable else expr, desc))
+        keys.append(tuple(order_by[-1][:2]))
+        self.key_count = len(keys)
+
+        key_columns = ", ".join(expr for expr, _ in keys)
+        order = ", ".join(f"{expr} {'DESC' if desc else 'ASC'}" for expr, desc in keys)
+        self._select = f"SELECT v.*, {key_columns} FROM ({sql}) AS v"
+        self._order = f" ORDER BY {order} LIMIT ?"
+        self._full_order = f" ORDER BY {order}"
+
+        # 各键方向相同时用行值比较 (k1, k2) > (?, ?)，可以直接在索引中定位
+        # 混合方向的键集条件: (k1 > ?) OR (k1 = ? AND k2 < ?) OR ...
+        self._row_seek = len({desc for _, desc in keys}) == 1
+        if self._row_seek:
+            columns = ", ".join(expr for expr, _ in keys)
+            self._seek = f" WHERE ({columns}) {'<' if keys[0][1] else '>'} ({', '.join('?' * len(keys))})"
+        else:
+            terms = []
+            for i, (expr, desc) in enumerate(keys):
+                parts = [f"{prev} = ?" for prev, _ in keys[:i]]
+                parts.append(f"{expr} {'<' if desc else '>'} ?")
+                terms.append("(" + " AND ".join(parts) + ")")
+            self._seek = " WHERE " + " OR ".join(terms)
+
+        self.reset()
+
+    # 清除缓存，数据变化后调用
+    def reset(self):
+        self._count = None
+        self._page_keys = {}  # 页号 -> 该页最后一行的排序键
+        self._pages = OrderedDict()  # 已读取的页，最近使用的在后
+
+    def _fetch(self, sql, params):
+        if self.cache is not None:
+            return self.cache.fetch(self.conn, sql, params)
+        return self.conn.execute(sql, params).fetchall()
+
+    # 结果总行数
+    def count(self):
+        if self._count is None:
+            self._count = self._fetch(f"SELECT COUNT(*) FROM ({self.sql})", self.params)[0][0]
+        return self._count
+
+    # 按列表顺序读取全部结果的查询(导出用)，返回 (sql, params)
+    def export_query(self):
+        return f"SELECT v.* FROM ({self.sql}) AS v" + self._full_order, self.params
+
+    # 读取一页，返回 [(排序键, 显示值)]
+    def page(self, page_no):
+        if page_no in self._pages:
+            self._pages.move_to_end(page_no)
+            return self._pages[page_no]
+
+        previous_key = self._page_keys.get(page_no - 1)
+        if page_no == 0:
+            fetched = self._fetch(self._select + self._order, self.params + (self.page_size,))
+        elif previous_key is not None:
+            # 已知上一页的最后一行，按键集接着读
+            if self._row_seek:
+                seek_params = list(previous_key)
+            else:
+                seek_params = []
+                for i in range(self.key_count):
+                    seek_params.extend(previous_key[:i + 1])
+            fetched = self._fetch(self._select + self._seek + self._order,
+                                  self.params + tuple(seek_params) + (self.page_size,))
+        else:
+            # 跳转到未读过的位置
+            fetched = self._fetch(self._select + self._order + " OFFSET ?",
+                                  self.params + (self.page_size, page_no * self.page_size))
+
+        rows = [(row[-self.key_count:], row[:-self.key_count]) for row in fetched]
+        if rows:
+            self._page_keys[page_no] = rows[-1][0]
+        self._pages[page_no] = rows
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return rows
+
+    # 读取 [start, stop) 范围内的行
+    def rows(self, start, stop):
+        result = []
+        index = start
+        while index < stop:
+            page_no, offset = divmod(index, self.page_size)
+            page = self.page(page_no)
+            chunk = page[offset:offset + stop - index]
+            if not chunk:
+                break
+            result.extend(chunk)
+            index += len(chunk)
+        return result
+
+
+# 虚拟化的 Treeview，用法与 ttk.Treeview 相同，数据通过 set_query 提供
+class VirtualTreeview(ttk.Treeview):
+    def __init__(self, master=None, **kw):
+        super().__init__(master, **kw)
+        self.source = None
+        self.top = 0
+        self.visible_rows = int(str(self.cget("height")))
+        self._scrollbar = None
+
+        self.bind("<Configure>", self._on_configure, add="+")
+        self.bind("<MouseWheel>", self._on_mousewheel)
+        self.bind("<Button-4>", lambda event: self._scroll_by(-3))
+        self.bind("<Button-5>", lambda event: self._scroll_by(3))
+        self.bind("<Up>", self._on_key_up)
+        self.bind("<Down>", self._on_key_down)
+        self.bind("<Prior>", lambda event: self._scroll_by(-self.visible_rows))
+        self.bind("<Next>", lambda event: self._scroll_by(self.visible_rows))
+        self.bind("<Home>", lambda event: self._scroll_to(0))
+        self.bind("<End>", lambda event: self._scroll_to(self.total()))
+
+    # 关联滚动条，滚动条按全部结果的行数显示位置
+    def attach_scrollbar(self, scrollbar):
+        self._scrollbar = scrollbar
+        scrollbar.configure(command=self.yview)
+
+    # 设置数据查询并回到顶部
+    def set_query(self, conn, sql, params=(), order_by=(), page_size=200, cache=None):
+        self.source = KeysetSource(conn, sql, params, order_by, page_size, cache=cache)
+        self.top = 0
+        self._render()
+
+    # 数据变化后重新读取，保持当前位置(删除行后位置超出末尾时回到最后一屏)
+    def refresh(self):
+        if self.source is not None:
+            self.source.reset()
+        self.top = max(0, min(self.top, self.total() - self.visible_rows))
+        self._render()
+
+    # 结果总行数
+    def total(self):
+        return self.source.count() if self.source is not None else 0
+
+    # 替代 Treeview.yview，供滚动条调用
+    def yview(self, *args):
+        if not args:
+            return self._fractions()
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self.total()))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= self.visible_rows
+            self._scroll_by(amount)
+
+    def _fractions(self):
+        total = self.total()
+        if not total:
+            return 0.0, 1.0
+        return self.top / total, min(1.0, (self.top + self.visible_rows) / total)
+
+    def _scroll_by(self, amount):
+        self._scroll_to(self.top + amount)
+        return "break"
+
+    def _scroll_to(self, top):
+        top = max(0, min(top, self.total() - self.visible_rows))
+        if top != self.top:
+            self.top = top
+            self._render()
+        return "break"
+
+    # 只插入可见区域的行
+    def _render(self):
+        selected = set(self.selection())
+        focused = self.focus()
+        # 按唯一排序键增量刷新: 修改或滚动后只改动变化的行
+        rows = self.source.rows(self.top, self.top + self.visible_rows) if self.source is not None else []
+        tree_diff.sync(self, rows, key=lambda row: row[0][-1], values=lambda row: row[1])
+
+        # 滚动后仍在可见区域的行保持选中
+        still_visible = [iid for iid in selected if self.exists(iid)]
+        if still_visible:
+            self.selection_set(still_visible)
+        if focused and self.exists(focused):
+            self.focus(focused)
+
+        if self._scrollbar is not None:
+            self._scrollbar.set(*self._fractions())
+
+    # 窗口大小变化时重新计算可见行数
+    def _on_configure(self, event):
+        children = self.get_children()
+        bbox = self.bbox(children[0]) if children else None
+        if bbox:
+            header_height, row_height = bbox[1], bbox[3]
+        else:
+            header_height = 25
+            row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        rows = max(1, (event.height - header_height) // row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.top = max(0, min(self.top, self.total() - rows))
+            self._render()
+
+    def _on_mousewheel(self, event):
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    # 键盘移动到可见区域边缘时滚动一行
+    def _on_key_up(self, event):
+        children = self.get_children()
+        if children and self.focus() == children[0] and self.top > 0:
+            self._scroll_by(-1)
+            self._move_cursor(self.get_children()[0])
+            return "break"
+
+    def _on_key_down(self, event):
+        children = self.get_children()
+        if children and self.focus() == children[-1] and self.top + self.visible_rows < self.total():
+            self._scroll_by(1)
+            self._move_cursor(self.get_children()[-1])
+            return "break"
+
+    def _move_cursor(self, iid):
+        self.focus(iid)
+        self.selection_set(iid)